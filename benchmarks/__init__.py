@@ -0,0 +1,7 @@
+import os
+
+# Benchmarks measure the endpoints themselves, so the login throttle is opened up unless explicitly
+# configured. These must be set before any project module reads its configuration.
+os.environ.setdefault("LOGIN_EMAIL_BURST", "1000000")
+os.environ.setdefault("LOGIN_IP_BURST", "1000000")
+os.environ.setdefault("ACCESS_TOKEN_SECRET", "benchmark-secret")
@@ -0,0 +1,282 @@
+import argparse
+import asyncio
+import json
+import sys
+
+from benchmarks.bulk_ingest import format_bulk_ingest, measure_bulk_ingest
+from benchmarks.coldstart import (
+    compare_cold_starts,
+    format_cold_starts,
+    measure_cold_starts,
+)
+from benchmarks.dataset import generate_dataset
+from benchmarks.herd import format_herd, measure_herd
+from benchmarks.login_throttle import format_login_throttle, measure_login_throttle
+from benchmarks.runner import (
+    compare,
+    format_comparison,
+    format_results,
+    mismatched_settings,
+    run_benchmarks,
+)
+from benchmarks.scenarios import SCENARIOS
+from benchmarks.search_scaling import format_search_scaling, measure_search_scaling
+from benchmarks.tokens import format_token_verify, measure_token_verify
+from benchmarks.typeahead import format_typeahead, measure_typeahead
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks",
+        description="Load-test every endpoint in-process and compare runs.",
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run = commands.add_parser("run", help="Seed a backend and benchmark the endpoints")
+    run.add_argument("--backend", choices=["fake", "postgres"], default="fake")
+    run.add_argument("--users", type=int, default=100)
+    run.add_argument("--events", type=int, default=1000)
+    run.add_argument("--feedback", type=int, default=10000)
+    run.add_argument("--requests", type=int, default=200)
+    run.add_argument("--warmup", type=int, default=20)
+    run.add_argument("--concurrency", type=int, default=10)
+    run.add_argument("--seed", type=int, default=1)
+    run.add_argument(
+        "--scenario",
+        action="append",
+        dest="scenarios",
+        help="Only run this scenario; may be repeated",
+    )
+    run.add_argument(
+        "--fake-latency-ms",
+        type=float,
+        default=0.0,
+        help="Simulated database round trip per query with the fake backend",
+    )
+    run.add_argument(
+        "--reset",
+        action="store_true",
+        help="Wipe the Postgres database before seeding it",
+    )
+    run.add_argument(
+        "--cold-starts",
+        type=int,
+        default=0,
+        help="Also time this many cold starts, each in a fresh process",
+    )
+    run.add_argument("--output", help="Write the results as JSON to this file")
+
+    diff = commands.add_parser("compare", help="Compare two results files")
+    diff.add_argument("baseline")
+    diff.add_argument("candidate")
+    diff.add_argument(
+        "--threshold",
+        type=float,
+        default=10.0,
+        help="Percent change in p95 latency or throughput counted as a regression",
+    )
+
+    commands.add_parser("list", help="List the available scenarios")
+
+    typeahead = commands.add_parser(
+        "typeahead", help="Time title suggestions against a large in-memory index"
+    )
+    typeahead.add_argument("--titles", type=int, default=1_000_000)
+    typeahead.add_argument("--lookups", type=int, default=2000)
+    typeahead.add_argument("--seed", type=int, default=1)
+
+    herd = commands.add_parser(
+        "herd",
+        help="Count the queries of concurrent reads of an evicted event",
+    )
+    herd.add_argument("--herd", type=int, default=100)
+    herd.add_argument("--bursts", type=int, default=20)
+    herd.add_argument("--seed", type=int, default=1)
+    herd.add_argument(
+        "--fake-latency-ms",
+        type=float,
+        default=5.0,
+        help="Simulated database round trip per query",
+    )
+
+    token_verify = commands.add_parser(
+        "token-verify", help="Time access token verification, cached and cold"
+    )
+    token_verify.add_argument("--verifications", type=int, default=100_000)
+    token_verify.add_argument("--seed", type=int, default=1)
+
+    login_throttle = commands.add_parser(
+        "login-throttle",
+        help="Compare the CPU cost of throttled and bcrypt-checked login attempts",
+    )
+    login_throttle.add_argument("--attempts", type=int, default=200)
+    login_throttle.add_argument("--seed", type=int, default=1)
+
+    bulk_ingest = commands.add_parser(
+        "bulk-ingest",
+        help="Compare bulk imports with one request per row",
+    )
+    bulk_ingest.add_argument("--backend", choices=["fake", "postgres"], default="fake")
+    bulk_ingest.add_argument("--items", type=int, default=1000)
+    bulk_ingest.add_argument("--seed", type=int, default=1)
+    bulk_ingest.add_argument(
+        "--fake-latency-ms",
+        type=float,
+        default=0.0,
+        help="Simulated database round trip per query with the fake backend",
+    )
+    bulk_ingest.add_argument(
+        "--reset",
+        action="store_true",
+        help="Wipe the Postgres database before seeding it",
+    )
+
+    search_scaling = commands.add_parser(
+        "search-scaling",
+        help="Time keyword searches against the LIKE scan they replaced, by table size",
+    )
+    search_scaling.add_argument(
+        "--backend", choices=["fake", "postgres"], default="fake"
+    )
+    search_scaling.add_argument(
+        "--sizes",
+        type=int,
+        nargs="+",
+        default=[1000, 10000, 100000],
+        help="Numbers of events to time the searches at",
+    )
+    search_scaling.add_argument("--searches", type=int, default=200)
+    search_scaling.add_argument("--seed", type=int, default=1)
+    search_scaling.add_argument(
+        "--reset",
+        action="store_true",
+        help="Wipe the Postgres database before seeding it",
+    )
+
+    similarity = commands.add_parser(
+        "similarity",
+        help="Compare similar-event recall and latency with brute-force search",
+    )
+    similarity.add_argument("--backend", choices=["fake", "postgres"], default="fake")
+    similarity.add_argument("--events", type=int, default=10000)
+    similarity.add_argument("--queries", type=int, default=200)
+    similarity.add_argument("-k", type=int, default=10)
+    similarity.add_argument("--seed", type=int, default=1)
+    similarity.add_argument(
+        "--reset",
+        action="store_true",
+        help="Wipe the Postgres database before seeding it",
+    )
+
+    args = parser.parse_args()
+    if args.command == "list":
+        for scenario in SCENARIOS:
+            print(f"{scenario.name:<28} {scenario.route}")
+        return 0
+    if args.command == "typeahead":
+        print(format_typeahead(measure_typeahead(args.titles, args.lookups, args.seed)))
+        return 0
+    if args.command == "herd":
+        result = asyncio.run(
+            measure_herd(args.herd, args.bursts, args.seed, args.fake_latency_ms / 1000)
+        )
+        print(format_herd(result))
+        return 0
+    if args.command == "token-verify":
+        print(format_token_verify(measure_token_verify(args.verifications, args.seed)))
+        return 0
+    if args.command == "login-throttle":
+        result = asyncio.run(measure_login_throttle(args.attempts, args.seed))
+        print(format_login_throttle(result))
+        return 0
+    if args.command == "bulk-ingest":
+        result = asyncio.run(
+            measure_bulk_ingest(
+                args.backend,
+                args.items,
+                args.seed,
+                fake_latency=args.fake_latency_ms / 1000,
+                reset=args.reset,
+            )
+        )
+        print(format_bulk_ingest(result))
+        return 0
+    if args.command == "search-scaling":
+        result = asyncio.run(
+            measure_search_scaling(
+                args.backend, args.sizes, args.searches, args.seed, reset=args.reset
+            )
+        )
+        print(format_search_scaling(result))
+        return 0
+    if args.command == "similarity":
+        # Only this command needs NumPy, so the other commands run without it.
+        from benchmarks.similarity import format_similarity, measure_similarity
+
+        result = asyncio.run(
+            measure_similarity(
+                args.backend,
+                args.events,
+                args.queries,
+                args.k,
+                args.seed,
+                reset=args.reset,
+            )
+        )
+        print(format_similarity(result))
+        return 0
+    if args.command == "compare":
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        with open(args.candidate) as f:
+            candidate = json.load(f)
+        mismatched = mismatched_settings(baseline, candidate)
+        if mismatched:
+            print(f"Warning: runs differ in {', '.join(mismatched)}", file=sys.stderr)
+        rows, regressions = compare(baseline, candidate, args.threshold)
+        print(format_comparison(rows, regressions))
+        cold_start = compare_cold_starts(baseline, candidate, args.threshold)
+        if cold_start:
+            before, after, change = cold_start
+            regressed = change > args.threshold
+            print(
+                f"Time to first response: {before:.1f} ms -> {after:.1f} ms ({change:+.1f}%)"
+                + (" REGRESSED" if regressed else "")
+            )
+            if regressed:
+                regressions.append("cold_start")
+        return 1 if regressions else 0
+    dataset = generate_dataset(args.users, args.events, args.feedback, args.seed)
+    results = asyncio.run(
+        run_benchmarks(
+            dataset,
+            backend=args.backend,
+            requests=args.requests,
+            concurrency=args.concurrency,
+            warmup=args.warmup,
+            seed=args.seed,
+            only=args.scenarios,
+            fake_latency=args.fake_latency_ms / 1000,
+            reset=args.reset,
+        )
+    )
+    if args.cold_starts:
+        results["cold_start"] = measure_cold_starts(
+            args.cold_starts,
+            backend=args.backend,
+            users=args.users,
+            events=args.events,
+            feedback=args.feedback,
+            seed=args.seed,
+        )
+    print(format_results(results))
+    if args.cold_starts:
+        print(format_cold_starts(results["cold_start"]))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
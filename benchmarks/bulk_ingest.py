@@ -0,0 +1,102 @@
+import time
+from typing import Any, Callable, Dict, List, Tuple
+
+import httpx
+import project.metrics
+from benchmarks.dataset import generate_dataset
+from benchmarks.runner import serve
+from benchmarks.scenarios import BenchContext, bulk_body, event_params
+
+NDJSON = {"Content-Type": "application/x-ndjson"}
+
+
+def _feedback(ctx: BenchContext) -> Dict[str, Any]:
+    return {
+        "eventId": ctx.event_id(),
+        "rating": ctx.rng.randint(1, 5),
+        "content": "Imported by the benchmark suite.",
+    }
+
+
+async def _timed(run: Callable[[], Any]) -> Dict[str, Any]:
+    started = time.perf_counter()
+    cpu_started = time.process_time()
+    queries_started = project.metrics.db_query_duration.total_count()
+    unexpected = await run()
+    return {
+        "ms": (time.perf_counter() - started) * 1000,
+        "cpu_ms": (time.process_time() - cpu_started) * 1000,
+        "queries": project.metrics.db_query_duration.total_count() - queries_started,
+        "unexpected": unexpected,
+    }
+
+
+async def measure_bulk_ingest(
+    backend: str, items: int, seed: int, fake_latency: float = 0.0, reset: bool = False
+) -> Dict[str, Any]:
+    """
+    Imports `items` events and `items` feedback entries twice: one request per row, sent one after the other
+    the way a naive importer would, then as a single bulk request. Reports the wall time, process CPU time and
+    database queries of each.
+    """
+    dataset = generate_dataset(10, 100, 0, seed)
+    ctx = BenchContext(dataset, seed)
+    user = dataset.users[1]
+    results: Dict[str, Any] = {}
+    async with serve(backend, dataset, fake_latency, reset) as app:
+        async with httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=app), base_url="http://bench"
+        ) as client:
+            kinds: List[Tuple[str, str, Callable[[BenchContext], dict]]] = [
+                ("events", "/event/create", event_params),
+                ("feedback", "/feedback/submit", _feedback),
+            ]
+            for kind, url, make in kinds:
+                rows = [make(ctx) for _ in range(items)]
+
+                async def per_row() -> int:
+                    unexpected = 0
+                    for row in rows:
+                        response = await client.post(
+                            url, params=row, headers=ctx.auth(user)
+                        )
+                        unexpected += response.status_code != 200
+                    return unexpected
+
+                async def bulk() -> int:
+                    response = await client.post(
+                        f"{url}/bulk",
+                        content=bulk_body(rows),
+                        headers={**ctx.auth(user), **NDJSON},
+                    )
+                    if response.status_code != 200:
+                        return items
+                    return response.json()["rejected"]
+
+                results[kind] = {"per_row": await _timed(per_row)}
+                results[kind]["bulk"] = await _timed(bulk)
+    return {
+        "backend": backend,
+        "items": items,
+        "fake_latency_ms": fake_latency * 1000,
+        "kinds": results,
+    }
+
+
+def format_bulk_ingest(result: Dict[str, Any]) -> str:
+    lines = [f"{result['items']} rows of each kind, {result['backend']} backend"]
+    if result["backend"] == "fake":
+        lines[0] += f", {result['fake_latency_ms']:g} ms per query"
+    lines.append(
+        f"{'kind':<10} {'mode':<8} {'total ms':>10} {'ms/row':>8} {'cpu ms':>9} {'queries':>8}"
+    )
+    for kind, modes in result["kinds"].items():
+        for mode, measured in modes.items():
+            lines.append(
+                f"{kind:<10} {mode:<8} {measured['ms']:>10.1f}"
+                f" {measured['ms'] / result['items']:>8.3f} {measured['cpu_ms']:>9.1f}"
+                f" {measured['queries']:>8}"
+            )
+            if measured["unexpected"]:
+                lines.append(f"  {measured['unexpected']} rows were not created")
+    return "\n".join(lines)
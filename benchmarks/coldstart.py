@@ -0,0 +1,223 @@
+import time
+
+# Taken before anything else is imported, so that a fresh process can tell how long the interpreter took to
+# start.
+ENTERED_AT = time.time()
+
+import argparse
+import asyncio
+import json
+import re
+import statistics
+import subprocess
+import sys
+from typing import Any, Dict, List, Optional, Tuple
+
+IMPORT_TIME_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|\s*(\S+)")
+
+SLOWEST_IMPORTS = 15
+
+FIRST_REQUEST = "/search/events"
+
+TIMINGS = (
+    "interpreter_ms",
+    "import_ms",
+    "startup_ms",
+    "first_request_ms",
+    "second_request_ms",
+    "time_to_first_response_ms",
+)
+
+
+def parse_import_times(report: str, top: int = SLOWEST_IMPORTS) -> List[Dict[str, Any]]:
+    """
+    Reads the report written to stderr by `python -X importtime`.
+
+    Returns:
+        List[Dict[str, Any]]: The `top` modules that took longest to import themselves, excluding the
+        modules they import in turn, with their self and cumulative times in milliseconds.
+    """
+    modules = []
+    for line in report.splitlines():
+        match = IMPORT_TIME_LINE.match(line)
+        if match:
+            own, cumulative, module = match.groups()
+            modules.append(
+                {
+                    "module": module,
+                    "self_ms": int(own) / 1000,
+                    "cumulative_ms": int(cumulative) / 1000,
+                }
+            )
+    modules.sort(key=lambda module: module["self_ms"], reverse=True)
+    return modules[:top]
+
+
+async def cold_start(
+    backend: str, users: int, events: int, feedback: int, seed: int
+) -> Dict[str, Any]:
+    """
+    Starts the application from scratch in this process and times each step up to its first response.
+
+    Generating and seeding the fake dataset happens between the import and the startup, and is not counted.
+    With the postgres backend the database is used as it is, so seed it first with `run --backend postgres`.
+    """
+    started = time.perf_counter()
+    import project.server
+
+    imported = time.perf_counter()
+
+    import httpx
+    import project.startup
+    from benchmarks.dataset import generate_dataset
+    from benchmarks.runner import serve
+
+    app = project.server.app
+    if backend == "fake":
+        context = serve(backend, generate_dataset(users, events, feedback, seed))
+    else:
+        context = app.router.lifespan_context(app)
+    async with context:
+        readiness = await project.startup.readiness()
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://bench"
+        ) as client:
+            timings = []
+            for _ in range(2):
+                request_started = time.perf_counter()
+                response = await client.get(FIRST_REQUEST)
+                timings.append((time.perf_counter() - request_started) * 1000)
+                if response.status_code != 200:
+                    raise RuntimeError(
+                        f"GET {FIRST_REQUEST} answered {response.status_code}"
+                    )
+    return {
+        "entered_at": ENTERED_AT,
+        "import_ms": (imported - started) * 1000,
+        "startup_ms": readiness.startup_ms,
+        "phases": {phase.name: phase.duration_ms for phase in readiness.phases},
+        "first_request_ms": timings[0],
+        "second_request_ms": timings[1],
+    }
+
+
+def measure_cold_starts(
+    runs: int,
+    backend: str = "fake",
+    users: int = 100,
+    events: int = 1000,
+    feedback: int = 10000,
+    seed: int = 1,
+) -> Dict[str, Any]:
+    """
+    Times `runs` cold starts, each in a fresh interpreter, the way a scaled-to-zero instance starts.
+
+    Time to first response adds up the interpreter's own startup, importing the application, its lifespan
+    startup and the first request. Import times are slightly inflated by `-X importtime`, which also yields
+    the slowest imports of the first run.
+
+    Returns:
+        Dict[str, Any]: The median of every timing over the runs, the median of each startup phase, and the
+        slowest imports.
+    """
+    samples = []
+    slowest_imports: List[Dict[str, Any]] = []
+    for run in range(runs):
+        spawned_at = time.time()
+        process = subprocess.run(
+            [
+                sys.executable,
+                "-X",
+                "importtime",
+                "-m",
+                "benchmarks.coldstart",
+                f"--backend={backend}",
+                f"--users={users}",
+                f"--events={events}",
+                f"--feedback={feedback}",
+                f"--seed={seed}",
+            ],
+            capture_output=True,
+            text=True,
+        )
+        if process.returncode != 0:
+            raise RuntimeError(f"Cold start failed:\n{process.stderr[-4000:]}")
+        sample = json.loads(process.stdout.strip().splitlines()[-1])
+        sample["interpreter_ms"] = (sample.pop("entered_at") - spawned_at) * 1000
+        sample["time_to_first_response_ms"] = (
+            sample["interpreter_ms"]
+            + sample["import_ms"]
+            + sample["startup_ms"]
+            + sample["first_request_ms"]
+        )
+        samples.append(sample)
+        if run == 0:
+            slowest_imports = parse_import_times(process.stderr)
+    return {
+        "runs": runs,
+        "median_ms": {
+            name: round(statistics.median(sample[name] for sample in samples), 3)
+            for name in TIMINGS
+        },
+        "phases_ms": {
+            name: round(
+                statistics.median(sample["phases"][name] for sample in samples), 3
+            )
+            for name in samples[0]["phases"]
+        },
+        "slowest_imports": slowest_imports,
+    }
+
+
+def compare_cold_starts(
+    baseline: Dict[str, Any], candidate: Dict[str, Any], threshold: float = 10.0
+) -> Optional[Tuple[float, float, float]]:
+    """
+    Compares the median time to first response of two results files.
+
+    Returns:
+        Optional[Tuple[float, float, float]]: The baseline and candidate medians and the percent change, or
+        None unless both runs timed cold starts.
+    """
+    if "cold_start" not in baseline or "cold_start" not in candidate:
+        return None
+    before = baseline["cold_start"]["median_ms"]["time_to_first_response_ms"]
+    after = candidate["cold_start"]["median_ms"]["time_to_first_response_ms"]
+    return before, after, (after - before) / before * 100 if before else 0.0
+
+
+def format_cold_starts(cold_start: Dict[str, Any]) -> str:
+    lines = [f"Cold start, median of {cold_start['runs']} runs:"]
+    for name, value in cold_start["median_ms"].items():
+        lines.append(f"  {name:<28} {value:>9.1f}")
+    for name, value in cold_start["phases_ms"].items():
+        lines.append(f"  {'startup.' + name + '_ms':<28} {value:>9.1f}")
+    lines.append("Slowest imports (self ms, cumulative ms):")
+    for module in cold_start["slowest_imports"]:
+        lines.append(
+            f"  {module['module']:<40} {module['self_ms']:>9.1f} {module['cumulative_ms']:>9.1f}"
+        )
+    return "\n".join(lines)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks.coldstart",
+        description="Start the application once in this process and report its timings as JSON.",
+    )
+    parser.add_argument("--backend", choices=["fake", "postgres"], default="fake")
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--events", type=int, default=1000)
+    parser.add_argument("--feedback", type=int, default=10000)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+    result = asyncio.run(
+        cold_start(args.backend, args.users, args.events, args.feedback, args.seed)
+    )
+    print(json.dumps(result))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,271 @@
+import itertools
+import random
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, NamedTuple
+
+import bcrypt
+import prisma.models
+import project.locations
+import project.passwords
+from benchmarks.fake_prisma import FakeStore
+
+PASSWORD = "benchmark-password"
+
+EPOCH = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+SEED_CHUNK_SIZE = 1000
+
+ADJECTIVES = [
+    "Advanced",
+    "Applied",
+    "Modern",
+    "Practical",
+    "Hands-on",
+    "Introductory",
+    "Open",
+    "Evening",
+    "Weekend",
+    "Annual",
+]
+
+TOPICS = [
+    "Python",
+    "Robotics",
+    "Astronomy",
+    "Chemistry",
+    "Jazz",
+    "Photography",
+    "Machine Learning",
+    "Poetry",
+    "Startups",
+    "Gardening",
+    "Climate Science",
+    "Chess",
+    "Databases",
+    "Pottery",
+    "Marine Biology",
+]
+
+FORMATS = [
+    "Workshop",
+    "Meetup",
+    "Lecture",
+    "Conference",
+    "Hackathon",
+    "Seminar",
+    "Bootcamp",
+    "Masterclass",
+]
+
+# The EventType of each format; the rest are OTHER.
+EVENT_TYPES = {
+    "Workshop": "WORKSHOP",
+    "Meetup": "MEETUP",
+    "Lecture": "LECTURE",
+    "Conference": "CONFERENCE",
+    "Hackathon": "HACKATHON",
+    "Seminar": "SEMINAR",
+}
+
+LOCATIONS = [
+    "New York",
+    "London",
+    "Berlin",
+    "Paris",
+    "Tokyo",
+    "Toronto",
+    "Sydney",
+    "Lagos",
+    "São Paulo",
+    "Online",
+]
+
+SENTENCES = [
+    "Bring a laptop and your curiosity.",
+    "No prior experience is required.",
+    "Refreshments will be provided.",
+    "Speakers from industry and academia share what they have learned.",
+    "Seats are limited, so arrive early.",
+    "The session ends with an open Q&A.",
+    "Materials are shared with attendees afterwards.",
+    "Great for beginners and experts alike.",
+]
+
+COMMENTS = [
+    "Loved it, would come again.",
+    "Too crowded but the content was solid.",
+    "The speaker was fantastic.",
+    "A bit too basic for me.",
+    "Well organised and on time.",
+    "Audio was hard to follow at the back.",
+    "Learned a lot, thanks!",
+    "Not what the description promised.",
+]
+
+
+class Dataset(NamedTuple):
+    """
+    A synthetic, reproducible set of rows for every table, with rating aggregates consistent with the feedback.
+    """
+
+    users: List[dict]
+    locations: List[dict]
+    events: List[dict]
+    feedback: List[dict]
+    ratings: List[dict]
+
+
+def generate_dataset(users: int, events: int, feedback: int, seed: int = 1) -> Dataset:
+    """
+    Generates a dataset of the requested size. The same arguments always produce the same rows.
+
+    Every user has the password PASSWORD. Feedback is skewed towards a few popular events, the way real traffic
+    is, so that hot rows and long feedback listings both show up in benchmarks.
+
+    Args:
+        users (int): The number of users; the first one is an administrator, the rest alternate tutor and learner.
+        events (int): The number of events, organized by random users and dated around EPOCH.
+        feedback (int): The number of feedback rows, spread over events with a Zipf-like skew.
+        seed (int): The random seed.
+
+    Returns:
+        Dataset: The generated rows, ready for `seed_fake` or `seed_postgres`.
+    """
+    rng = random.Random(seed)
+
+    def make_id() -> str:
+        return str(uuid.UUID(int=rng.getrandbits(128), version=4))
+
+    password = bcrypt.hashpw(
+        PASSWORD.encode("utf-8"), bcrypt.gensalt(project.passwords.BCRYPT_ROUNDS)
+    ).decode("utf-8")
+    roles = ["TUTOR", "LEARNER"]
+    user_rows = []
+    for i in range(users):
+        created_at = EPOCH - timedelta(days=400) + timedelta(minutes=i)
+        user_rows.append(
+            {
+                "id": make_id(),
+                "email": f"user{i}@bench.example",
+                "password": password,
+                "role": "ADMINISTRATOR" if i == 0 else roles[i % 2],
+                "version": 1,
+                "createdAt": created_at,
+                "updatedAt": created_at,
+            }
+        )
+    location_rows = [
+        {
+            "id": make_id(),
+            "key": project.locations.location_key(name),
+            "name": name,
+            "createdAt": EPOCH - timedelta(days=400),
+        }
+        for name in LOCATIONS
+    ]
+    event_rows = []
+    for i in range(events):
+        topic = rng.choice(TOPICS)
+        location = rng.choice(location_rows)
+        # Drawn in the order the title used to draw them, so that seeds keep producing the same dataset.
+        adjective, format = rng.choice(ADJECTIVES), rng.choice(FORMATS)
+        created_at = EPOCH - timedelta(days=365) + timedelta(minutes=7 * i)
+        event_rows.append(
+            {
+                "id": make_id(),
+                "title": f"{adjective} {topic} {format}",
+                "description": f"A {topic.lower()} event. "
+                + " ".join(rng.sample(SENTENCES, 3)),
+                "date": EPOCH
+                + timedelta(days=rng.randint(-180, 180), hours=rng.randint(8, 20)),
+                "location": location["name"],
+                "locationId": location["id"],
+                "type": EVENT_TYPES.get(format, "OTHER"),
+                "version": 1,
+                "organizerId": rng.choice(user_rows)["id"],
+                "createdAt": created_at,
+                "updatedAt": created_at,
+            }
+        )
+    weights = list(itertools.accumulate(1 / (rank + 1) for rank in range(events)))
+    feedback_rows = []
+    aggregates: Dict[str, dict] = {}
+    for i in range(feedback):
+        event = rng.choices(event_rows, cum_weights=weights)[0] if event_rows else None
+        if event is None:
+            break
+        rating = rng.choices([1, 2, 3, 4, 5], weights=[1, 1, 2, 4, 4])[0]
+        feedback_rows.append(
+            {
+                "id": make_id(),
+                "eventId": event["id"],
+                "userId": rng.choice(user_rows)["id"],
+                "rating": rating,
+                "content": rng.choice(COMMENTS),
+                "createdAt": event["createdAt"] + timedelta(seconds=i + 1),
+            }
+        )
+        aggregate = aggregates.setdefault(
+            event["id"],
+            {
+                "eventId": event["id"],
+                "ratingCount": 0,
+                "ratingSum": 0,
+                **{f"rating{stars}": 0 for stars in range(1, 6)},
+                "updatedAt": EPOCH,
+            },
+        )
+        aggregate["ratingCount"] += 1
+        aggregate["ratingSum"] += rating
+        aggregate[f"rating{rating}"] += 1
+    return Dataset(
+        user_rows, location_rows, event_rows, feedback_rows, list(aggregates.values())
+    )
+
+
+TABLE_ORDER = [
+    ("User", "users"),
+    ("Location", "locations"),
+    ("Event", "events"),
+    ("Feedback", "feedback"),
+    ("EventRating", "ratings"),
+]
+
+
+def seed_fake(store: FakeStore, dataset: Dataset) -> None:
+    """
+    Loads a dataset into the fake engine's tables.
+    """
+    for model, attribute in TABLE_ORDER:
+        for row in getattr(dataset, attribute):
+            store.insert(model, dict(row))
+
+
+async def seed_postgres(dataset: Dataset, reset: bool = False) -> None:
+    """
+    Loads a dataset into the database of the registered, connected Prisma client.
+
+    Args:
+        dataset (Dataset): The rows to insert.
+        reset (bool): Delete every existing row first. Without it, seeding refuses to touch a database that
+            already holds users or events, so that a benchmark is never pointed at real data by accident.
+
+    Raises:
+        RuntimeError: If the database is not empty and `reset` was not given.
+    """
+    models = [getattr(prisma.models, model) for model, _ in TABLE_ORDER]
+    if reset:
+        for model in reversed(models):
+            await model.prisma().delete_many()
+        await prisma.models.Search.prisma().delete_many()
+    elif await prisma.models.User.prisma().count() or await (
+        prisma.models.Event.prisma().count()
+    ):
+        raise RuntimeError(
+            "Refusing to seed a database that already holds data; pass --reset to wipe it"
+        )
+    for model, (_, attribute) in zip(models, TABLE_ORDER):
+        rows = getattr(dataset, attribute)
+        for start in range(0, len(rows), SEED_CHUNK_SIZE):
+            await model.prisma().create_many(data=rows[start : start + SEED_CHUNK_SIZE])
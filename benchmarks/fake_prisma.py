@@ -0,0 +1,935 @@
+import asyncio
+import heapq
+import json
+import operator
+import re
+import uuid
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from prisma import Prisma, errors
+
+
+class Relation(NamedTuple):
+    """
+    A relation field: rows of `model` whose `remote` column equals this row's `local` column.
+    """
+
+    model: str
+    local: str
+    remote: str
+    many: bool
+
+
+class Table(NamedTuple):
+    """
+    What the fake engine needs to know about a model, mirroring schema.prisma.
+    """
+
+    primary_key: str
+    unique: Tuple[str, ...] = ()
+    indexed: Tuple[str, ...] = ()
+    defaults: Dict[str, Any] = {}
+    relations: Dict[str, Relation] = {}
+
+
+TABLES: Dict[str, Table] = {
+    "User": Table(
+        primary_key="id",
+        unique=("email",),
+        defaults={"name": None, "bio": None, "avatarUrl": None, "version": 1},
+        relations={
+            "Events": Relation("Event", "id", "organizerId", True),
+            "Feedbacks": Relation("Feedback", "id", "userId", True),
+        },
+    ),
+    "Event": Table(
+        primary_key="id",
+        indexed=("organizerId", "locationId", "type"),
+        defaults={
+            "locationId": None,
+            "type": "OTHER",
+            "version": 1,
+            "embedding": None,
+        },
+        relations={
+            "Organizer": Relation("User", "organizerId", "id", False),
+            "Location": Relation("Location", "locationId", "id", False),
+            "Feedbacks": Relation("Feedback", "id", "eventId", True),
+            "Rating": Relation("EventRating", "id", "eventId", False),
+        },
+    ),
+    "EventRating": Table(
+        primary_key="eventId",
+        defaults={
+            "ratingCount": 0,
+            "ratingSum": 0,
+            "rating1": 0,
+            "rating2": 0,
+            "rating3": 0,
+            "rating4": 0,
+            "rating5": 0,
+        },
+        relations={"Event": Relation("Event", "eventId", "id", False)},
+    ),
+    "Feedback": Table(
+        primary_key="id",
+        indexed=("eventId", "userId"),
+        relations={
+            "User": Relation("User", "userId", "id", False),
+            "Event": Relation("Event", "eventId", "id", False),
+        },
+    ),
+    "Location": Table(
+        primary_key="id",
+        unique=("key",),
+        relations={"Events": Relation("Event", "id", "locationId", True)},
+    ),
+    "Search": Table(primary_key="id"),
+}
+
+TIMESTAMPED = {"User", "Event", "EventRating", "Search"}
+
+# Raw SQL cannot be run by the fake, so raw queries name themselves in a leading comment, e.g.
+# `/* event_facets */`, and are answered by the `_fake_raw_<name>` method reproducing them in Python.
+RAW_QUERY_NAME = re.compile(r"/\*\s*(\w+)\s*\*/")
+
+
+def _normalize(value: Any) -> Any:
+    if isinstance(value, datetime) and value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    if hasattr(value, "value") and isinstance(value, str):
+        return value.value
+    return value
+
+
+def _raw_value(value: Any) -> dict:
+    # Tags a value the way the query engine does in raw query results.
+    if value is None:
+        return {"prisma__type": "null", "prisma__value": None}
+    if isinstance(value, bool):
+        return {"prisma__type": "bool", "prisma__value": value}
+    if isinstance(value, int):
+        return {"prisma__type": "int", "prisma__value": value}
+    if isinstance(value, float):
+        return {"prisma__type": "double", "prisma__value": value}
+    if isinstance(value, datetime):
+        return {"prisma__type": "datetime", "prisma__value": value.isoformat()}
+    return {"prisma__type": "string", "prisma__value": value}
+
+
+def _check_fields(name: str, model: Any, data: dict) -> None:
+    unknown = set(data) - set(model.model_fields)
+    if unknown:
+        raise errors.FieldNotFoundError(
+            {"user_facing_error": {"error_code": "P2009"}},
+            message=f"Unknown field(s) on {name}: {', '.join(sorted(unknown))}",
+        )
+
+
+def _not_found(message: str) -> errors.RecordNotFoundError:
+    return errors.RecordNotFoundError(
+        {"user_facing_error": {"error_code": "P2025", "message": message}}
+    )
+
+
+def _compile_field(field: str, condition: Any) -> Callable[[dict], bool]:
+    if not isinstance(condition, dict):
+        expected = _normalize(condition)
+        return lambda row: row.get(field) == expected
+    insensitive = condition.get("mode") == "insensitive"
+
+    def fold(value: Any) -> Any:
+        return value.casefold() if insensitive and isinstance(value, str) else value
+
+    checks: List[Callable[[Any], bool]] = []
+    for operator, operand in condition.items():
+        if operator == "mode":
+            continue
+        if operator == "not" and isinstance(operand, dict):
+            inner = _compile_field(field, {**operand, "mode": condition.get("mode")})
+            checks.append(lambda value, inner=inner: not inner({field: value}))
+            continue
+        if operator in ("in", "not_in"):
+            operand = {fold(_normalize(item)) for item in operand}
+        else:
+            operand = fold(_normalize(operand))
+        if operator == "equals":
+            checks.append(lambda value, operand=operand: fold(value) == operand)
+        elif operator == "not":
+            checks.append(lambda value, operand=operand: fold(value) != operand)
+        elif operator == "in":
+            checks.append(lambda value, operand=operand: fold(value) in operand)
+        elif operator == "not_in":
+            checks.append(lambda value, operand=operand: fold(value) not in operand)
+        elif operator in ("lt", "lte", "gt", "gte"):
+            compare = {
+                "lt": lambda a, b: a < b,
+                "lte": lambda a, b: a <= b,
+                "gt": lambda a, b: a > b,
+                "gte": lambda a, b: a >= b,
+            }[operator]
+            checks.append(
+                lambda value, operand=operand, compare=compare: value is not None
+                and compare(fold(value), operand)
+            )
+        elif operator == "contains":
+            checks.append(
+                lambda value, operand=operand: value is not None
+                and operand in fold(value)
+            )
+        elif operator == "startswith":
+            checks.append(
+                lambda value, operand=operand: value is not None
+                and fold(value).startswith(operand)
+            )
+        elif operator == "endswith":
+            checks.append(
+                lambda value, operand=operand: value is not None
+                and fold(value).endswith(operand)
+            )
+        else:
+            raise NotImplementedError(f"Fake engine does not support `{operator}`")
+    return lambda row: all(check(row.get(field)) for check in checks)
+
+
+def _aggregate(aggregate: str, field: str, rows: List[dict]) -> Any:
+    if aggregate == "_count":
+        if field == "_all":
+            return len(rows)
+        return sum(row.get(field) is not None for row in rows)
+    values = [row[field] for row in rows if row.get(field) is not None]
+    if aggregate == "_sum":
+        return sum(values) if values else None
+    if not values:
+        return None
+    if aggregate == "_avg":
+        return sum(values) / len(values)
+    if aggregate == "_min":
+        return min(values)
+    if aggregate == "_max":
+        return max(values)
+    raise NotImplementedError(f"Fake engine does not support `{aggregate}`")
+
+
+def compile_where(table: Table, where: Optional[dict]) -> Callable[[dict], bool]:
+    """
+    Turns a Prisma `where` argument into a predicate over stored rows.
+
+    Scalar filters and AND/OR/NOT are supported; relation filters are not.
+    """
+    if not where:
+        return lambda row: True
+    predicates: List[Callable[[dict], bool]] = []
+    for key, condition in where.items():
+        if key in ("AND", "OR", "NOT"):
+            parts = condition if isinstance(condition, list) else [condition]
+            compiled = [compile_where(table, part) for part in parts]
+            if key == "AND":
+                predicates.append(lambda row, c=compiled: all(p(row) for p in c))
+            elif key == "OR":
+                predicates.append(lambda row, c=compiled: any(p(row) for p in c))
+            else:
+                predicates.append(lambda row, c=compiled: not any(p(row) for p in c))
+        elif key in table.relations:
+            raise NotImplementedError(
+                f"Fake engine does not support relation filters (`{key}`)"
+            )
+        else:
+            predicates.append(_compile_field(key, condition))
+    return lambda row: all(predicate(row) for predicate in predicates)
+
+
+class FakeStore:
+    """
+    In-memory tables holding the rows served by FakePrisma, with lookups by primary key, unique and
+    indexed columns so that point reads stay O(1) like they would against Postgres.
+    """
+
+    def __init__(self):
+        self.rows: Dict[str, Dict[Any, dict]] = {name: {} for name in TABLES}
+        self.index: Dict[Tuple[str, str], Dict[Any, set]] = {
+            (name, column): {}
+            for name, table in TABLES.items()
+            for column in table.unique + table.indexed
+        }
+        self.queries = 0
+
+    def insert(self, model: str, row: dict) -> dict:
+        table = TABLES[model]
+        key = row[table.primary_key]
+        if key in self.rows[model] or any(
+            self.index[(model, column)].get(row.get(column)) for column in table.unique
+        ):
+            raise errors.UniqueViolationError(
+                {
+                    "user_facing_error": {
+                        "error_code": "P2002",
+                        "message": f"Unique constraint failed on {model}",
+                    }
+                }
+            )
+        self.rows[model][key] = row
+        for column in table.unique + table.indexed:
+            self.index[(model, column)].setdefault(row.get(column), set()).add(key)
+        return row
+
+    def remove(self, model: str, key: Any) -> Optional[dict]:
+        table = TABLES[model]
+        row = self.rows[model].pop(key, None)
+        if row is None:
+            return None
+        for column in table.unique + table.indexed:
+            keys = self.index[(model, column)].get(row.get(column))
+            if keys:
+                keys.discard(key)
+        return row
+
+    def replace(self, model: str, row: dict) -> None:
+        table = TABLES[model]
+        key = row[table.primary_key]
+        self.remove(model, key)
+        self.insert(model, row)
+
+    def candidates(self, model: str, where: Optional[dict]) -> Iterable[dict]:
+        """
+        Narrows a scan using the primary key or an indexed column constrained by equality or `in`, either at
+        the top level of `where` or inside its AND list.
+        """
+        table = TABLES[model]
+        rows = self.rows[model]
+        conditions = dict(where or {})
+        for part in conditions.get("AND", []) if isinstance(where, dict) else []:
+            if isinstance(part, dict):
+                conditions = {**part, **conditions}
+        for column in (table.primary_key,) + table.unique + table.indexed:
+            condition = conditions.get(column)
+            if condition is None:
+                continue
+            if isinstance(condition, dict):
+                if set(condition) - {"equals", "in"}:
+                    continue
+                values = (
+                    [condition["equals"]] if "equals" in condition else condition["in"]
+                )
+            else:
+                values = [condition]
+            if column == table.primary_key:
+                return [rows[value] for value in values if value in rows]
+            index = self.index[(model, column)]
+            return [rows[key] for value in values for key in index.get(value, ())]
+        return rows.values()
+
+
+class FakeTransaction:
+    """
+    Stands in for Prisma's transaction manager: writes made through the yielded client are undone if the
+    block raises.
+    """
+
+    def __init__(self, client: "FakePrisma"):
+        self._client = client
+        self._tx_client: Optional[FakePrisma] = None
+
+    async def __aenter__(self) -> "FakePrisma":
+        self._tx_client = self._client._copy()
+        self._tx_client._undo = []
+        return self._tx_client
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        if exc is not None and self._tx_client is not None:
+            store = self._client.store
+            for model, key, previous in reversed(self._tx_client._undo):
+                store.remove(model, key)
+                if previous is not None:
+                    store.insert(model, previous)
+
+
+class FakePrisma(Prisma):
+    """
+    A Prisma client whose query engine is replaced by FakeStore.
+
+    The generated model actions, argument handling and `model_parse` of query results all still run, so
+    benchmarks measure the application's own overhead faithfully; only the database round trip is
+    replaced, optionally by a fixed `latency` in seconds. Raw SQL is not supported.
+    """
+
+    def __init__(
+        self, store: Optional[FakeStore] = None, latency: float = 0.0, **kwargs: Any
+    ):
+        super().__init__(**kwargs)
+        self.store = store or FakeStore()
+        self.latency = latency
+        self._undo: Optional[List[Tuple[str, Any, Optional[dict]]]] = None
+        self._fake_connected = False
+
+    def _copy(self) -> "FakePrisma":
+        new = super()._copy()
+        new.store = self.store
+        new.latency = self.latency
+        new._fake_connected = self._fake_connected
+        return new
+
+    async def connect(self, *args: Any, **kwargs: Any) -> None:
+        self._fake_connected = True
+
+    async def disconnect(self, *args: Any, **kwargs: Any) -> None:
+        self._fake_connected = False
+
+    def is_connected(self) -> bool:
+        return self._fake_connected
+
+    def tx(self, *args: Any, **kwargs: Any) -> FakeTransaction:
+        return FakeTransaction(self)
+
+    async def _execute(
+        self,
+        *,
+        method: str,
+        arguments: Dict[str, Any],
+        model: Any = None,
+        root_selection: Optional[List[str]] = None,
+    ) -> Any:
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        self.store.queries += 1
+        if method == "query_raw":
+            rows = self._raw(arguments["query"], arguments["parameters"])
+            return {
+                "data": {
+                    "result": [
+                        {column: _raw_value(value) for column, value in row.items()}
+                        for row in rows
+                    ]
+                }
+            }
+        if method == "execute_raw":
+            return {
+                "data": {
+                    "result": self._raw(arguments["query"], arguments["parameters"])
+                }
+            }
+        handler = getattr(self, f"_fake_{method}", None)
+        if handler is None or model is None:
+            raise NotImplementedError(f"Fake engine does not support `{method}`")
+        name = model.__prisma_model__
+        if method == "group_by":
+            arguments = {**arguments, "selection": root_selection}
+        return {"data": {"result": handler(name, model, **arguments)}}
+
+    def _raw(self, query: str, parameters: Iterable[Any]) -> Any:
+        match = RAW_QUERY_NAME.match(query)
+        handler = getattr(self, f"_fake_raw_{match.group(1)}", None) if match else None
+        if handler is None:
+            raise NotImplementedError(
+                "Fake engine only runs raw queries named in a leading comment"
+            )
+        return handler(*[_normalize(value) for value in parameters])
+
+    def _fake_raw_event_facets(
+        self,
+        start: Optional[datetime],
+        end: Optional[datetime],
+        location_id: Optional[str],
+        type: Optional[str],
+    ) -> List[dict]:
+        counts: Dict[str, Counter] = {
+            "type": Counter(),
+            "location": Counter(),
+            "month": Counter(),
+        }
+        for row in self.store.candidates("Event", None):
+            if start is not None and row["date"] < start:
+                continue
+            if end is not None and row["date"] >= end:
+                continue
+            if location_id is not None and row["locationId"] != location_id:
+                continue
+            if type is not None and row["type"] != type:
+                continue
+            counts["type"][row["type"]] += 1
+            counts["location"][row["locationId"]] += 1
+            counts["month"][row["date"].strftime("%Y-%m")] += 1
+        return [
+            {"facet": facet, "value": value, "count": count}
+            for facet, values in counts.items()
+            for value, count in values.items()
+        ]
+
+    def _fake_raw_create_embedding_index(self) -> int:
+        return 0
+
+    def _fake_raw_store_embeddings(self, ids: List[str], vectors: List[str]) -> int:
+        stored = 0
+        for event_id, vector in zip(ids, vectors):
+            row = self.store.rows["Event"].get(event_id)
+            if row is not None:
+                row["embedding"] = json.loads(vector)
+                stored += 1
+        return stored
+
+    def _fake_raw_events_without_embedding(self, after: str, limit: int) -> List[dict]:
+        rows = sorted(
+            (
+                row
+                for row in self.store.rows["Event"].values()
+                if row.get("embedding") is None and row["id"] > after
+            ),
+            key=lambda row: row["id"],
+        )
+        return [
+            {"id": row["id"], "title": row["title"], "description": row["description"]}
+            for row in rows[:limit]
+        ]
+
+    def _fake_raw_similar_events(self, event_id: str, limit: int) -> List[dict]:
+        # An exact scan, where Postgres would use the approximate HNSW index. Embeddings are unit vectors, so
+        # their dot product is the cosine similarity.
+        target = self.store.rows["Event"].get(event_id)
+        if target is None or target.get("embedding") is None:
+            return []
+        scored = (
+            (sum(map(operator.mul, row["embedding"], target["embedding"])), row)
+            for row in self.store.rows["Event"].values()
+            if row["id"] != event_id and row.get("embedding") is not None
+        )
+        return [
+            {
+                "id": row["id"],
+                "title": row["title"],
+                "date": row["date"],
+                "location": row["location"],
+                "similarity": similarity,
+            }
+            for similarity, row in heapq.nlargest(
+                limit, scored, key=lambda scored: scored[0]
+            )
+        ]
+
+    def _write_if_version(
+        self,
+        name: str,
+        row: Optional[dict],
+        versions: Optional[List[int]],
+        changes: dict,
+        returning: Tuple[str, ...],
+    ) -> List[dict]:
+        # The conditional writes' shared result shape: no row for a missing record, NULLs for one at another
+        # version, or the updated columns.
+        if row is None:
+            return []
+        if versions is not None and row["version"] not in versions:
+            return [dict.fromkeys(returning)]
+        updated = {
+            **row,
+            **changes,
+            "version": row["version"] + 1,
+            "updatedAt": datetime.now(timezone.utc),
+        }
+        self.store.replace(name, updated)
+        self._record(name, updated[TABLES[name].primary_key], row)
+        return [{column: updated[column] for column in returning}]
+
+    def _fake_raw_edit_event(
+        self,
+        event_id: str,
+        versions: Optional[List[int]],
+        title: Optional[str],
+        description: Optional[str],
+        date: Optional[datetime],
+        location: Optional[str],
+        location_id: Optional[str],
+        type: Optional[str],
+        embedding: Optional[str],
+    ) -> List[dict]:
+        changes = {
+            "title": title,
+            "description": description,
+            "date": date,
+            "location": location,
+            "locationId": location_id,
+            "type": type,
+            "embedding": json.loads(embedding) if embedding is not None else None,
+        }
+        return self._write_if_version(
+            "Event",
+            self.store.rows["Event"].get(event_id),
+            versions,
+            {field: value for field, value in changes.items() if value is not None},
+            (
+                "id",
+                "title",
+                "description",
+                "date",
+                "location",
+                "locationId",
+                "type",
+                "version",
+                "createdAt",
+                "updatedAt",
+                "organizerId",
+            ),
+        )
+
+    def _fake_raw_delete_event(
+        self, event_id: str, versions: Optional[List[int]]
+    ) -> List[dict]:
+        row = self.store.rows["Event"].get(event_id)
+        if row is None:
+            return []
+        if versions is not None and row["version"] not in versions:
+            return [{"id": None}]
+        self._delete_row("Event", row)
+        return [{"id": event_id}]
+
+    def _fake_raw_edit_profile(
+        self,
+        email: str,
+        versions: Optional[List[int]],
+        name: str,
+        bio: Optional[str],
+        avatar_url: Optional[str],
+    ) -> List[dict]:
+        return self._write_if_version(
+            "User",
+            self._unique("User", {"email": email}),
+            versions,
+            {"name": name, "bio": bio, "avatarUrl": avatar_url},
+            ("id", "email", "name", "bio", "avatarUrl", "version"),
+        )
+
+    def _fake_raw_bulk_insert_feedback(
+        self,
+        ids: List[str],
+        event_ids: List[str],
+        ratings: List[int],
+        contents: List[str],
+        user_id: str,
+    ) -> int:
+        now = datetime.now(timezone.utc)
+        histograms: Dict[str, Counter] = {}
+        for feedback_id, event_id, rating, content in zip(
+            ids, event_ids, ratings, contents
+        ):
+            self.store.insert(
+                "Feedback",
+                {
+                    "id": feedback_id,
+                    "eventId": event_id,
+                    "rating": rating,
+                    "content": content,
+                    "userId": user_id,
+                    "createdAt": now,
+                },
+            )
+            self._record("Feedback", feedback_id, None)
+            histograms.setdefault(event_id, Counter())[rating] += 1
+        for event_id, histogram in sorted(histograms.items()):
+            previous = self.store.rows["EventRating"].get(event_id)
+            row = dict(
+                previous or {"eventId": event_id, **TABLES["EventRating"].defaults}
+            )
+            row["ratingCount"] += sum(histogram.values())
+            row["ratingSum"] += sum(stars * hits for stars, hits in histogram.items())
+            for stars, hits in histogram.items():
+                row[f"rating{stars}"] += hits
+            row["updatedAt"] = now
+            self.store.replace("EventRating", row)
+            self._record("EventRating", event_id, previous)
+        return len(ids)
+
+    def _fake_raw_top_queries(
+        self, since: datetime, no_results: bool, limit: int
+    ) -> List[dict]:
+        counts: Counter = Counter()
+        result_counts: Counter = Counter()
+        for row in self.store.candidates("Search", None):
+            if row["createdAt"] < since or not row["query"]:
+                continue
+            if no_results and row["resultCount"] != 0:
+                continue
+            counts[row["query"]] += 1
+            result_counts[row["query"]] += row["resultCount"]
+        ranked = sorted(counts.items(), key=lambda item: (-item[1], item[0]))
+        return [
+            {
+                "query": query,
+                "searches": searches,
+                "average_results": result_counts[query] / searches,
+            }
+            for query, searches in ranked[:limit]
+        ]
+
+    def _record(self, name: str, key: Any, previous: Optional[dict]) -> None:
+        if self._undo is not None:
+            self._undo.append((name, key, previous))
+
+    def _project(
+        self, name: str, model: Any, row: dict, include: Optional[dict]
+    ) -> dict:
+        table = TABLES[name]
+        result = {
+            field: row[field]
+            for field in model.model_fields
+            if field in row and field not in table.relations
+        }
+        for field, wanted in (include or {}).items():
+            if not wanted:
+                continue
+            relation = table.relations[field]
+            related = [
+                related_row
+                for related_row in self.store.candidates(
+                    relation.model, {relation.remote: row[relation.local]}
+                )
+                if related_row.get(relation.remote) == row[relation.local]
+            ]
+            if relation.many:
+                result[field] = [dict(related_row) for related_row in related]
+            else:
+                result[field] = dict(related[0]) if related else None
+        return result
+
+    def _find(
+        self,
+        name: str,
+        where: Optional[dict],
+        order_by: Any = None,
+        skip: Optional[int] = None,
+        take: Optional[int] = None,
+    ) -> List[dict]:
+        predicate = compile_where(TABLES[name], where)
+        rows = [row for row in self.store.candidates(name, where) if predicate(row)]
+        orders = order_by if isinstance(order_by, list) else [order_by or {}]
+        for order in reversed(orders):
+            for field, direction in reversed(list(order.items())):
+                rows.sort(key=lambda row: row[field], reverse=direction == "desc")
+        start = skip or 0
+        return rows[start : start + take if take is not None else None]
+
+    def _build(self, name: str, model: Any, data: dict) -> dict:
+        _check_fields(name, model, data)
+        table = TABLES[name]
+        now = datetime.now(timezone.utc)
+        row = dict(table.defaults)
+        if table.primary_key == "id":
+            row["id"] = str(uuid.uuid4())
+        if name in TIMESTAMPED:
+            row["updatedAt"] = now
+        if name != "EventRating":
+            row["createdAt"] = now
+        row.update({field: _normalize(value) for field, value in data.items()})
+        return row
+
+    def _apply(self, name: str, model: Any, row: dict, data: dict) -> dict:
+        _check_fields(name, model, data)
+        updated = dict(row)
+        for field, value in data.items():
+            if isinstance(value, dict):
+                for operator, operand in value.items():
+                    if operator == "set":
+                        updated[field] = _normalize(operand)
+                    elif operator == "increment":
+                        updated[field] += operand
+                    elif operator == "decrement":
+                        updated[field] -= operand
+                    elif operator == "multiply":
+                        updated[field] *= operand
+                    elif operator == "divide":
+                        updated[field] /= operand
+                    else:
+                        raise NotImplementedError(
+                            f"Fake engine does not support `{operator}` updates"
+                        )
+            else:
+                updated[field] = _normalize(value)
+        if name in TIMESTAMPED:
+            updated["updatedAt"] = datetime.now(timezone.utc)
+        return updated
+
+    def _unique(self, name: str, where: dict) -> Optional[dict]:
+        rows = self._find(name, where)
+        return rows[0] if rows else None
+
+    def _fake_find_unique(
+        self, name: str, model: Any, where: dict, include: Optional[dict] = None
+    ) -> Optional[dict]:
+        row = self._unique(name, where)
+        return self._project(name, model, row, include) if row else None
+
+    def _fake_find_first(
+        self,
+        name: str,
+        model: Any,
+        where: Optional[dict] = None,
+        order_by: Any = None,
+        skip: Optional[int] = None,
+        include: Optional[dict] = None,
+        **unsupported: Any,
+    ) -> Optional[dict]:
+        rows = self._find(name, where, order_by, skip, 1)
+        return self._project(name, model, rows[0], include) if rows else None
+
+    def _fake_find_many(
+        self,
+        name: str,
+        model: Any,
+        where: Optional[dict] = None,
+        order_by: Any = None,
+        skip: Optional[int] = None,
+        take: Optional[int] = None,
+        include: Optional[dict] = None,
+        cursor: Optional[dict] = None,
+        distinct: Optional[list] = None,
+    ) -> List[dict]:
+        if cursor or distinct:
+            raise NotImplementedError(
+                "Fake engine does not support `cursor` or `distinct`"
+            )
+        return [
+            self._project(name, model, row, include)
+            for row in self._find(name, where, order_by, skip, take)
+        ]
+
+    def _fake_count(
+        self,
+        name: str,
+        model: Any,
+        where: Optional[dict] = None,
+        skip: Optional[int] = None,
+        take: Optional[int] = None,
+        cursor: Optional[dict] = None,
+    ) -> dict:
+        return {"_count": {"_all": len(self._find(name, where, None, skip, take))}}
+
+    def _fake_group_by(
+        self,
+        name: str,
+        model: Any,
+        by: List[str],
+        selection: List[str],
+        where: Optional[dict] = None,
+        having: Optional[dict] = None,
+        orderBy: Any = None,
+        skip: Optional[int] = None,
+        take: Optional[int] = None,
+    ) -> List[dict]:
+        if having:
+            raise NotImplementedError("Fake engine does not support `having`")
+        groups: Dict[tuple, List[dict]] = {}
+        for row in self._find(name, where):
+            groups.setdefault(tuple(row[field] for field in by), []).append(row)
+        results = []
+        for key, rows in groups.items():
+            result = dict(zip(by, key))
+            # Aggregates arrive as GraphQL selections, e.g. "_avg { rating }".
+            for selected in selection[len(by) :]:
+                aggregate, _, fields = selected.partition(" { ")
+                result[aggregate] = {
+                    field: _aggregate(aggregate, field, rows)
+                    for field in fields.rstrip(" }").split()
+                }
+            results.append(result)
+        orders = orderBy if isinstance(orderBy, list) else [orderBy or {}]
+        for order in reversed(orders):
+            for field, direction in reversed(list(order.items())):
+                results.sort(key=lambda row: row[field], reverse=direction == "desc")
+        start = skip or 0
+        return results[start : start + take if take is not None else None]
+
+    def _fake_create(
+        self, name: str, model: Any, data: dict, include: Optional[dict] = None
+    ) -> dict:
+        row = self.store.insert(name, self._build(name, model, data))
+        self._record(name, row[TABLES[name].primary_key], None)
+        return self._project(name, model, row, include)
+
+    def _fake_create_many(
+        self, name: str, model: Any, data: List[dict], skipDuplicates: bool = False
+    ) -> dict:
+        count = 0
+        for item in data:
+            try:
+                row = self.store.insert(name, self._build(name, model, item))
+            except errors.UniqueViolationError:
+                if skipDuplicates:
+                    continue
+                raise
+            self._record(name, row[TABLES[name].primary_key], None)
+            count += 1
+        return {"count": count}
+
+    def _fake_update(
+        self,
+        name: str,
+        model: Any,
+        where: dict,
+        data: dict,
+        include: Optional[dict] = None,
+    ) -> dict:
+        row = self._unique(name, where)
+        if row is None:
+            raise _not_found(f"No {name} record to update")
+        updated = self._apply(name, model, row, data)
+        self.store.replace(name, updated)
+        self._record(name, updated[TABLES[name].primary_key], row)
+        return self._project(name, model, updated, include)
+
+    def _fake_update_many(
+        self, name: str, model: Any, where: Optional[dict], data: dict
+    ) -> dict:
+        rows = self._find(name, where)
+        for row in rows:
+            updated = self._apply(name, model, row, data)
+            self.store.replace(name, updated)
+            self._record(name, updated[TABLES[name].primary_key], row)
+        return {"count": len(rows)}
+
+    def _fake_upsert(
+        self,
+        name: str,
+        model: Any,
+        where: dict,
+        create: dict,
+        update: dict,
+        include: Optional[dict] = None,
+    ) -> dict:
+        if self._unique(name, where) is None:
+            return self._fake_create(name, model, create, include)
+        return self._fake_update(name, model, where, update, include)
+
+    def _delete_row(self, name: str, row: dict) -> None:
+        # The row goes first, so that a child whose primary key is also its reference to the row, such as
+        # EventRating, does not cascade back to it.
+        table = TABLES[name]
+        self.store.remove(name, row[table.primary_key])
+        self._record(name, row[table.primary_key], row)
+        for relation in table.relations.values():
+            if relation.local != table.primary_key:
+                continue
+            for child in list(
+                self.store.candidates(
+                    relation.model, {relation.remote: row[relation.local]}
+                )
+            ):
+                if child.get(relation.remote) == row[relation.local]:
+                    self._delete_row(relation.model, child)
+
+    def _fake_delete(
+        self, name: str, model: Any, where: dict, include: Optional[dict] = None
+    ) -> dict:
+        row = self._unique(name, where)
+        if row is None:
+            raise _not_found(f"No {name} record to delete")
+        result = self._project(name, model, row, include)
+        self._delete_row(name, row)
+        return result
+
+    def _fake_delete_many(
+        self, name: str, model: Any, where: Optional[dict] = None
+    ) -> dict:
+        rows = self._find(name, where)
+        for row in rows:
+            self._delete_row(name, row)
+        return {"count": len(rows)}
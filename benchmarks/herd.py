@@ -0,0 +1,106 @@
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, TypeVar
+
+import httpx
+import project.cache
+import project.metrics
+from benchmarks.dataset import generate_dataset
+from benchmarks.runner import PERCENTILES, percentile, serve
+
+T = TypeVar("T")
+
+
+class Uncollapsed:
+    """
+    Stands in for a cache's single-flight group and lets every miss run its own load, as before single-flight.
+    """
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        return await fn()
+
+    def forget(self, key: Hashable) -> None:
+        pass
+
+    def forget_all(self) -> None:
+        pass
+
+
+async def measure_herd(
+    herd: int, bursts: int, seed: int, fake_latency: float
+) -> Dict[str, Any]:
+    """
+    Sends bursts of `herd` concurrent reads of one event right after it was evicted from the event cache, the
+    way a popular event is read after an edit. Compares the database queries and latency of each burst with
+    single-flight and without it.
+
+    Runs against the fake backend. `fake_latency` keeps each load in flight long enough for the burst to
+    arrive while it runs, as a real database round trip would.
+    """
+    dataset = generate_dataset(10, 100, 0, seed)
+    event_id = dataset.events[0]["id"]
+    cache = project.cache.event_cache
+    flights = cache.flights
+    results: Dict[str, Any] = {}
+    async with serve("fake", dataset, fake_latency) as app:
+        async with httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=app), base_url="http://bench"
+        ) as client:
+            for mode in ("single_flight", "uncollapsed"):
+                cache.flights = flights if mode == "single_flight" else Uncollapsed()
+                latencies: List[float] = []
+                queries = 0
+                unexpected = 0
+                try:
+                    for _ in range(bursts):
+                        cache.invalidate(event_id)
+
+                        async def read() -> None:
+                            nonlocal unexpected
+                            started = time.perf_counter()
+                            response = await client.get(f"/event/display/{event_id}")
+                            latencies.append((time.perf_counter() - started) * 1000)
+                            unexpected += response.status_code != 200
+
+                        queries_started = (
+                            project.metrics.db_query_duration.total_count()
+                        )
+                        await asyncio.gather(*(read() for _ in range(herd)))
+                        queries += (
+                            project.metrics.db_query_duration.total_count()
+                            - queries_started
+                        )
+                finally:
+                    cache.flights = flights
+                latencies.sort()
+                results[mode] = {
+                    "queries_per_burst": queries / bursts,
+                    "unexpected": unexpected,
+                    "latency_ms": {
+                        f"p{p}": percentile(latencies, p) for p in PERCENTILES
+                    },
+                }
+    return {
+        "herd": herd,
+        "bursts": bursts,
+        "fake_latency_ms": fake_latency * 1000,
+        "modes": results,
+    }
+
+
+def format_herd(result: Dict[str, Any]) -> str:
+    lines = [
+        f"{result['bursts']} bursts of {result['herd']} concurrent reads of one evicted event,"
+        f" {result['fake_latency_ms']:g} ms per query",
+        f"{'mode':<14} {'queries':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}",
+    ]
+    for mode, measured in result["modes"].items():
+        latency = measured["latency_ms"]
+        lines.append(
+            f"{mode:<14} {measured['queries_per_burst']:>8.1f} {latency['p50']:>9.3f}"
+            f" {latency['p95']:>9.3f} {latency['p99']:>9.3f}"
+        )
+        if measured["unexpected"]:
+            lines.append(f"  {measured['unexpected']} reads did not answer 200")
+    lines.append("Queries are per burst.")
+    return "\n".join(lines)
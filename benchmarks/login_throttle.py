@@ -0,0 +1,85 @@
+import time
+from typing import Any, Dict, List
+
+import httpx
+import project.passwords
+import project.rate_limit
+from benchmarks.dataset import generate_dataset
+from benchmarks.runner import PERCENTILES, percentile, serve
+
+WRONG_PASSWORD = "not-the-password"
+
+
+async def measure_login_throttle(attempts: int, seed: int) -> Dict[str, Any]:
+    """
+    Compares the cost of a login attempt that reaches bcrypt with one the throttle rejects, as in a password
+    guessing attack: the same account, a wrong password each time.
+
+    The benchmarks open the throttle up (see benchmarks/__init__.py), so the rejected attempts are made by
+    emptying the email bucket for their duration. CPU time is that of the whole process, which includes the
+    bcrypt worker threads; with PASSWORD_HASH_EXECUTOR=process, bcrypt runs elsewhere and is not counted.
+    """
+    dataset = generate_dataset(1, 0, 0, seed)
+    email = dataset.users[0]["email"]
+    limiter = project.rate_limit.login_by_email
+    capacity = limiter.capacity
+    results: Dict[str, Any] = {}
+    async with serve("fake", dataset) as app:
+        async with httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=app), base_url="http://bench"
+        ) as client:
+            for outcome, expected in (("verified", 200), ("throttled", 429)):
+                limiter.capacity = capacity if outcome == "verified" else 0.0
+                latencies: List[float] = []
+                unexpected = 0
+                cpu_started = time.process_time()
+                try:
+                    for _ in range(attempts):
+                        started = time.perf_counter()
+                        response = await client.post(
+                            "/user/authenticate",
+                            params={"email": email, "password": WRONG_PASSWORD},
+                        )
+                        latencies.append((time.perf_counter() - started) * 1000)
+                        unexpected += response.status_code != expected
+                finally:
+                    limiter.capacity = capacity
+                cpu = time.process_time() - cpu_started
+                latencies.sort()
+                results[outcome] = {
+                    "status": expected,
+                    "unexpected": unexpected,
+                    "cpu_ms_per_attempt": cpu * 1000 / attempts,
+                    "latency_ms": {
+                        f"p{p}": percentile(latencies, p) for p in PERCENTILES
+                    },
+                }
+    return {
+        "attempts": attempts,
+        "bcrypt_rounds": project.passwords.BCRYPT_ROUNDS,
+        "cpu_ms_saved_per_attempt": results["verified"]["cpu_ms_per_attempt"]
+        - results["throttled"]["cpu_ms_per_attempt"],
+        "outcomes": results,
+    }
+
+
+def format_login_throttle(result: Dict[str, Any]) -> str:
+    lines = [
+        f"{result['attempts']} wrong-password attempts per outcome,"
+        f" bcrypt cost {result['bcrypt_rounds']}",
+        f"{'outcome':<12} {'status':>7} {'cpu ms':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}",
+    ]
+    for outcome, measured in result["outcomes"].items():
+        latency = measured["latency_ms"]
+        lines.append(
+            f"{outcome:<12} {measured['status']:>7} {measured['cpu_ms_per_attempt']:>9.3f}"
+            f" {latency['p50']:>9.3f} {latency['p95']:>9.3f} {latency['p99']:>9.3f}"
+        )
+        if measured["unexpected"]:
+            lines.append(
+                f"  {measured['unexpected']} attempts did not answer {measured['status']}"
+            )
+    lines.append(
+        f"CPU saved per rejected attempt: {result['cpu_ms_saved_per_attempt']:.3f} ms"
+    )
+    return "\n".join(lines)
@@ -0,0 +1,380 @@
+import asyncio
+import contextlib
+import math
+import platform
+import subprocess
+import time
+from datetime import datetime, timezone
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+import httpx
+import prisma.testing
+import project.fast_json
+import project.metrics
+from benchmarks.dataset import Dataset, seed_fake, seed_postgres
+from benchmarks.fake_prisma import FakePrisma, FakeStore
+from benchmarks.scenarios import SCENARIOS, BenchContext, Scenario
+from fastapi import FastAPI
+
+PERCENTILES = (50, 95, 99)
+
+
+class InstrumentedFakePrisma(project.metrics.InstrumentedPrisma, FakePrisma):
+    """
+    A FakePrisma carrying the same query instrumentation as the application's client, so that its cost is
+    part of what is measured.
+    """
+
+
+def percentile(ordered: List[float], p: float) -> float:
+    """
+    Nearest-rank percentile of an already sorted list.
+    """
+    if not ordered:
+        return 0.0
+    return ordered[max(0, math.ceil(p / 100 * len(ordered)) - 1)]
+
+
+def summarize(
+    scenario: Scenario,
+    latencies: List[float],
+    statuses: Dict[int, int],
+    elapsed: float,
+    concurrency: int,
+    cpu: float = 0.0,
+    queries: int = 0,
+) -> Dict[str, Any]:
+    """
+    Reduces the raw samples of one scenario to the figures stored in a results file. Latencies are in
+    milliseconds and throughput in requests per second.
+
+    CPU time is that of the whole process, so it includes the ASGI client and, with the fake backend, the
+    fake database; both cost the same from one run to the next, which keeps the figure comparable.
+
+    Database queries are counted by the client's instrumentation, so they include any background work, such
+    as search log flushes, that ran during the scenario.
+    """
+    ordered = sorted(latencies)
+    return {
+        "route": scenario.route,
+        "requests": len(ordered),
+        "concurrency": concurrency,
+        "errors": sum(
+            count
+            for status, count in statuses.items()
+            if status not in scenario.expected
+        ),
+        "statuses": {str(status): count for status, count in sorted(statuses.items())},
+        "throughput_rps": round(len(ordered) / elapsed, 2) if elapsed else 0.0,
+        "cpu_ms_per_request": round(cpu * 1000 / len(ordered), 3) if ordered else 0.0,
+        "queries_per_request": round(queries / len(ordered), 2) if ordered else 0.0,
+        "latency_ms": {
+            "mean": round(sum(ordered) / len(ordered), 3) if ordered else 0.0,
+            **{f"p{p}": round(percentile(ordered, p), 3) for p in PERCENTILES},
+            "max": round(ordered[-1], 3) if ordered else 0.0,
+        },
+    }
+
+
+async def run_scenario(
+    client: httpx.AsyncClient,
+    ctx: BenchContext,
+    scenario: Scenario,
+    requests: int,
+    concurrency: int,
+    warmup: int,
+) -> Dict[str, Any]:
+    """
+    Runs one scenario: its setup, `warmup` untimed requests, then `requests` timed requests issued by
+    `concurrency` concurrent workers.
+    """
+    if scenario.setup:
+        await scenario.setup(ctx, client, warmup + requests)
+    for _ in range(warmup):
+        request = scenario.build(ctx)
+        await client.request(
+            request.method,
+            request.url,
+            params=request.params,
+            headers=request.headers,
+            content=request.content,
+        )
+    remaining = iter(range(requests))
+    latencies: List[float] = []
+    statuses: Dict[int, int] = {}
+
+    async def worker() -> None:
+        for _ in remaining:
+            request = scenario.build(ctx)
+            started = time.perf_counter()
+            response = await client.request(
+                request.method,
+                request.url,
+                params=request.params,
+                headers=request.headers,
+                content=request.content,
+            )
+            latencies.append((time.perf_counter() - started) * 1000)
+            statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+    started = time.perf_counter()
+    cpu_started = time.process_time()
+    queries_started = project.metrics.db_query_duration.total_count()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    queries = project.metrics.db_query_duration.total_count() - queries_started
+    cpu = time.process_time() - cpu_started
+    elapsed = time.perf_counter() - started
+    return summarize(scenario, latencies, statuses, elapsed, concurrency, cpu, queries)
+
+
+@contextlib.asynccontextmanager
+async def serve(
+    backend: str, dataset: Dataset, fake_latency: float = 0.0, reset: bool = False
+) -> AsyncIterator[FastAPI]:
+    """
+    Seeds the chosen backend with `dataset` and runs the application's lifespan around the benchmark.
+
+    With the "fake" backend the registered Prisma client is swapped for a FakePrisma for the duration, so
+    nothing outside the process is touched. With "postgres" the database behind DATABASE_URL is seeded
+    through the regular client; see `seed_postgres` for the safety check.
+    """
+    import project.server
+
+    app = project.server.app
+    if backend == "fake":
+        store = FakeStore()
+        seed_fake(store, dataset)
+        fake = InstrumentedFakePrisma(store=store, latency=fake_latency)
+        original = project.server.db_client
+        project.server.db_client = fake
+        try:
+            with prisma.testing.reset_client(fake):
+                async with app.router.lifespan_context(app):
+                    yield app
+        finally:
+            project.server.db_client = original
+    elif backend == "postgres":
+        await project.server.db_client.connect()
+        try:
+            await seed_postgres(dataset, reset=reset)
+        finally:
+            await project.server.db_client.disconnect()
+        async with app.router.lifespan_context(app):
+            yield app
+    else:
+        raise ValueError(f"Unsupported backend: {backend}")
+
+
+def uncovered_routes(app: FastAPI, scenarios: List[Scenario]) -> List[str]:
+    """
+    Lists the application's routes that no benchmark scenario exercises.
+    """
+    covered = {scenario.route for scenario in scenarios}
+    routes = []
+    for route in app.routes:
+        for method in sorted(getattr(route, "methods", None) or ()):
+            if method == "HEAD" or route.path.startswith(
+                ("/docs", "/openapi", "/redoc")
+            ):
+                continue
+            routes.append(f"{method} {route.path}")
+    return [route for route in routes if route not in covered]
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def run_benchmarks(
+    dataset: Dataset,
+    backend: str = "fake",
+    requests: int = 200,
+    concurrency: int = 10,
+    warmup: int = 20,
+    seed: int = 1,
+    only: Optional[List[str]] = None,
+    fake_latency: float = 0.0,
+    reset: bool = False,
+) -> Dict[str, Any]:
+    """
+    Runs the selected scenarios, one after the other, against a freshly seeded backend.
+
+    Returns:
+        Dict[str, Any]: The run's metadata and a result per scenario, as stored by `--output`.
+    """
+    scenarios = [
+        scenario for scenario in SCENARIOS if not only or scenario.name in only
+    ]
+    unknown = set(only or ()) - {scenario.name for scenario in SCENARIOS}
+    if unknown:
+        raise ValueError(f"Unknown scenario(s): {', '.join(sorted(unknown))}")
+    started_at = datetime.now(timezone.utc)
+    results: Dict[str, Any] = {}
+    async with serve(backend, dataset, fake_latency, reset) as app:
+        ctx = BenchContext(dataset, seed)
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://bench"
+        ) as client:
+            for scenario in scenarios:
+                results[scenario.name] = await run_scenario(
+                    client, ctx, scenario, requests, concurrency, warmup
+                )
+        missing = uncovered_routes(app, SCENARIOS)
+    return {
+        "meta": {
+            "started_at": started_at.isoformat(),
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "backend": backend,
+            "fake_latency_ms": fake_latency * 1000,
+            "dataset": {
+                "users": len(dataset.users),
+                "events": len(dataset.events),
+                "feedback": len(dataset.feedback),
+            },
+            "seed": seed,
+            "requests": requests,
+            "concurrency": concurrency,
+            "warmup": warmup,
+            "fast_json_responses": project.fast_json.FAST_JSON_RESPONSES,
+            "uncovered_routes": missing,
+        },
+        "results": results,
+    }
+
+
+def _change(before: float, after: float) -> Optional[float]:
+    if not before:
+        return None
+    return (after - before) / before * 100
+
+
+def compare(
+    baseline: Dict[str, Any], candidate: Dict[str, Any], threshold: float = 10.0
+) -> Tuple[List[Dict[str, Any]], List[str]]:
+    """
+    Compares two results files scenario by scenario.
+
+    A scenario regresses when its p95 latency grows, or its throughput drops, by more than `threshold`
+    percent, or when it fails requests that succeeded in the baseline.
+
+    Returns:
+        Tuple[List[Dict[str, Any]], List[str]]: One row per scenario present in both runs, and the names of
+        the scenarios that regressed.
+    """
+    rows = []
+    regressions = []
+    for name, after in candidate["results"].items():
+        before = baseline["results"].get(name)
+        if before is None:
+            continue
+        row = {"scenario": name}
+        for p in PERCENTILES:
+            key = f"p{p}"
+            row[key] = (
+                before["latency_ms"][key],
+                after["latency_ms"][key],
+                _change(before["latency_ms"][key], after["latency_ms"][key]),
+            )
+        row["throughput_rps"] = (
+            before["throughput_rps"],
+            after["throughput_rps"],
+            _change(before["throughput_rps"], after["throughput_rps"]),
+        )
+        row["cpu_ms_per_request"] = (
+            before.get("cpu_ms_per_request", 0.0),
+            after.get("cpu_ms_per_request", 0.0),
+            _change(
+                before.get("cpu_ms_per_request", 0.0),
+                after.get("cpu_ms_per_request", 0.0),
+            ),
+        )
+        row["queries_per_request"] = (
+            before.get("queries_per_request", 0.0),
+            after.get("queries_per_request", 0.0),
+            _change(
+                before.get("queries_per_request", 0.0),
+                after.get("queries_per_request", 0.0),
+            ),
+        )
+        p95_change = row["p95"][2] or 0.0
+        rps_change = row["throughput_rps"][2] or 0.0
+        if (
+            p95_change > threshold
+            or rps_change < -threshold
+            or after["errors"] > before["errors"]
+        ):
+            regressions.append(name)
+        rows.append(row)
+    return rows, regressions
+
+
+COMPARABLE = (
+    "backend",
+    "fake_latency_ms",
+    "dataset",
+    "seed",
+    "requests",
+    "concurrency",
+)
+
+
+def mismatched_settings(
+    baseline: Dict[str, Any], candidate: Dict[str, Any]
+) -> List[str]:
+    """
+    Lists the run settings that differ between two results files, which makes their numbers incomparable.
+    """
+    return [
+        key
+        for key in COMPARABLE
+        if baseline["meta"].get(key) != candidate["meta"].get(key)
+    ]
+
+
+def format_results(run: Dict[str, Any]) -> str:
+    lines = [
+        f"{'scenario':<28} {'rps':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'cpu ms':>9} {'db/req':>7} {'errors':>7}"
+    ]
+    for name, result in run["results"].items():
+        latency = result["latency_ms"]
+        lines.append(
+            f"{name:<28} {result['throughput_rps']:>9.1f} {latency['p50']:>9.2f}"
+            f" {latency['p95']:>9.2f} {latency['p99']:>9.2f}"
+            f" {result.get('cpu_ms_per_request', 0.0):>9.3f}"
+            f" {result.get('queries_per_request', 0.0):>7.2f} {result['errors']:>7}"
+        )
+    missing = run["meta"]["uncovered_routes"]
+    if missing:
+        lines.append(f"Routes without a scenario: {', '.join(missing)}")
+    return "\n".join(lines)
+
+
+def format_comparison(rows: List[Dict[str, Any]], regressions: List[str]) -> str:
+    def cell(value: Tuple[float, float, Optional[float]]) -> str:
+        before, after, change = value
+        delta = f"{change:+.1f}%" if change is not None else "n/a"
+        return f"{before:.2f}->{after:.2f} ({delta})"
+
+    lines = [
+        f"{'scenario':<28} {'p50 ms':>24} {'p95 ms':>24} {'p99 ms':>24} {'rps':>26} {'cpu ms':>24} {'db/req':>24}"
+    ]
+    for row in rows:
+        marker = " REGRESSED" if row["scenario"] in regressions else ""
+        lines.append(
+            f"{row['scenario']:<28} {cell(row['p50']):>24} {cell(row['p95']):>24}"
+            f" {cell(row['p99']):>24} {cell(row['throughput_rps']):>26}"
+            f" {cell(row['cpu_ms_per_request']):>24}"
+            f" {cell(row['queries_per_request']):>24}{marker}"
+        )
+    return "\n".join(lines)
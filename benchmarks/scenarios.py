@@ -0,0 +1,507 @@
+import collections
+import itertools
+import json
+import random
+from datetime import timedelta
+from typing import Any, Awaitable, Callable, Dict, List, NamedTuple, Optional, Tuple
+
+import httpx
+import project.auth
+from benchmarks.dataset import (
+    ADJECTIVES,
+    EPOCH,
+    EVENT_TYPES,
+    LOCATIONS,
+    PASSWORD,
+    TOPICS,
+    Dataset,
+)
+
+
+class BenchRequest(NamedTuple):
+    """
+    One HTTP request issued by a scenario.
+    """
+
+    method: str
+    url: str
+    params: Optional[Dict[str, Any]] = None
+    headers: Optional[Dict[str, str]] = None
+    content: Optional[bytes] = None
+
+
+class BenchContext:
+    """
+    State shared by the scenarios of a run: the seeded dataset, a token for every user and a seeded random
+    generator, so that two runs with the same seed issue the same requests.
+    """
+
+    def __init__(self, dataset: Dataset, seed: int):
+        self.dataset = dataset
+        self.rng = random.Random(seed)
+        self.counter = itertools.count()
+        self.tokens = {
+            user["id"]: project.auth.issue_access_token(user["id"], user["role"])
+            for user in dataset.users
+        }
+        feedback_counts = collections.Counter(
+            row["eventId"] for row in dataset.feedback
+        )
+        self.hot_events = [
+            event_id for event_id, _ in feedback_counts.most_common(10)
+        ] or [event["id"] for event in dataset.events[:10]]
+        self.deletable: List[str] = []
+        self.editable: List[Tuple[str, str]] = []
+        self.cursors: Dict[str, str] = {}
+        self.etags: Dict[str, str] = {}
+
+    def user(self) -> dict:
+        return self.rng.choice(self.dataset.users)
+
+    def event_id(self) -> str:
+        return self.rng.choice(self.dataset.events)["id"]
+
+    def hot_event_id(self) -> str:
+        return self.rng.choice(self.hot_events)
+
+    def auth(self, user: Optional[dict] = None) -> Dict[str, str]:
+        user = user or self.user()
+        return {"Authorization": f"Bearer {self.tokens[user['id']]}"}
+
+    def admin_auth(self) -> Dict[str, str]:
+        # The dataset's first user is its administrator.
+        return self.auth(self.dataset.users[0])
+
+    def unique(self) -> int:
+        return next(self.counter)
+
+
+class Scenario(NamedTuple):
+    """
+    A benchmark of one route: how to build each request, which statuses count as success and an optional
+    untimed setup step run before warm-up.
+    """
+
+    name: str
+    route: str
+    build: Callable[[BenchContext], BenchRequest]
+    expected: Tuple[int, ...] = (200,)
+    setup: Optional[
+        Callable[[BenchContext, httpx.AsyncClient, int], Awaitable[None]]
+    ] = None
+
+
+def event_params(ctx: BenchContext) -> Dict[str, Any]:
+    topic = ctx.rng.choice(TOPICS)
+    return {
+        "title": f"Benchmark {topic} Session {ctx.unique()}",
+        "description": f"A {topic.lower()} session created by the benchmark suite.",
+        "date": f"2026-{ctx.rng.randint(1, 12):02d}-{ctx.rng.randint(1, 28):02d}T18:00:00",
+        "location": ctx.rng.choice(LOCATIONS),
+    }
+
+
+def bulk_body(items: List[dict]) -> bytes:
+    return "\n".join(json.dumps(item) for item in items).encode("utf-8")
+
+
+async def _create_deletable(
+    ctx: BenchContext, client: httpx.AsyncClient, count: int
+) -> None:
+    for _ in range(count):
+        response = await client.post(
+            "/event/create", params=event_params(ctx), headers=ctx.auth()
+        )
+        ctx.deletable.append(response.json()["event_id"])
+
+
+async def _create_editable(
+    ctx: BenchContext, client: httpx.AsyncClient, count: int
+) -> None:
+    # Every edit moves its event to a new version, so each request gets an event of its own and its ETag.
+    for _ in range(count):
+        response = await client.post(
+            "/event/create", params=event_params(ctx), headers=ctx.auth()
+        )
+        event_id = response.json()["event_id"]
+        response = await client.get(f"/event/display/{event_id}")
+        ctx.editable.append((event_id, response.headers["etag"]))
+
+
+def _conditional_edit(ctx: BenchContext) -> BenchRequest:
+    event_id, etag = ctx.editable.pop()
+    return BenchRequest(
+        "PUT",
+        f"/event/edit/{event_id}",
+        params=event_params(ctx),
+        headers={"If-Match": etag},
+    )
+
+
+async def _fetch_cursors(
+    ctx: BenchContext, client: httpx.AsyncClient, count: int
+) -> None:
+    for event_id in ctx.hot_events:
+        response = await client.get(f"/feedback/view/{event_id}")
+        cursor = response.json().get("next_cursor")
+        if cursor:
+            ctx.cursors[event_id] = cursor
+
+
+async def _fetch_etags(
+    ctx: BenchContext, client: httpx.AsyncClient, count: int
+) -> None:
+    for event_id in ctx.hot_events:
+        response = await client.get(f"/event/display/{event_id}")
+        ctx.etags[event_id] = response.headers["etag"]
+
+
+def _day(ctx: BenchContext) -> str:
+    # Event dates are spread over 180 days either side of EPOCH.
+    day = EPOCH + timedelta(days=ctx.rng.randint(-180, 150))
+    return day.strftime("%Y-%m-%d")
+
+
+def _date_range(ctx: BenchContext) -> BenchRequest:
+    offset = ctx.rng.randint(-180, 150)
+    start, end = (EPOCH + timedelta(days=offset + days) for days in (0, 13))
+    return BenchRequest(
+        "GET",
+        "/search/events",
+        params={"from": start.strftime("%Y-%m-%d"), "to": end.strftime("%Y-%m-%d")},
+    )
+
+
+def _paged_feedback(ctx: BenchContext) -> BenchRequest:
+    event_id = ctx.rng.choice(list(ctx.cursors) or ctx.hot_events)
+    return BenchRequest(
+        "GET",
+        f"/feedback/view/{event_id}",
+        params={"cursor": ctx.cursors[event_id]} if event_id in ctx.cursors else None,
+    )
+
+
+def _conditional_display(ctx: BenchContext) -> BenchRequest:
+    event_id = ctx.rng.choice(list(ctx.etags))
+    return BenchRequest(
+        "GET",
+        f"/event/display/{event_id}",
+        headers={"If-None-Match": ctx.etags[event_id]},
+    )
+
+
+SCENARIOS: List[Scenario] = [
+    Scenario(
+        "view_profile",
+        "GET /user/profile/view",
+        lambda ctx: BenchRequest("GET", "/user/profile/view", headers=ctx.auth()),
+    ),
+    Scenario(
+        "display_event",
+        "GET /event/display/{id}",
+        lambda ctx: BenchRequest("GET", f"/event/display/{ctx.event_id()}"),
+    ),
+    Scenario(
+        "similar_events",
+        "GET /event/{id}/similar",
+        lambda ctx: BenchRequest("GET", f"/event/{ctx.event_id()}/similar"),
+    ),
+    Scenario(
+        "display_event_hot",
+        "GET /event/display/{id}",
+        lambda ctx: BenchRequest("GET", f"/event/display/{ctx.hot_event_id()}"),
+    ),
+    Scenario(
+        "display_event_not_modified",
+        "GET /event/display/{id}",
+        _conditional_display,
+        expected=(304,),
+        setup=_fetch_etags,
+    ),
+    Scenario(
+        "display_event_fields",
+        "GET /event/display/{id}",
+        lambda ctx: BenchRequest(
+            "GET",
+            f"/event/display/{ctx.event_id()}",
+            params={"fields": "title,date,location"},
+        ),
+    ),
+    Scenario(
+        "search_keywords",
+        "GET /search/events",
+        lambda ctx: BenchRequest(
+            "GET",
+            "/search/events",
+            params={"keywords": ctx.rng.choice(TOPICS).lower()},
+        ),
+    ),
+    Scenario(
+        "search_filters",
+        "GET /search/events",
+        lambda ctx: BenchRequest(
+            "GET",
+            "/search/events",
+            params={"location": ctx.rng.choice(LOCATIONS).lower()},
+        ),
+    ),
+    Scenario(
+        "search_type_facets",
+        "GET /search/events",
+        lambda ctx: BenchRequest(
+            "GET",
+            "/search/events",
+            params={
+                "type": ctx.rng.choice(list(EVENT_TYPES.values())).lower(),
+                "facets": "true",
+            },
+        ),
+    ),
+    Scenario(
+        "search_keywords_facets",
+        "GET /search/events",
+        lambda ctx: BenchRequest(
+            "GET",
+            "/search/events",
+            params={"keywords": ctx.rng.choice(TOPICS).lower(), "facets": "true"},
+        ),
+    ),
+    Scenario(
+        "search_date",
+        "GET /search/events",
+        lambda ctx: BenchRequest("GET", "/search/events", params={"date": _day(ctx)}),
+    ),
+    Scenario("search_date_range", "GET /search/events", _date_range),
+    Scenario(
+        "search_keywords_date_range",
+        "GET /search/events",
+        lambda ctx: BenchRequest(
+            "GET",
+            "/search/events",
+            params={
+                "keywords": ctx.rng.choice(TOPICS).lower(),
+                **_date_range(ctx).params,
+            },
+        ),
+    ),
+    Scenario(
+        "upcoming_events",
+        "GET /events/upcoming",
+        lambda ctx: BenchRequest(
+            "GET", "/events/upcoming", params={"from": _day(ctx), "days": 30}
+        ),
+    ),
+    Scenario(
+        "suggest_events",
+        "GET /events/suggest",
+        lambda ctx: BenchRequest(
+            "GET",
+            "/events/suggest",
+            params={"q": ctx.rng.choice(ADJECTIVES)[: ctx.rng.randint(1, 6)]},
+        ),
+    ),
+    Scenario(
+        "suggest_locations",
+        "GET /locations/suggest",
+        lambda ctx: BenchRequest(
+            "GET",
+            "/locations/suggest",
+            params={"prefix": ctx.rng.choice(LOCATIONS)[:2].lower()},
+        ),
+    ),
+    Scenario(
+        "search_fields",
+        "GET /search/events",
+        lambda ctx: BenchRequest(
+            "GET", "/search/events", params={"fields": "id,title,date"}
+        ),
+    ),
+    Scenario(
+        "view_feedback",
+        "GET /feedback/view/{eventId}",
+        lambda ctx: BenchRequest("GET", f"/feedback/view/{ctx.hot_event_id()}"),
+    ),
+    Scenario(
+        "view_feedback_next_page",
+        "GET /feedback/view/{eventId}",
+        _paged_feedback,
+        setup=_fetch_cursors,
+    ),
+    Scenario(
+        "rating_summary",
+        "GET /feedback/summary/{eventId}",
+        lambda ctx: BenchRequest("GET", f"/feedback/summary/{ctx.event_id()}"),
+    ),
+    Scenario(
+        "export_feedback",
+        "GET /feedback/export/{eventId}",
+        lambda ctx: BenchRequest(
+            "GET",
+            f"/feedback/export/{ctx.hot_event_id()}",
+            params={"format": ctx.rng.choice(["ndjson", "csv"])},
+        ),
+    ),
+    Scenario(
+        "cache_stats",
+        "GET /admin/cache/stats",
+        lambda ctx: BenchRequest("GET", "/admin/cache/stats", headers=ctx.admin_auth()),
+    ),
+    Scenario(
+        "single_flight_stats",
+        "GET /admin/singleflight/stats",
+        lambda ctx: BenchRequest(
+            "GET", "/admin/singleflight/stats", headers=ctx.admin_auth()
+        ),
+    ),
+    Scenario(
+        "rate_limit_stats",
+        "GET /admin/rate-limit/stats",
+        lambda ctx: BenchRequest(
+            "GET", "/admin/rate-limit/stats", headers=ctx.admin_auth()
+        ),
+    ),
+    Scenario(
+        "metrics",
+        "GET /metrics",
+        lambda ctx: BenchRequest("GET", "/metrics"),
+    ),
+    Scenario(
+        "readiness",
+        "GET /health/ready",
+        lambda ctx: BenchRequest("GET", "/health/ready"),
+    ),
+    Scenario(
+        "profiles",
+        "GET /admin/profiles",
+        lambda ctx: BenchRequest("GET", "/admin/profiles", headers=ctx.admin_auth()),
+    ),
+    Scenario(
+        "slow_queries",
+        "GET /admin/slow-queries",
+        lambda ctx: BenchRequest(
+            "GET", "/admin/slow-queries", headers=ctx.admin_auth()
+        ),
+    ),
+    Scenario(
+        "top_queries",
+        "GET /admin/search/top-queries",
+        lambda ctx: BenchRequest(
+            "GET", "/admin/search/top-queries", headers=ctx.admin_auth()
+        ),
+    ),
+    Scenario(
+        "authenticate_user",
+        "POST /user/authenticate",
+        lambda ctx: BenchRequest(
+            "POST",
+            "/user/authenticate",
+            params={"email": ctx.user()["email"], "password": PASSWORD},
+        ),
+    ),
+    Scenario(
+        "register_user",
+        "POST /user/register",
+        lambda ctx: BenchRequest(
+            "POST",
+            "/user/register",
+            params={
+                "email": f"new{ctx.unique()}-{ctx.rng.getrandbits(32)}@bench.example",
+                "password": PASSWORD,
+            },
+        ),
+    ),
+    Scenario(
+        "edit_profile",
+        "PUT /user/profile/edit",
+        lambda ctx: BenchRequest(
+            "PUT",
+            "/user/profile/edit",
+            params={
+                "email": ctx.user()["email"],
+                "name": "Benchmark User",
+                "bio": "Edited by the benchmark suite.",
+                "avatar_url": "https://bench.example/avatar.png",
+            },
+        ),
+    ),
+    Scenario(
+        "create_event",
+        "POST /event/create",
+        lambda ctx: BenchRequest(
+            "POST", "/event/create", params=event_params(ctx), headers=ctx.auth()
+        ),
+    ),
+    Scenario(
+        "edit_event",
+        "PUT /event/edit/{id}",
+        lambda ctx: BenchRequest(
+            "PUT", f"/event/edit/{ctx.event_id()}", params=event_params(ctx)
+        ),
+    ),
+    Scenario(
+        "edit_event_if_match",
+        "PUT /event/edit/{id}",
+        _conditional_edit,
+        setup=_create_editable,
+    ),
+    Scenario(
+        "edit_event_stale",
+        "PUT /event/edit/{id}",
+        lambda ctx: BenchRequest(
+            "PUT",
+            f"/event/edit/{ctx.event_id()}",
+            params=event_params(ctx),
+            headers={"If-Match": '"0"'},
+        ),
+        expected=(412,),
+    ),
+    Scenario(
+        "delete_event",
+        "DELETE /event/delete/{id}",
+        lambda ctx: BenchRequest("DELETE", f"/event/delete/{ctx.deletable.pop()}"),
+        setup=_create_deletable,
+    ),
+    Scenario(
+        "submit_feedback",
+        "POST /feedback/submit",
+        lambda ctx: BenchRequest(
+            "POST",
+            "/feedback/submit",
+            params={
+                "eventId": ctx.hot_event_id(),
+                "rating": ctx.rng.randint(1, 5),
+                "content": "Submitted by the benchmark suite.",
+            },
+            headers=ctx.auth(),
+        ),
+    ),
+    Scenario(
+        "bulk_create_events",
+        "POST /event/create/bulk",
+        lambda ctx: BenchRequest(
+            "POST",
+            "/event/create/bulk",
+            headers={**ctx.auth(), "Content-Type": "application/x-ndjson"},
+            content=bulk_body([event_params(ctx) for _ in range(100)]),
+        ),
+    ),
+    Scenario(
+        "bulk_submit_feedback",
+        "POST /feedback/submit/bulk",
+        lambda ctx: BenchRequest(
+            "POST",
+            "/feedback/submit/bulk",
+            headers={**ctx.auth(), "Content-Type": "application/x-ndjson"},
+            content=bulk_body(
+                [
+                    {
+                        "eventId": ctx.event_id(),
+                        "rating": ctx.rng.randint(1, 5),
+                        "content": "Submitted in bulk by the benchmark suite.",
+                    }
+                    for _ in range(100)
+                ]
+            ),
+        ),
+    ),
+]
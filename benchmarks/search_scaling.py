@@ -0,0 +1,95 @@
+import random
+import time
+from typing import Any, Dict, List, Sequence
+
+import prisma.models
+import project.pagination
+import project.search_events_service
+from benchmarks.dataset import TOPICS, generate_dataset
+from benchmarks.runner import PERCENTILES, percentile, serve
+
+EVENTS_PER_USER = 100
+
+# A frequent keyword lets the scan stop after a page of matches, one that matches nothing makes it read the
+# whole table, so both are timed.
+KEYWORDS = {
+    "frequent": [topic.lower() for topic in TOPICS],
+    "unmatched": ["zebra", "quokka", "lute", "fjord"],
+}
+
+
+def _summarize(latencies: List[float]) -> Dict[str, float]:
+    latencies.sort()
+    return {f"p{p}": percentile(latencies, p) for p in PERCENTILES}
+
+
+async def measure_search_scaling(
+    backend: str, sizes: Sequence[int], searches: int, seed: int, reset: bool = False
+) -> Dict[str, Any]:
+    """
+    Times keyword searches at several table sizes, through the search index and through the case-insensitive
+    LIKE scan over titles and descriptions that the index replaced. Both return the first page of matches;
+    the scan is ordered the way keyword-less searches are.
+
+    Each size is seeded and served from scratch. With the "postgres" backend, only the first size needs
+    `reset`; the later ones replace the rows seeded by the previous size.
+    """
+    limit = project.pagination.DEFAULT_PAGE_SIZE
+    results = []
+    for position, size in enumerate(sizes):
+        dataset = generate_dataset(max(1, size // EVENTS_PER_USER), size, 0, seed)
+        rng = random.Random(seed)
+        async with serve(backend, dataset, reset=reset or position > 0):
+            for kind, choices in KEYWORDS.items():
+                keywords = [rng.choice(choices) for _ in range(searches)]
+                indexed: List[float] = []
+                for keyword in keywords:
+                    started = time.perf_counter()
+                    await project.search_events_service.search_events(
+                        keywords=keyword, limit=limit
+                    )
+                    indexed.append((time.perf_counter() - started) * 1000)
+                scanned: List[float] = []
+                for keyword in keywords:
+                    started = time.perf_counter()
+                    await prisma.models.Event.prisma().find_many(
+                        where={
+                            "OR": [
+                                {"title": {"contains": keyword, "mode": "insensitive"}},
+                                {
+                                    "description": {
+                                        "contains": keyword,
+                                        "mode": "insensitive",
+                                    }
+                                },
+                            ]
+                        },
+                        order=[{"createdAt": "desc"}, {"id": "desc"}],
+                        take=limit + 1,
+                    )
+                    scanned.append((time.perf_counter() - started) * 1000)
+                results.append(
+                    {
+                        "events": size,
+                        "keywords": kind,
+                        "index_ms": _summarize(indexed),
+                        "scan_ms": _summarize(scanned),
+                    }
+                )
+    return {"backend": backend, "searches": searches, "sizes": results}
+
+
+def format_search_scaling(result: Dict[str, Any]) -> str:
+    lines = [
+        f"{result['searches']} searches per size and kind of keyword, {result['backend']} backend",
+        f"{'events':>9} {'keywords':<10} {'index p50':>10} {'index p95':>10}"
+        f" {'scan p50':>10} {'scan p95':>10}",
+    ]
+    for size in result["sizes"]:
+        index, scan = size["index_ms"], size["scan_ms"]
+        lines.append(
+            f"{size['events']:>9} {size['keywords']:<10} {index['p50']:>10.3f} {index['p95']:>10.3f}"
+            f" {scan['p50']:>10.3f} {scan['p95']:>10.3f}"
+        )
+    lines.append("Latencies in ms.")
+    return "\n".join(lines)
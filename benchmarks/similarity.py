@@ -0,0 +1,89 @@
+import random
+import time
+from typing import Any, Dict, List
+
+import numpy
+import project.embeddings
+import project.similar_events_service
+from benchmarks.dataset import generate_dataset
+from benchmarks.runner import PERCENTILES, percentile, serve
+
+# Neighbours scoring within this of the k-th exact neighbour count as found: many events tie, and the stored
+# vectors are rounded.
+TIE_TOLERANCE = 1e-4
+
+
+def exact_neighbours(matrix: numpy.ndarray, row: int, k: int) -> numpy.ndarray:
+    """
+    Scores one event against every other by brute force and returns the k highest similarities, best first.
+    Rows are unit vectors, so a matrix product gives every cosine similarity at once.
+    """
+    scores = matrix @ matrix[row]
+    scores[row] = -numpy.inf
+    top = numpy.argpartition(-scores, k)[:k]
+    return numpy.sort(scores[top])[::-1]
+
+
+async def measure_similarity(
+    backend: str, events: int, queries: int, k: int, seed: int, reset: bool = False
+) -> Dict[str, Any]:
+    """
+    Compares `/event/{id}/similar`, answered from the HNSW index, with brute-force cosine similarity in NumPy
+    over the same embeddings: how many of the true k nearest neighbours it finds, and how long each takes.
+    """
+    dataset = generate_dataset(1, events, 0, seed)
+    zero = [0.0] * project.embeddings.EMBEDDING_DIMENSIONS
+    matrix = numpy.array(
+        [
+            project.embeddings.embed(event["title"], event["description"]) or zero
+            for event in dataset.events
+        ],
+        dtype=numpy.float32,
+    )
+    rng = random.Random(seed)
+    rows = [rng.randrange(len(dataset.events)) for _ in range(queries)]
+    ann_ms: List[float] = []
+    exact_ms: List[float] = []
+    recalls: List[float] = []
+    async with serve(backend, dataset, reset=reset):
+        for row in rows:
+            started = time.perf_counter()
+            response = await project.similar_events_service.similar_events(
+                dataset.events[row]["id"], k
+            )
+            ann_ms.append((time.perf_counter() - started) * 1000)
+            started = time.perf_counter()
+            exact = exact_neighbours(matrix, row, k)
+            exact_ms.append((time.perf_counter() - started) * 1000)
+            found = sum(
+                1
+                for event in response.events
+                if event.similarity >= exact[-1] - TIE_TOLERANCE
+            )
+            recalls.append(min(found, k) / k)
+    ann_ms.sort()
+    exact_ms.sort()
+    return {
+        "backend": backend,
+        "events": events,
+        "queries": queries,
+        "k": k,
+        "recall": sum(recalls) / len(recalls),
+        "latency_ms": {
+            "ann": {f"p{p}": percentile(ann_ms, p) for p in PERCENTILES},
+            "exact": {f"p{p}": percentile(exact_ms, p) for p in PERCENTILES},
+        },
+    }
+
+
+def format_similarity(result: Dict[str, Any]) -> str:
+    lines = [
+        f"{result['events']} events on {result['backend']}, {result['queries']} queries,"
+        f" recall@{result['k']} {result['recall']:.3f}",
+        f"{'method':<12} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}",
+    ]
+    for method, latency in result["latency_ms"].items():
+        lines.append(
+            f"{method:<12} {latency['p50']:>9.3f} {latency['p95']:>9.3f} {latency['p99']:>9.3f}"
+        )
+    return "\n".join(lines)
@@ -0,0 +1,58 @@
+import random
+import time
+import uuid
+from typing import Any, Dict, List
+
+import project.auth
+from benchmarks.runner import PERCENTILES, percentile
+
+
+def measure_token_verify(verifications: int, seed: int) -> Dict[str, Any]:
+    """
+    Times `verify_access_token` alone, in microseconds: for a token already in the verified-token cache, for a
+    token checked from scratch (the cache is cleared before each call, outside the timing), and for a forged
+    token, which is never cached and fails the signature check every time.
+    """
+    rng = random.Random(seed)
+    token = project.auth.issue_access_token(
+        str(uuid.UUID(int=rng.getrandbits(128))), "LEARNER"
+    )
+    payload, _, signature = token.partition(".")
+    forged = f"{payload}.{signature[::-1]}"
+    cache = project.auth.verified_tokens
+    samples: Dict[str, List[float]] = {"cached": [], "cold": [], "forged": []}
+    project.auth.verify_access_token(token)
+    for _ in range(verifications):
+        started = time.perf_counter_ns()
+        project.auth.verify_access_token(token)
+        samples["cached"].append((time.perf_counter_ns() - started) / 1000)
+    for _ in range(verifications):
+        cache.clear()
+        started = time.perf_counter_ns()
+        project.auth.verify_access_token(token)
+        samples["cold"].append((time.perf_counter_ns() - started) / 1000)
+    for _ in range(verifications):
+        started = time.perf_counter_ns()
+        try:
+            project.auth.verify_access_token(forged)
+        except project.auth.InvalidTokenError:
+            pass
+        samples["forged"].append((time.perf_counter_ns() - started) / 1000)
+    cache.clear()
+    results = {}
+    for case, latencies in samples.items():
+        latencies.sort()
+        results[case] = {f"p{p}": percentile(latencies, p) for p in PERCENTILES}
+    return {"verifications": verifications, "latency_us": results}
+
+
+def format_token_verify(result: Dict[str, Any]) -> str:
+    lines = [
+        f"{result['verifications']} verifications per case",
+        f"{'token':<8} {'p50 us':>9} {'p95 us':>9} {'p99 us':>9}",
+    ]
+    for case, latency in result["latency_us"].items():
+        lines.append(
+            f"{case:<8} {latency['p50']:>9.2f} {latency['p95']:>9.2f} {latency['p99']:>9.2f}"
+        )
+    return "\n".join(lines)
@@ -0,0 +1,104 @@
+import random
+import resource
+import time
+import uuid
+from datetime import timedelta
+from typing import Any, Dict, List
+
+import prisma.models
+import project.search_index
+import project.suggest_events_service
+from benchmarks.dataset import ADJECTIVES, EPOCH, FORMATS, LOCATIONS, TOPICS
+from benchmarks.runner import PERCENTILES, percentile
+
+# Typed prefixes are grouped by length, since short ones match the most titles and cost the most.
+PREFIX_LENGTHS = {"1 char": (1, 1), "2-3 chars": (2, 3), "4-8 chars": (4, 8)}
+
+
+def make_title(rng: random.Random) -> str:
+    topic, format = rng.choice(TOPICS), rng.choice(FORMATS)
+    shape = rng.random()
+    if shape < 0.4:
+        return f"{rng.choice(ADJECTIVES)} {topic} {format}"
+    if shape < 0.8:
+        return f"{topic} {format} in {rng.choice(LOCATIONS)}"
+    return f"{topic} {format} #{rng.randint(1, 10000)}"
+
+
+def build_index(titles: int, seed: int) -> project.search_index.EventSearchIndex:
+    """
+    Indexes `titles` synthetic events the way startup does: cleared, added one by one, then sorted once.
+    Descriptions are left empty, since only titles matter here.
+    """
+    rng = random.Random(seed)
+    index = project.search_index.EventSearchIndex()
+    index.clear()
+    for _ in range(titles):
+        date = EPOCH + timedelta(days=rng.randint(-180, 180), hours=rng.randint(8, 20))
+        index.add(
+            prisma.models.Event.model_construct(
+                id=str(uuid.UUID(int=rng.getrandbits(128))),
+                title=make_title(rng),
+                description="",
+                date=date,
+                location=rng.choice(LOCATIONS),
+                type="OTHER",
+            )
+        )
+    index.sort_titles()
+    return index
+
+
+def measure_typeahead(titles: int, lookups: int, seed: int) -> Dict[str, Any]:
+    """
+    Times title suggestions against an index of `titles` events, as the user would type them: every prefix of
+    a real title, from its first character up to eight.
+    """
+    rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    started = time.perf_counter()
+    index = build_index(titles, seed)
+    build_ms = (time.perf_counter() - started) * 1000
+    rss_after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    rng = random.Random(seed + 1)
+    now = EPOCH
+    latencies: Dict[str, List[float]] = {group: [] for group in PREFIX_LENGTHS}
+    for _ in range(lookups):
+        title = make_title(rng)
+        for group, (shortest, longest) in PREFIX_LENGTHS.items():
+            prefix = title[: rng.randint(shortest, longest)]
+            started = time.perf_counter()
+            index.suggest(
+                prefix, project.suggest_events_service.DEFAULT_SUGGESTIONS, now
+            )
+            latencies[group].append((time.perf_counter() - started) * 1000)
+
+    results = {}
+    for group, samples in latencies.items():
+        samples.sort()
+        results[group] = {
+            **{f"p{p}": percentile(samples, p) for p in PERCENTILES},
+            "max": samples[-1],
+        }
+    return {
+        "titles": titles,
+        "lookups": lookups,
+        "build_ms": build_ms,
+        # ru_maxrss is in kilobytes on Linux. It only grows, so this is the peak the index added.
+        "index_mb": (rss_after - rss_before) / 1024,
+        "latency_ms": results,
+    }
+
+
+def format_typeahead(result: Dict[str, Any]) -> str:
+    lines = [
+        f"{result['titles']} titles indexed in {result['build_ms'] / 1000:.1f} s,"
+        f" {result['index_mb']:.0f} MB; {result['lookups']} lookups per prefix length",
+        f"{'prefix':<12} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'max ms':>9}",
+    ]
+    for group, latency in result["latency_ms"].items():
+        lines.append(
+            f"{group:<12} {latency['p50']:>9.3f} {latency['p95']:>9.3f}"
+            f" {latency['p99']:>9.3f} {latency['max']:>9.3f}"
+        )
+    return "\n".join(lines)
@@ -1,10 +1,17 @@
+import logging
 from typing import Optional
 
-import bcrypt
 import prisma
 import prisma.models
+import project.auth
+import project.cache
+import project.invalidation
+import project.metrics
+import project.passwords
 from pydantic import BaseModel
 
+logger = logging.getLogger(__name__)
+
 
 class AuthenticateUserResponse(BaseModel):
     """
@@ -13,17 +20,22 @@ class AuthenticateUserResponse(BaseModel):
 
     status: str
     access_token: Optional[str] = None
+    expires_in: Optional[int] = None
     user_id: Optional[str] = None
     error: Optional[str] = None
 
 
+@project.metrics.measure_queries
 async def authenticate_user(email: str, password: str) -> AuthenticateUserResponse:
     """
     Endpoint for user login/authentication.
 
     This function authenticates a user based on their email and password. It checks if the user exists in the database,
     and if the password matches the one stored. If authentication is successful, it returns a response with a status
-    indicating success, an access token, and the user's ID. If not, it returns a failure status with an error message.
+    indicating success, a signed access token, and the user's ID. If not, it returns a failure status with an error message.
+    Password verification runs in the bcrypt worker pool. When the stored hash was made with a different cost factor
+    than the configured one, it is transparently replaced after a successful login; if that fails, the login
+    still succeeds and the hash is replaced at a later one.
 
     Args:
     email (str): The email address associated with the user's account.
@@ -33,13 +45,25 @@ async def authenticate_user(email: str, password: str) -> AuthenticateUserRespon
     AuthenticateUserResponse: Response model for user authentication. On successful authentication, provides access token and basic user info.
     """
     user = await prisma.models.User.prisma().find_unique(where={"email": email})
-    if not user or not bcrypt.checkpw(
-        password.encode("utf-8"), user.password.encode("utf-8")
-    ):
+    if not user or not await project.passwords.verify_password(password, user.password):
         return AuthenticateUserResponse(
             status="Failure", error="Invalid email or password"
         )
-    access_token = "generated_access_token_stub"
+    if project.passwords.needs_rehash(user.password):
+        try:
+            await prisma.models.User.prisma().update(
+                where={"id": user.id},
+                data={"password": await project.passwords.hash_password(password)},
+            )
+            project.invalidation.invalidate(project.cache.profile_cache, user.id)
+        except project.passwords.PasswordHasherBusyError:
+            pass
+        except Exception:
+            logger.exception("Could not rehash the password of user %s", user.id)
+    access_token = project.auth.issue_access_token(user.id, user.role)
     return AuthenticateUserResponse(
-        status="Success", access_token=access_token, user_id=user.id
+        status="Success",
+        access_token=access_token,
+        expires_in=project.auth.ACCESS_TOKEN_TTL_SECONDS,
+        user_id=user.id,
     )
@@ -0,0 +1,112 @@
+import json
+import os
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple, Type, TypeVar
+
+from pydantic import BaseModel, ValidationError
+
+BULK_CHUNK_SIZE = int(os.getenv("BULK_CHUNK_SIZE", "500"))
+
+MAX_BULK_ITEMS = int(os.getenv("MAX_BULK_ITEMS", "10000"))
+
+NDJSON_CONTENT_TYPES = ("application/x-ndjson", "application/ndjson", "application/jsonl")
+
+InputT = TypeVar("InputT", bound=BaseModel)
+
+T = TypeVar("T")
+
+
+class BulkPayloadError(ValueError):
+    """
+    Raised when a bulk request body cannot be parsed as NDJSON or as a JSON array, or holds too many items.
+    """
+
+
+class BulkItemResult(BaseModel):
+    """
+    The outcome for one item of a bulk request, identified by its position in the payload.
+    """
+
+    index: int
+    status: str
+    id: Optional[str] = None
+    error: Optional[str] = None
+
+
+class BulkResponse(BaseModel):
+    """
+    Response model for bulk ingestion endpoints: totals plus one result per submitted item, in payload order.
+    """
+
+    created: int
+    rejected: int
+    results: List[BulkItemResult]
+
+
+def parse_records(body: bytes, content_type: Optional[str]) -> List[Any]:
+    """
+    Decodes a bulk request body into a list of raw records.
+
+    Args:
+        body (bytes): The raw request body.
+        content_type (Optional[str]): The request's Content-Type. NDJSON types are read one record per line,
+            anything else is expected to be a JSON array.
+
+    Returns:
+        List[Any]: The decoded records, not yet validated.
+
+    Raises:
+        BulkPayloadError: If the body is malformed or holds more than MAX_BULK_ITEMS records.
+    """
+    media_type = (content_type or "").split(";")[0].strip().lower()
+    try:
+        if media_type in NDJSON_CONTENT_TYPES:
+            records = [json.loads(line) for line in body.splitlines() if line.strip()]
+        else:
+            records = json.loads(body)
+    except ValueError as e:
+        raise BulkPayloadError(f"Malformed bulk payload: {e}")
+    if not isinstance(records, list):
+        raise BulkPayloadError("Bulk payload must be a JSON array or NDJSON")
+    if len(records) > MAX_BULK_ITEMS:
+        raise BulkPayloadError(f"Bulk payload exceeds {MAX_BULK_ITEMS} items")
+    return records
+
+
+def validate_records(
+    records: Sequence[Any], model: Type[InputT]
+) -> Tuple[List[Tuple[int, InputT]], Dict[int, BulkItemResult]]:
+    """
+    Validates every record against an input model in a single pass.
+
+    Returns:
+        Tuple[List[Tuple[int, InputT]], Dict[int, BulkItemResult]]: The valid items with their payload index,
+        and an "invalid" result for each record that failed validation, keyed by payload index.
+    """
+    valid: List[Tuple[int, InputT]] = []
+    results: Dict[int, BulkItemResult] = {}
+    for index, record in enumerate(records):
+        try:
+            valid.append((index, model.model_validate(record)))
+        except ValidationError as e:
+            results[index] = BulkItemResult(
+                index=index,
+                status="invalid",
+                error="; ".join(
+                    f"{'.'.join(str(part) for part in error['loc']) or 'item'}: {error['msg']}"
+                    for error in e.errors()
+                ),
+            )
+    return valid, results
+
+
+def chunked(items: Sequence[T], size: int = BULK_CHUNK_SIZE) -> Iterator[Sequence[T]]:
+    for start in range(0, len(items), size):
+        yield items[start : start + size]
+
+
+def build_response(results: Dict[int, BulkItemResult]) -> BulkResponse:
+    ordered = [results[index] for index in sorted(results)]
+    created = sum(1 for result in ordered if result.status == "created")
+    return BulkResponse(
+        created=created, rejected=len(ordered) - created, results=ordered
+    )
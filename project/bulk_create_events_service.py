@@ -0,0 +1,93 @@
+import uuid
+from datetime import datetime
+from typing import Any, List
+
+import prisma
+import prisma.enums
+import prisma.models
+import project.bulk
+import project.embeddings
+import project.invalidation
+import project.locations
+import project.metrics
+import project.search_index
+from pydantic import BaseModel
+
+
+class EventInput(BaseModel):
+    """
+    A single event in a bulk import, with the same fields as the create event endpoint.
+    """
+
+    title: str
+    description: str
+    date: datetime
+    location: str
+    type: prisma.enums.EventType = prisma.enums.EventType.OTHER
+
+
+@project.metrics.measure_queries
+async def bulk_create_events(
+    records: List[Any], organizer_id: str
+) -> project.bulk.BulkResponse:
+    """
+    Endpoint for organizers to import many events at once.
+
+    All records are validated up front. Valid events are then written with one `create_many` statement per chunk
+    of BULK_CHUNK_SIZE rows, instead of one round-trip per event. Each chunk's distinct locations are interned
+    before it is written. IDs are generated here so that every item can be reported back. Each written chunk is
+    read back once to keep the search index in sync and embedded with one more statement, in the same
+    transaction as the write, so a chunk reported as failed left no events behind.
+
+    Args:
+        records (List[Any]): The decoded payload, one raw event object per item.
+        organizer_id (str): The ID of the authenticated organizer, taken from their access token.
+
+    Returns:
+        BulkResponse: Totals plus a per-item result, carrying the new event ID or the reason the item was rejected.
+
+    Example:
+        response = await bulk_create_events([{"title": "AI Conference", "description": "Talks", "date": "2024-06-01T09:00:00Z", "location": "Virtual"}], organizer_id)
+        print(response.created)  # should print 1
+    """
+    valid, results = project.bulk.validate_records(records, EventInput)
+    for chunk in project.bulk.chunked(valid):
+        ids = [str(uuid.uuid4()) for _ in chunk]
+        try:
+            location_ids = await project.locations.intern_locations(
+                item.location for _, item in chunk
+            )
+            async with prisma.get_client().tx() as transaction:
+                await prisma.models.Event.prisma(transaction).create_many(
+                    data=[
+                        {
+                            "id": event_id,
+                            "title": item.title,
+                            "description": item.description,
+                            "date": item.date,
+                            "location": item.location,
+                            "locationId": location_ids[item.location],
+                            "type": item.type,
+                            "organizerId": organizer_id,
+                        }
+                        for event_id, (_, item) in zip(ids, chunk)
+                    ]
+                )
+                events = await prisma.models.Event.prisma(transaction).find_many(
+                    where={"id": {"in": ids}}
+                )
+                await project.embeddings.store_embeddings(events, transaction)
+        except Exception as e:
+            for index, _ in chunk:
+                results[index] = project.bulk.BulkItemResult(
+                    index=index, status="failed", error=str(e)
+                )
+            continue
+        for event in events:
+            project.search_index.event_index.add(event)
+        project.invalidation.event_changed(*ids)
+        for event_id, (index, _) in zip(ids, chunk):
+            results[index] = project.bulk.BulkItemResult(
+                index=index, status="created", id=event_id
+            )
+    return project.bulk.build_response(results)
@@ -0,0 +1,119 @@
+import uuid
+from typing import Any, List
+
+import prisma
+import prisma.partials
+import project.bulk
+import project.cache
+import project.invalidation
+import project.metrics
+import project.view_rating_summary_service
+from pydantic import BaseModel, Field
+
+# Inserts a chunk of feedback and folds it into the rating aggregates, creating those that do not exist yet.
+# Aggregates are written in event ID order so that concurrent imports lock them in the same order.
+INSERT_QUERY = """/* bulk_insert_feedback */
+WITH "inserted" AS (
+  INSERT INTO "Feedback" ("id", "eventId", "rating", "content", "userId")
+  SELECT f."id", f."eventId", f."rating", f."content", $5::text
+  FROM unnest($1::text[], $2::text[], $3::int[], $4::text[]) AS f("id", "eventId", "rating", "content")
+  RETURNING "eventId", "rating"
+)
+INSERT INTO "EventRating" AS r
+  ("eventId", "ratingCount", "ratingSum", "rating1", "rating2", "rating3", "rating4", "rating5", "updatedAt")
+SELECT "eventId", COUNT(*), SUM("rating"),
+       COUNT(*) FILTER (WHERE "rating" = 1), COUNT(*) FILTER (WHERE "rating" = 2),
+       COUNT(*) FILTER (WHERE "rating" = 3), COUNT(*) FILTER (WHERE "rating" = 4),
+       COUNT(*) FILTER (WHERE "rating" = 5), CURRENT_TIMESTAMP
+FROM "inserted"
+GROUP BY "eventId"
+ORDER BY "eventId"
+ON CONFLICT ("eventId") DO UPDATE SET
+  "ratingCount" = r."ratingCount" + EXCLUDED."ratingCount",
+  "ratingSum" = r."ratingSum" + EXCLUDED."ratingSum",
+  "rating1" = r."rating1" + EXCLUDED."rating1",
+  "rating2" = r."rating2" + EXCLUDED."rating2",
+  "rating3" = r."rating3" + EXCLUDED."rating3",
+  "rating4" = r."rating4" + EXCLUDED."rating4",
+  "rating5" = r."rating5" + EXCLUDED."rating5",
+  "updatedAt" = EXCLUDED."updatedAt"
+"""
+
+
+class FeedbackInput(BaseModel):
+    """
+    A single feedback entry in a bulk import, with the same fields as the submit feedback endpoint.
+    """
+
+    eventId: str
+    rating: int = Field(
+        ge=project.view_rating_summary_service.MIN_RATING,
+        le=project.view_rating_summary_service.MAX_RATING,
+    )
+    content: str
+
+
+@project.metrics.measure_queries
+async def bulk_submit_feedback(
+    records: List[Any], user_id: str
+) -> project.bulk.BulkResponse:
+    """
+    Endpoint for importing many feedback entries at once, such as post-event survey results.
+
+    All records are validated up front, including a single lookup that checks every referenced event exists.
+    Valid entries are then written in chunks of BULK_CHUNK_SIZE rows. Each chunk is one statement that inserts
+    the feedback and adds it to the rating aggregates of the events it touches, so rating summaries stay exact
+    without holding a transaction open across round trips.
+
+    Args:
+        records (List[Any]): The decoded payload, one raw feedback object per item.
+        user_id (str): The ID of the authenticated user submitting the survey results, taken from their access token.
+
+    Returns:
+        BulkResponse: Totals plus a per-item result, carrying the new feedback ID or the reason the item was rejected.
+
+    Example:
+        response = await bulk_submit_feedback([{"eventId": "event123", "rating": 5, "content": "Great event!"}], user_id)
+        print(response.created)  # should print 1
+    """
+    valid, results = project.bulk.validate_records(records, FeedbackInput)
+    event_ids = list({item.eventId for _, item in valid})
+    known_event_ids = {
+        event.id
+        for event in await prisma.partials.EventKey.prisma().find_many(
+            where={"id": {"in": event_ids}}
+        )
+    }
+    writable = []
+    for index, item in valid:
+        if item.eventId in known_event_ids:
+            writable.append((index, item))
+        else:
+            results[index] = project.bulk.BulkItemResult(
+                index=index, status="invalid", error="eventId: Event not found"
+            )
+    for chunk in project.bulk.chunked(writable):
+        ids = [str(uuid.uuid4()) for _ in chunk]
+        try:
+            await prisma.get_client().execute_raw(
+                INSERT_QUERY,
+                ids,
+                [item.eventId for _, item in chunk],
+                [item.rating for _, item in chunk],
+                [item.content for _, item in chunk],
+                user_id,
+            )
+        except Exception as e:
+            for index, _ in chunk:
+                results[index] = project.bulk.BulkItemResult(
+                    index=index, status="failed", error=str(e)
+                )
+            continue
+        project.invalidation.invalidate(
+            project.cache.event_cache, *{item.eventId for _, item in chunk}
+        )
+        for feedback_id, (index, _) in zip(ids, chunk):
+            results[index] = project.bulk.BulkItemResult(
+                index=index, status="created", id=feedback_id
+            )
+    return project.bulk.build_response(results)
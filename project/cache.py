@@ -0,0 +1,238 @@
+import abc
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional, Tuple
+
+import project.singleflight
+from pydantic import BaseModel
+
+MISSING = object()
+
+
+class CacheStats(BaseModel):
+    """
+    Counters describing how a cache is performing, used to size it.
+    """
+
+    name: str
+    backend: str
+    size: int
+    maxsize: int
+    ttl_seconds: float
+    hits: int
+    misses: int
+    evictions: int
+    expirations: int
+    invalidations: int
+
+
+class CacheStatsResponse(BaseModel):
+    """
+    Response model listing the counters of every registered cache.
+    """
+
+    caches: List[CacheStats]
+
+
+class CacheBackend(abc.ABC):
+    """
+    Interface shared by all cache backends.
+
+    Readers call `version()` before loading a value from the database and pass it back to `set()`. A backend must
+    drop that `set()` if the key was invalidated in between, so that a slow read can never re-populate the cache
+    with data that a concurrent write has already replaced.
+
+    `get_or_load()` wraps that protocol and routes misses through a single-flight group, so concurrent misses on
+    the same key share one database query. Backends must call `flights.forget()` on invalidation so callers that
+    arrive after a write start a fresh load.
+    """
+
+    name: str
+    flights: project.singleflight.SingleFlight
+
+    async def get_or_load(
+        self, key: Hashable, load: Callable[[], Awaitable[Any]]
+    ) -> Any:
+        """
+        Returns the cached value for `key`, loading and caching it on a miss.
+
+        Args:
+            key (Hashable): The cache key, typically the arguments of the read.
+            load (Callable[[], Awaitable[Any]]): Reads the value from the database.
+
+        Returns:
+            Any: The cached or freshly loaded value.
+        """
+        value = self.get(key)
+        if value is not MISSING:
+            return value
+        return await self.flights.do(key, lambda: self._load(key, load))
+
+    async def _load(self, key: Hashable, load: Callable[[], Awaitable[Any]]) -> Any:
+        version = self.version()
+        value = await load()
+        self.set(key, value, version)
+        return value
+
+    @abc.abstractmethod
+    def get(self, key: Hashable) -> Any:
+        """
+        Returns the cached value, or MISSING when the key is absent or expired.
+        """
+
+    @abc.abstractmethod
+    def version(self) -> int:
+        """
+        Returns a counter that every invalidation advances, read before a load and passed back to `set()`.
+        """
+
+    @abc.abstractmethod
+    def set(self, key: Hashable, value: Any, version: Optional[int] = None) -> None:
+        """
+        Stores a value, unless `version` is given and the key was invalidated after that version was read.
+        """
+
+    @abc.abstractmethod
+    def invalidate(self, key: Hashable) -> None:
+        """
+        Drops the key and forgets its in-flight load.
+        """
+
+    @abc.abstractmethod
+    def clear(self) -> None:
+        """
+        Drops every entry, and refuses the fills of loads that started before.
+        """
+
+    @abc.abstractmethod
+    def stats(self) -> CacheStats:
+        """
+        Returns the counters served by the cache stats endpoint.
+        """
+
+
+class LRUCache(CacheBackend):
+    """
+    An in-process cache bounded both by entry count (least recently used entries are evicted first) and by age.
+
+    Invalidated keys are remembered as tombstones, bounded to `maxsize` like the entries themselves. When a
+    tombstone is dropped, its version becomes a floor below which fills are refused, which keeps the
+    stale-fill guarantee without unbounded memory.
+    """
+
+    def __init__(self, name: str, maxsize: int, ttl_seconds: float):
+        self.name = name
+        self.flights = project.singleflight.SingleFlight(name)
+        self.maxsize = maxsize
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._tombstones: "OrderedDict[Hashable, int]" = OrderedDict()
+        self._version = 0
+        self._version_floor = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def get(self, key: Hashable) -> Any:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return MISSING
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            self.expirations += 1
+            self.misses += 1
+            return MISSING
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def version(self) -> int:
+        return self._version
+
+    def set(self, key: Hashable, value: Any, version: Optional[int] = None) -> None:
+        if version is not None and (
+            version < self._version_floor or self._tombstones.get(key, -1) > version
+        ):
+            return
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, key: Hashable) -> None:
+        self._version += 1
+        self.flights.forget(key)
+        if self._entries.pop(key, None) is not None:
+            self.invalidations += 1
+        self._tombstones[key] = self._version
+        self._tombstones.move_to_end(key)
+        while len(self._tombstones) > self.maxsize:
+            _, dropped_version = self._tombstones.popitem(last=False)
+            self._version_floor = dropped_version
+
+    def clear(self) -> None:
+        self._version += 1
+        self._version_floor = self._version
+        self.flights.forget_all()
+        self._entries.clear()
+        self._tombstones.clear()
+
+    def stats(self) -> CacheStats:
+        return CacheStats(
+            name=self.name,
+            backend="memory",
+            size=len(self._entries),
+            maxsize=self.maxsize,
+            ttl_seconds=self.ttl_seconds,
+            hits=self.hits,
+            misses=self.misses,
+            evictions=self.evictions,
+            expirations=self.expirations,
+            invalidations=self.invalidations,
+        )
+
+
+caches: Dict[str, CacheBackend] = {}
+
+
+def create_cache(name: str, maxsize: int, ttl_seconds: float) -> CacheBackend:
+    """
+    Creates and registers a cache using the backend selected by the CACHE_BACKEND environment variable.
+
+    Args:
+        name (str): A unique name, also used as the prefix of the cache's environment variables.
+        maxsize (int): The default maximum number of entries, overridable with <NAME>_CACHE_SIZE.
+        ttl_seconds (float): The default entry lifetime, overridable with <NAME>_CACHE_TTL_SECONDS.
+
+    Returns:
+        CacheBackend: The new cache.
+    """
+    backend = os.getenv("CACHE_BACKEND", "memory")
+    maxsize = int(os.getenv(f"{name.upper()}_CACHE_SIZE", maxsize))
+    ttl_seconds = float(os.getenv(f"{name.upper()}_CACHE_TTL_SECONDS", ttl_seconds))
+    if backend != "memory":
+        raise ValueError(f"Unsupported cache backend: {backend}")
+    cache = LRUCache(name, maxsize, ttl_seconds)
+    caches[name] = cache
+    return cache
+
+
+event_cache = create_cache("event", maxsize=10000, ttl_seconds=300)
+
+profile_cache = create_cache("profile", maxsize=10000, ttl_seconds=300)
+
+
+async def cache_stats() -> CacheStatsResponse:
+    """
+    Endpoint for operators to inspect cache hit, miss and eviction counters.
+
+    Returns:
+        CacheStatsResponse: Response model listing the counters of every registered cache.
+    """
+    return CacheStatsResponse(caches=[cache.stats() for cache in caches.values()])
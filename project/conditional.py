@@ -0,0 +1,110 @@
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any, List, Mapping, NamedTuple, Optional
+
+from fastapi.responses import Response
+
+
+class PreconditionFailedError(Exception):
+    """
+    Raised when a conditional write finds the row at another version than the client's If-Match names.
+    """
+
+
+class Validators(NamedTuple):
+    """
+    The HTTP validators of a representation: a strong ETag and, when meaningful, its last modification time.
+    """
+
+    etag: str
+    last_modified: Optional[datetime] = None
+    cache_control: str = "no-cache"
+
+
+def make_etag(*parts: Any) -> str:
+    """
+    Builds a strong ETag from the values that determine a representation's bytes, such as the row ID, its
+    `updatedAt` and the requested fieldset.
+    """
+    digest = hashlib.blake2b(repr(parts).encode("utf-8"), digest_size=12).hexdigest()
+    return f'"{digest}"'
+
+
+def make_versioned_etag(version: int, *parts: Any) -> str:
+    """
+    Builds a strong ETag like make_etag, prefixed with the row's version counter (e.g. '"7.3b1f..."') so that a
+    write sending it back in If-Match can be checked by the database without reading the row first.
+    """
+    return f'"{version}.{make_etag(*parts)[1:]}'
+
+
+def expected_versions(headers: Mapping[str, str]) -> Optional[List[int]]:
+    """
+    Extracts the row versions a conditional write may apply to from If-Match.
+
+    Only the version prefix of each tag is compared, so a tag stays usable for writes when what it also covers,
+    such as the embedded rating summary, changes. A bare version ('"7"') is accepted as well. Weak tags never
+    match, as RFC 9110 requires strong comparison for If-Match.
+
+    Returns:
+        Optional[List[int]]: The acceptable versions, or None when the write is unconditional: no If-Match, or
+        If-Match: *. An empty list means no tag can match and the write must fail its precondition.
+    """
+    if_match = headers.get("if-match")
+    if if_match is None:
+        return None
+    versions = []
+    for tag in if_match.split(","):
+        tag = tag.strip()
+        if tag == "*":
+            return None
+        if not (len(tag) > 1 and tag[0] == tag[-1] == '"'):
+            continue
+        version = tag[1:-1].split(".", 1)[0]
+        if version.isdigit():
+            versions.append(int(version))
+    return versions
+
+
+def is_not_modified(headers: Mapping[str, str], validators: Validators) -> bool:
+    """
+    Evaluates If-None-Match and If-Modified-Since against the current validators.
+
+    As required by RFC 9110, If-Modified-Since is ignored whenever If-None-Match is present.
+
+    Returns:
+        bool: True if the client's copy is current and a 304 should be sent.
+    """
+    if_none_match = headers.get("if-none-match")
+    if if_none_match is not None:
+        tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+        return "*" in tags or validators.etag in tags
+    if_modified_since = headers.get("if-modified-since")
+    if if_modified_since and validators.last_modified:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=timezone.utc)
+        return validators.last_modified.replace(microsecond=0) <= since
+    return False
+
+
+def apply_validators(response: Response, validators: Validators) -> None:
+    response.headers["ETag"] = validators.etag
+    response.headers["Cache-Control"] = validators.cache_control
+    if validators.last_modified:
+        response.headers["Last-Modified"] = format_datetime(
+            validators.last_modified.astimezone(timezone.utc), usegmt=True
+        )
+
+
+def not_modified(validators: Validators) -> Response:
+    """
+    Builds the bodiless 304 response, repeating the validators as RFC 9110 requires.
+    """
+    response = Response(status_code=304)
+    apply_validators(response, validators)
+    return response
@@ -1,7 +1,13 @@
 from datetime import datetime
 
 import prisma
+import prisma.enums
 import prisma.models
+import project.embeddings
+import project.invalidation
+import project.locations
+import project.metrics
+import project.search_index
 from pydantic import BaseModel
 
 
@@ -15,10 +21,17 @@ class CreateEventResponse(BaseModel):
     title: str
     date: datetime
     location: str
+    type: prisma.enums.EventType
 
 
+@project.metrics.measure_queries
 async def create_event(
-    title: str, description: str, date: datetime, location: str
+    title: str,
+    description: str,
+    date: datetime,
+    location: str,
+    organizer_id: str,
+    type: prisma.enums.EventType = prisma.enums.EventType.OTHER,
 ) -> CreateEventResponse:
     """
     Endpoint for organizers to create a new event.
@@ -28,28 +41,36 @@ async def create_event(
         description (str): A detailed description of the event.
         date (datetime): The scheduled date and time for the event.
         location (str): The physical or virtual location where the event will take place.
+        organizer_id (str): The ID of the authenticated organizer, taken from their access token.
+        type (prisma.enums.EventType): The kind of event, OTHER unless given.
 
     Returns:
         CreateEventResponse: Provides the details of the created event along with a confirmation message.
 
     Example:
-        response = await create_event("AI Conference", "A conference about AI innovations", datetime.now(), "Virtual")
+        response = await create_event("AI Conference", "A conference about AI innovations", datetime.now(), "Virtual", organizer_id)
         print(response.message)  # should print "Event successfully created."
     """
-    current_organizer_id = "UUID-of-the-authenticated-organizer"
+    location_id = await project.locations.intern_location(location)
     new_event = await prisma.models.Event.prisma().create(
         data={
             "title": title,
             "description": description,
             "date": date,
             "location": location,
-            "organizerId": current_organizer_id,
+            "locationId": location_id,
+            "type": type,
+            "organizerId": organizer_id,
         }
     )
+    await project.embeddings.store_embeddings([new_event])
+    project.search_index.event_index.add(new_event)
+    project.invalidation.event_changed(new_event.id)
     return CreateEventResponse(
         message="Event successfully created.",
         event_id=new_event.id,
         title=new_event.title,
         date=new_event.date,
         location=new_event.location,
+        type=new_event.type,
     )
@@ -0,0 +1,122 @@
+from datetime import datetime, timedelta, timezone
+from typing import NamedTuple, Optional
+
+DAY = timedelta(days=1)
+
+NAMED_RANGES = ("today", "tomorrow", "this_weekend", "next_7_days", "next_30_days")
+
+
+class InvalidDateRangeError(ValueError):
+    """
+    Raised when date filters are malformed, contradict each other, or name an unknown range.
+    """
+
+
+class DateRange(NamedTuple):
+    """
+    A half-open span of time, `start` included and `end` excluded, in UTC. Either end may be open.
+    """
+
+    start: Optional[datetime] = None
+    end: Optional[datetime] = None
+
+    def __contains__(self, moment: datetime) -> bool:
+        return (self.start is None or moment >= self.start) and (
+            self.end is None or moment < self.end
+        )
+
+    def where(self) -> dict:
+        """
+        Builds the Prisma filter selecting events whose `date` falls in the range.
+        """
+        condition = {}
+        if self.start is not None:
+            condition["gte"] = self.start
+        if self.end is not None:
+            condition["lt"] = self.end
+        return {"date": condition}
+
+
+def parse_day(value: str, name: str = "date") -> datetime:
+    """
+    Parses a "YYYY-MM-DD" query parameter into midnight UTC of that day.
+
+    Raises:
+        InvalidDateRangeError: If the value is not a valid date in that format.
+    """
+    try:
+        return datetime.strptime(value, "%Y-%m-%d").replace(tzinfo=timezone.utc)
+    except ValueError:
+        raise InvalidDateRangeError(f"`{name}` must be a date in YYYY-MM-DD format")
+
+
+def named_range(name: str, now: Optional[datetime] = None) -> DateRange:
+    """
+    Resolves one of NAMED_RANGES into days, counted from today in UTC. Ranges starting today include all of
+    today. "this_weekend" is the coming Saturday and Sunday, or what is left of the weekend when it has begun.
+
+    Raises:
+        InvalidDateRangeError: If `name` is not one of NAMED_RANGES.
+    """
+    now = now or datetime.now(timezone.utc)
+    today = now.replace(hour=0, minute=0, second=0, microsecond=0)
+    if name == "today":
+        return DateRange(today, today + DAY)
+    if name == "tomorrow":
+        return DateRange(today + DAY, today + 2 * DAY)
+    if name == "this_weekend":
+        weekday = today.weekday()
+        if weekday >= 5:
+            return DateRange(today, today + (7 - weekday) * DAY)
+        saturday = today + (5 - weekday) * DAY
+        return DateRange(saturday, saturday + 2 * DAY)
+    if name == "next_7_days":
+        return DateRange(today, today + 7 * DAY)
+    if name == "next_30_days":
+        return DateRange(today, today + 30 * DAY)
+    raise InvalidDateRangeError(
+        f"Unknown date range `{name}`; expected one of: {', '.join(NAMED_RANGES)}"
+    )
+
+
+def resolve_date_range(
+    date: Optional[str] = None,
+    date_from: Optional[str] = None,
+    date_to: Optional[str] = None,
+    when: Optional[str] = None,
+    now: Optional[datetime] = None,
+) -> Optional[DateRange]:
+    """
+    Turns the date filters of a request into a single range. At most one form may be used.
+
+    Args:
+        date (Optional[str]): A single day, "YYYY-MM-DD".
+        date_from (Optional[str]): The first day of the range, inclusive. Open-ended when only this is given.
+        date_to (Optional[str]): The last day of the range, inclusive. Open-ended when only this is given.
+        when (Optional[str]): One of NAMED_RANGES, such as "this_weekend".
+        now (Optional[datetime]): The current time, for named ranges.
+
+    Returns:
+        Optional[DateRange]: The range, or None when no date filter was given.
+
+    Raises:
+        InvalidDateRangeError: If a value is malformed, `date_to` precedes `date_from`, or several forms are
+            combined.
+    """
+    forms = [bool(date), bool(date_from or date_to), bool(when)]
+    if sum(forms) > 1:
+        raise InvalidDateRangeError(
+            "Use only one of `date`, `from`/`to` and `when` at a time"
+        )
+    if date:
+        day = parse_day(date)
+        return DateRange(day, day + DAY)
+    if when:
+        return named_range(when, now)
+    if date_from or date_to:
+        start = parse_day(date_from, "from") if date_from else None
+        end = parse_day(date_to, "to") + DAY if date_to else None
+        if start is not None and end is not None and end <= start:
+            raise InvalidDateRangeError("`to` must not be before `from`")
+        return DateRange(start, end)
+    return None
@@ -1,7 +1,25 @@
+from typing import List, Optional
+
 import prisma
-import prisma.models
+import project.cache
+import project.conditional
+import project.invalidation
+import project.metrics
+import project.search_index
 from pydantic import BaseModel
 
+# Deletes the event only if it is at one of the versions in $2 (any version when $2 is NULL), telling a missing
+# event (no row) from one at another version (a NULL "id") in the same round trip, as in edit_event.
+DELETE_QUERY = """/* delete_event */
+WITH "target" AS (SELECT "id" FROM "Event" WHERE "id" = $1),
+"deleted" AS (
+    DELETE FROM "Event"
+    WHERE "id" = $1 AND ($2::int[] IS NULL OR "version" = ANY($2::int[]))
+    RETURNING "id"
+)
+SELECT "deleted"."id" FROM "target" LEFT JOIN "deleted" ON TRUE
+"""
+
 
 class DeleteEventResponse(BaseModel):
     """
@@ -12,19 +30,30 @@ class DeleteEventResponse(BaseModel):
     message: str
 
 
-async def delete_event(id: str) -> DeleteEventResponse:
+@project.metrics.measure_queries
+async def delete_event(
+    id: str, expected_versions: Optional[List[int]] = None
+) -> DeleteEventResponse:
     """
     Endpoint for organizers to delete an event.
 
     This function attempts to delete an event from the database using its unique identifier.
     It returns an object indicating whether the deletion was successful and includes a descriptive message.
+    The event's feedback and its rating aggregates are removed with it by the database's cascading deletes.
+    When the client sends the versions it last saw (the If-Match of the request), an event edited since is not
+    deleted.
 
     Args:
         id (str): The unique identifier of the event to be deleted.
+        expected_versions (Optional[List[int]]): The versions the deletion may apply to, or None to delete the
+            event whatever its current version.
 
     Returns:
         DeleteEventResponse: An object indicating the outcome of the deletion attempt.
 
+    Raises:
+        PreconditionFailedError: If the event exists but is at none of the expected versions.
+
     Example:
         response = await delete_event("73f8fa83-8543-4d8e-96c2-12345abcde")
         if response.success:
@@ -33,15 +62,21 @@ async def delete_event(id: str) -> DeleteEventResponse:
             print(f"Event deletion failed: {response.message}")
     """
     try:
-        event = await prisma.models.Event.prisma().delete(where={"id": id})
-        if event:
-            return DeleteEventResponse(
-                success=True, message="Event successfully deleted."
-            )
-        else:
+        rows = await prisma.get_client().query_raw(DELETE_QUERY, id, expected_versions)
+        if not rows:
             return DeleteEventResponse(
                 success=False, message="No event found with the provided ID."
             )
+        if rows[0]["id"] is None:
+            raise project.conditional.PreconditionFailedError(
+                f"Event {id} has been modified since the version in If-Match"
+            )
+        project.invalidation.invalidate(project.cache.event_cache, id)
+        project.search_index.event_index.remove(id)
+        project.invalidation.event_changed(id)
+        return DeleteEventResponse(success=True, message="Event successfully deleted.")
+    except project.conditional.PreconditionFailedError:
+        raise
     except Exception as e:
         return DeleteEventResponse(
             success=False, message=f"An error occurred: {str(e)}"
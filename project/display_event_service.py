@@ -1,41 +1,55 @@
 from datetime import datetime
+from typing import Optional, Set, Tuple
 
 import prisma
 import prisma.models
+import project.cache
+import project.conditional
+import project.metrics
+import project.projection
+import project.view_rating_summary_service
 from pydantic import BaseModel
 
 
 class DisplayEventResponse(BaseModel):
     """
     Response model for displaying event details to attendees. Contains all necessary event information without exposing sensitive data.
+    Fields left out of a sparse fieldset are omitted from the response.
     """
 
-    title: str
-    description: str
-    date: datetime
-    location: str
-    organizerId: str
-    createdAt: datetime
-    updatedAt: datetime
+    title: Optional[str] = None
+    description: Optional[str] = None
+    date: Optional[datetime] = None
+    location: Optional[str] = None
+    type: Optional[str] = None
+    organizerId: Optional[str] = None
+    version: Optional[int] = None
+    createdAt: Optional[datetime] = None
+    updatedAt: Optional[datetime] = None
+    rating: Optional[project.view_rating_summary_service.RatingSummary] = None
 
 
-async def display_event(id: str) -> DisplayEventResponse:
+def project_event(
+    response: DisplayEventResponse, fields: Optional[Set[str]] = None
+) -> DisplayEventResponse:
     """
-    Endpoint to retrieve and display event details for attendees
-
-    This function is responsible for fetching details of a specific event from the database based on its ID. It aims to provide attendees with essential information about the event, including its title, description, date, location, and organizer details. The function ensures that sensitive data is not exposed in the response, focusing instead on information relevant for attendees to know about the event.
-
-    Args:
-        id (str): The unique identifier for the event to be retrieved and displayed.
+    Restricts a full event response to a sparse fieldset without re-validating it.
+    """
+    if fields is None:
+        return response
+    return DisplayEventResponse.model_construct(
+        **{name: getattr(response, name) for name in fields}
+    )
 
-    Returns:
-        DisplayEventResponse: An object containing the event's details formatted and ready for presentation to attendees.
 
-    Example:
-        await display_event('a1b2c3d4-5e6f-7g8h-9i0j-k11l12m13n14')
-        > DisplayEventResponse(title='Community Coding Day', description='Join us for a day of coding, networking, and fun!', date=datetime.datetime(2023, 10, 15, 9, 0), location='Tech Hub Community Center', organizerId='abc123', createdAt=datetime.datetime(2023, 9, 1, 10, 30), updatedAt=datetime.datetime(2023, 9, 10, 12, 45))
+@project.metrics.measure_queries
+async def load_event(id: str) -> DisplayEventResponse:
+    """
+    Reads an event and its rating summary from the database in one query.
     """
-    event = await prisma.models.Event.prisma().find_unique(where={"id": id})
+    event = await prisma.models.Event.prisma().find_unique(
+        where={"id": id}, include={"Rating": True}
+    )
     if event is None:
         raise ValueError("Event not found")
     return DisplayEventResponse(
@@ -43,7 +57,59 @@ async def display_event(id: str) -> DisplayEventResponse:
         description=event.description,
         date=event.date,
         location=event.location,
+        type=event.type,
         organizerId=event.organizerId,
+        version=event.version,
         createdAt=event.createdAt,
         updatedAt=event.updatedAt,
+        rating=project.view_rating_summary_service.build_rating_summary(event.Rating),
+    )
+
+
+async def display_event(id: str, fields: Optional[str] = None) -> DisplayEventResponse:
+    """
+    Endpoint to retrieve and display event details for attendees
+
+    This function is responsible for fetching details of a specific event from the database based on its ID. It aims to provide attendees with essential information about the event, including its title, description, date, location, and organizer details. The function ensures that sensitive data is not exposed in the response, focusing instead on information relevant for attendees to know about the event. The event's rating summary is joined from its aggregate row in the same query. Responses are served from the event cache when possible and concurrent misses for the same event share one query; writers invalidate it explicitly. A sparse fieldset is cut from the cached full response, so every projection of an event shares one cache entry and one query.
+
+    Args:
+        id (str): The unique identifier for the event to be retrieved and displayed.
+        fields (Optional[str]): A comma separated subset of DisplayEventResponse fields to return, or None for all of them.
+
+    Returns:
+        DisplayEventResponse: An object containing the event's details formatted and ready for presentation to attendees.
+
+    Example:
+        await display_event('a1b2c3d4-5e6f-7g8h-9i0j-k11l12m13n14')
+        > DisplayEventResponse(title='Community Coding Day', description='Join us for a day of coding, networking, and fun!', date=datetime.datetime(2023, 10, 15, 9, 0), location='Tech Hub Community Center', organizerId='abc123', createdAt=datetime.datetime(2023, 9, 1, 10, 30), updatedAt=datetime.datetime(2023, 9, 10, 12, 45), rating=RatingSummary(count=2, sum=9, mean=4.5, histogram={1: 0, 2: 0, 3: 0, 4: 1, 5: 1}))
+    """
+    response, _ = await display_event_versioned(id, fields)
+    return response
+
+
+async def display_event_versioned(
+    id: str, fields: Optional[str] = None
+) -> Tuple[DisplayEventResponse, project.conditional.Validators]:
+    """
+    Same as display_event, also returning the HTTP validators of the response.
+
+    The ETag covers the event's `updatedAt`, its rating count (feedback changes the embedded summary without
+    touching the event row) and the fieldset. Last-Modified is not sent for the same reason: `updatedAt` alone
+    would not reflect new ratings. Both come from the cached full response, so a freshness check costs no query
+    once the event is cached. The ETag is prefixed with the event's version, which is what If-Match is checked
+    against by edits and deletions.
+    """
+    selected = project.projection.parse_fields(
+        fields, DisplayEventResponse.model_fields
+    )
+    response = await project.cache.event_cache.get_or_load(id, lambda: load_event(id))
+    validators = project.conditional.Validators(
+        etag=project.conditional.make_versioned_etag(
+            response.version,
+            id,
+            response.updatedAt,
+            response.rating.count,
+            sorted(selected) if selected is not None else None,
+        )
     )
+    return project_event(response, selected), validators
@@ -1,11 +1,43 @@
-from datetime import datetime
-from typing import Optional
+from datetime import datetime, timezone
+from typing import List, Optional
 
 import prisma
+import prisma.enums
 import prisma.errors
 import prisma.models
+import project.cache
+import project.conditional
+import project.embeddings
+import project.invalidation
+import project.locations
+import project.metrics
+import project.search_index
 from pydantic import BaseModel
 
+# Applies an edit in one statement, only if the event is still at one of the versions in $2 (any version when
+# $2 is NULL). Left joining the update onto the event tells the cases apart without a second query: no row means
+# there is no such event, and a row of NULLs that the event has moved on to another version. The embedding
+# arrives as pgvector's text form, hence the cast through text.
+EDIT_QUERY = """/* edit_event */
+WITH "target" AS (SELECT "id" FROM "Event" WHERE "id" = $1),
+"updated" AS (
+    UPDATE "Event" SET
+        "title" = COALESCE($3, "title"),
+        "description" = COALESCE($4, "description"),
+        "date" = COALESCE($5::timestamptz AT TIME ZONE 'UTC', "date"),
+        "location" = COALESCE($6, "location"),
+        "locationId" = COALESCE($7, "locationId"),
+        "type" = COALESCE($8::text::"EventType", "type"),
+        "embedding" = COALESCE($9::text::vector, "embedding"),
+        "version" = "version" + 1,
+        "updatedAt" = now() AT TIME ZONE 'UTC'
+    WHERE "id" = $1 AND ($2::int[] IS NULL OR "version" = ANY($2::int[]))
+    RETURNING "id", "title", "description", "date", "location", "locationId", "type", "version",
+              "createdAt", "updatedAt", "organizerId"
+)
+SELECT "updated".* FROM "target" LEFT JOIN "updated" ON TRUE
+"""
+
 
 class Event(BaseModel):
     """
@@ -17,6 +49,8 @@ class Event(BaseModel):
     description: str
     date: datetime
     location: str
+    type: prisma.enums.EventType
+    version: int
 
 
 class EditEventResponse(BaseModel):
@@ -29,55 +63,98 @@ class EditEventResponse(BaseModel):
     edited_event: Optional[Event] = None
 
 
+@project.metrics.measure_queries
 async def edit_event(
     id: str,
     title: Optional[str] = None,
     description: Optional[str] = None,
     date: Optional[datetime] = None,
     location: Optional[str] = None,
+    type: Optional[prisma.enums.EventType] = None,
+    expected_versions: Optional[List[int]] = None,
 ) -> EditEventResponse:
     """
     Endpoint allowing organizers to edit an existing event.
 
+    The edit is a single conditional UPDATE. When the client sends the versions it last saw (the If-Match of
+    the request), an event edited by someone else in the meantime is left alone, so that their edit is not
+    silently overwritten. When both the title and the description change, the new embedding is written by the
+    same statement. Two cases take another round trip: a location never seen before is interned first, and
+    when only one of the title and the description changes, the event is re-embedded afterwards from the
+    updated row, since the other text is only known once the UPDATE returns it.
+
     Args:
         id (str): The unique identifier for the event to be edited.
         title (Optional[str]): The new title for the event. Optional if not changing.
         description (Optional[str]): A new detailed description of the event. Optional if not changing.
         date (Optional[datetime]): The new date and time for the event. Optional if not changing.
         location (Optional[str]): The new location where the event will be held. Optional if not changing.
+        type (Optional[prisma.enums.EventType]): The new kind of event. Optional if not changing.
+        expected_versions (Optional[List[int]]): The versions the edit may apply to, or None to apply it whatever
+            the event's current version.
 
     Returns:
         EditEventResponse: This model provides feedback after an attempt to edit an event, indicating success or failure.
+
+    Raises:
+        PreconditionFailedError: If the event exists but is at none of the expected versions.
     """
     try:
-        update_data = {}
-        if title:
-            update_data["title"] = title
-        if description:
-            update_data["description"] = description
-        if date:
-            update_data["date"] = date
-        if location:
-            update_data["location"] = location
-        if not update_data:
+        if not (title or description or date or location or type):
             return EditEventResponse(
                 success=False, message="No update information provided."
             )
-        updated_event = await prisma.models.Event.prisma().update(
-            where={"id": id}, data=update_data
+        location_id = None
+        if location:
+            location_id = await project.locations.intern_location(location)
+        if date and date.tzinfo is None:
+            date = date.replace(tzinfo=timezone.utc)
+        embedding = None
+        if title and description:
+            vector = project.embeddings.embed(title, description)
+            embedding = project.embeddings.to_literal(vector) if vector else None
+        rows = await prisma.get_client().query_raw(
+            EDIT_QUERY,
+            id,
+            expected_versions,
+            title or None,
+            description or None,
+            date or None,
+            location or None,
+            location_id,
+            type or None,
+            embedding,
         )
+        if not rows:
+            return EditEventResponse(
+                success=False, message="No event found with the provided ID."
+            )
+        if rows[0]["id"] is None:
+            raise project.conditional.PreconditionFailedError(
+                f"Event {id} has been modified since the version in If-Match"
+            )
+        updated_event = prisma.models.Event.model_validate(rows[0])
+        if bool(title) != bool(description):
+            await project.embeddings.store_embeddings([updated_event])
+        project.invalidation.invalidate(project.cache.event_cache, id)
+        project.search_index.event_index.add(updated_event)
+        project.invalidation.event_changed(id)
         edited_event = Event(
             id=updated_event.id,
             title=updated_event.title,
             description=updated_event.description,
             date=updated_event.date,
             location=updated_event.location,
+            type=updated_event.type,
+            version=updated_event.version,
         )
         return EditEventResponse(
             success=True,
             message="Event successfully updated",
             edited_event=edited_event,
         )
+    except project.conditional.PreconditionFailedError:
+        raise
     except prisma.errors.PrismaError as e:
         return EditEventResponse(
             success=False,
@@ -1,9 +1,29 @@
-from typing import Optional
+from typing import List, Optional
 
 import prisma
-import prisma.models
+import project.cache
+import project.conditional
+import project.invalidation
+import project.metrics
 from pydantic import BaseModel
 
+# Updates the profile in one round trip, only if the user is at one of the versions in $2 (any version when $2
+# is NULL). As in edit_event, no row means there is no such user and a NULL "id" that the version has moved on.
+EDIT_PROFILE_QUERY = """/* edit_profile */
+WITH "target" AS (SELECT "id" FROM "User" WHERE "email" = $1),
+"updated" AS (
+    UPDATE "User" SET
+        "name" = $3,
+        "bio" = $4,
+        "avatarUrl" = $5,
+        "version" = "version" + 1,
+        "updatedAt" = now() AT TIME ZONE 'UTC'
+    WHERE "email" = $1 AND ($2::int[] IS NULL OR "version" = ANY($2::int[]))
+    RETURNING "id", "email", "name", "bio", "avatarUrl", "version"
+)
+SELECT "updated".* FROM "target" LEFT JOIN "updated" ON TRUE
+"""
+
 
 class User(BaseModel):
     """
@@ -15,6 +35,7 @@ class User(BaseModel):
     name: str
     bio: Optional[str] = None
     avatar_url: Optional[str] = None
+    version: int
 
 
 class EditUserProfileResponse(BaseModel):
@@ -27,49 +48,62 @@ class EditUserProfileResponse(BaseModel):
     updated_user: Optional[User] = None
 
 
+@project.metrics.measure_queries
 async def edit_profile(
-    email: str, name: str, bio: Optional[str] = None, avatar_url: Optional[str] = None
+    email: str,
+    name: str,
+    bio: Optional[str] = None,
+    avatar_url: Optional[str] = None,
+    expected_versions: Optional[List[int]] = None,
 ) -> EditUserProfileResponse:
     """
     Endpoint for users to edit their profile.
 
+    The profile is updated by a single conditional UPDATE, which also finds the user: there is no separate
+    lookup. When the client sends the versions it last saw (the If-Match of the request), a profile changed
+    since is left alone.
+
     Args:
-        email (str): The new email address for the user's account.
+        email (str): The email address of the account whose profile is edited.
         name (str): The user's full name after update.
         bio (Optional[str]): A short biography or description about the user.
         avatar_url (Optional[str]): URL link to the new avatar image for the user's profile.
+        expected_versions (Optional[List[int]]): The versions the edit may apply to, or None to apply it whatever
+            the profile's current version.
 
     Returns:
         EditUserProfileResponse: Model for the response after a user edits their profile.
         It could represent a success status or the updated user profile data.
+
+    Raises:
+        PreconditionFailedError: If the user exists but is at none of the expected versions.
     """
     try:
-        user = await prisma.models.User.prisma().find_unique(where={"email": email})
-        if user:
-            updated_user_data = await prisma.models.User.prisma().update(
-                where={"email": email},
-                data={
-                    "email": email,
-                    "name": name,
-                    "bio": bio,
-                    "avatarUrl": avatar_url,
-                },
-            )
-            updated_user = User(
-                id=updated_user_data.id,
-                email=updated_user_data.email,
-                name=updated_user_data.name,
-                bio=updated_user_data.bio,
-                avatar_url=updated_user_data.avatar_url,
-            )  # TODO(autogpt): Cannot access attribute "name" for class "User"
-            #     Attribute "name" is unknown. reportAttributeAccessIssue
-            return EditUserProfileResponse(
-                status="success",
-                message="User profile updated successfully.",
-                updated_user=updated_user,
-            )
-        else:
+        rows = await prisma.get_client().query_raw(
+            EDIT_PROFILE_QUERY, email, expected_versions, name, bio, avatar_url
+        )
+        if not rows:
             return EditUserProfileResponse(status="error", message="User not found.")
+        row = rows[0]
+        if row["id"] is None:
+            raise project.conditional.PreconditionFailedError(
+                f"The profile of {email} has been modified since the version in If-Match"
+            )
+        project.invalidation.invalidate(project.cache.profile_cache, row["id"])
+        return EditUserProfileResponse(
+            status="success",
+            message="User profile updated successfully.",
+            updated_user=User(
+                id=row["id"],
+                email=row["email"],
+                name=row["name"],
+                bio=row["bio"],
+                avatar_url=row["avatarUrl"],
+                version=row["version"],
+            ),
+        )
+    except project.conditional.PreconditionFailedError:
+        raise
     except Exception as e:
         return EditUserProfileResponse(
             status="error", message=f"An error occurred: {str(e)}"
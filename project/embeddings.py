@@ -0,0 +1,137 @@
+import logging
+import math
+import zlib
+from collections import Counter
+from typing import Iterable, List, Optional, Union
+
+import prisma
+import prisma.models
+import project.metrics
+import project.search_index
+from pydantic import BaseModel
+
+logger = logging.getLogger(__name__)
+
+# Must match the size of the `vector` column on Event in schema.prisma.
+EMBEDDING_DIMENSIONS = 256
+
+TITLE_WEIGHT = 2
+
+BACKFILL_BATCH_SIZE = 1000
+
+# Prisma cannot declare a pgvector index, and `prisma db push` drops indexes it does not know about, so the
+# index is (re)created on startup. HNSW answers nearest-neighbour queries without scanning the table.
+CREATE_INDEX_QUERY = """/* create_embedding_index */
+CREATE INDEX IF NOT EXISTS "Event_embedding_idx" ON "Event" USING hnsw ("embedding" vector_cosine_ops)
+"""
+
+STORE_QUERY = """/* store_embeddings */
+UPDATE "Event" AS e SET "embedding" = v."embedding"::vector
+FROM unnest($1::text[], $2::text[]) AS v("id", "embedding")
+WHERE e."id" = v."id"
+"""
+
+UNEMBEDDED_QUERY = """/* events_without_embedding */
+SELECT "id", "title", "description" FROM "Event"
+WHERE "embedding" IS NULL AND "id" > $1
+ORDER BY "id"
+LIMIT $2
+"""
+
+
+class EventText(BaseModel):
+    """
+    The columns of an event that its embedding is computed from.
+    """
+
+    id: str
+    title: str
+    description: str
+
+
+def embed(title: str, description: str) -> Optional[List[float]]:
+    """
+    Turns an event's text into a unit vector of EMBEDDING_DIMENSIONS, computed locally.
+
+    Words and pairs of adjacent words are hashed into the dimensions, with a sign taken from the hash so that
+    collisions tend to cancel out rather than add up. Counts are dampened logarithmically and title words
+    weigh TITLE_WEIGHT times as much as description words. There is no vocabulary to fit, so an event's
+    vector never changes as other events come and go.
+
+    Returns:
+        Optional[List[float]]: The vector, or None when the text has no words to go on.
+    """
+    counts: Counter = Counter()
+    for text, weight in ((title, TITLE_WEIGHT), (description, 1)):
+        tokens = project.search_index.tokenize(text)
+        for token in tokens:
+            counts[token] += weight
+        for first, second in zip(tokens, tokens[1:]):
+            counts[f"{first} {second}"] += weight
+    vector = [0.0] * EMBEDDING_DIMENSIONS
+    for feature, count in counts.items():
+        digest = zlib.crc32(feature.encode("utf-8"))
+        sign = -1.0 if digest & 0x80000000 else 1.0
+        vector[digest % EMBEDDING_DIMENSIONS] += sign * (1 + math.log(count))
+    norm = math.sqrt(sum(value * value for value in vector))
+    if norm == 0:
+        return None
+    return [value / norm for value in vector]
+
+
+def to_literal(vector: List[float]) -> str:
+    """
+    Formats a vector the way pgvector reads it, e.g. "[0.5,-0.25]".
+    """
+    return "[" + ",".join(f"{value:.6g}" for value in vector) + "]"
+
+
+@project.metrics.measure_queries
+async def store_embeddings(
+    events: Iterable[Union[prisma.models.Event, EventText]],
+    client: Optional[prisma.Prisma] = None,
+) -> None:
+    """
+    Computes the embeddings of these events and writes them with one statement, through `client` when given,
+    e.g. a transaction the events were written in.
+    """
+    ids: List[str] = []
+    vectors: List[str] = []
+    for event in events:
+        vector = embed(event.title, event.description)
+        if vector is not None:
+            ids.append(event.id)
+            vectors.append(to_literal(vector))
+    if ids:
+        await (client or prisma.get_client()).execute_raw(STORE_QUERY, ids, vectors)
+
+
+@project.metrics.measure_queries
+async def create_embedding_index() -> None:
+    await prisma.get_client().execute_raw(CREATE_INDEX_QUERY)
+
+
+@project.metrics.measure_queries
+async def backfill_embeddings() -> int:
+    """
+    Embeds the events written before embeddings were stored, in batches.
+
+    Returns:
+        int: The number of events embedded.
+    """
+    embedded = 0
+    last_id = ""
+    while True:
+        events = await prisma.get_client().query_raw(
+            UNEMBEDDED_QUERY, last_id, BACKFILL_BATCH_SIZE, model=EventText
+        )
+        if not events:
+            break
+        await store_embeddings(events)
+        embedded += len(events)
+        last_id = events[-1].id
+        if len(events) < BACKFILL_BATCH_SIZE:
+            break
+    if embedded:
+        logger.info("Embedded %d events for similarity search", embedded)
+    return embedded
@@ -0,0 +1,77 @@
+import csv
+import io
+import os
+from typing import AsyncIterator, Literal
+
+import prisma
+import prisma.models
+import project.metrics
+import project.pagination
+import project.view_feedback_service
+
+EXPORT_CHUNK_SIZE = int(os.getenv("EXPORT_CHUNK_SIZE", "1000"))
+
+CSV_COLUMNS = ["content", "rating", "submittedAt", "anonymous"]
+
+ExportFormat = Literal["ndjson", "csv"]
+
+MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+
+@project.metrics.measure_queries
+async def export_feedback(eventId: str, format: ExportFormat) -> AsyncIterator[str]:
+    """
+    Endpoint for organizers to download all feedback on an event for reporting.
+
+    Feedback is read newest first in chunks of EXPORT_CHUNK_SIZE rows using the same (`createdAt`, `id`) seek as
+    view_feedback, and each chunk is encoded and yielded before the next one is fetched. Only one chunk is held in
+    memory at a time, however much feedback the event has.
+
+    Args:
+        eventId (str): The unique identifier of the event whose feedback is exported.
+        format (ExportFormat): "ndjson" for one JSON object per line, or "csv" for a header row followed by one row per feedback.
+
+    Yields:
+        str: Encoded chunks of the export, ready to be written to the response body.
+
+    Example:
+        async for chunk in export_feedback("event123", "csv"):
+            print(chunk, end="")
+        > content,rating,submittedAt,anonymous
+        > Great event!,5,2024-06-01T12:00:00+00:00,False
+    """
+    if format == "csv":
+        buffer = io.StringIO()
+        csv.writer(buffer).writerow(CSV_COLUMNS)
+        yield buffer.getvalue()
+    seek = None
+    while True:
+        where: dict = {"eventId": eventId}
+        if seek:
+            where = {"AND": [where, project.pagination.seek_after(*seek)]}
+        records = await prisma.models.Feedback.prisma().find_many(
+            where=where,
+            order=project.pagination.NEWEST_FIRST,
+            take=EXPORT_CHUNK_SIZE,
+        )
+        buffer = io.StringIO()
+        writer = csv.writer(buffer) if format == "csv" else None
+        for record in records:
+            feedback = project.view_feedback_service.to_feedback_data(record)
+            if writer:
+                writer.writerow(
+                    [
+                        feedback.content,
+                        feedback.rating,
+                        feedback.submittedAt,
+                        feedback.anonymous,
+                    ]
+                )
+            else:
+                buffer.write(feedback.model_dump_json())
+                buffer.write("\n")
+        if records:
+            yield buffer.getvalue()
+        if len(records) < EXPORT_CHUNK_SIZE:
+            break
+        seek = (records[-1].createdAt, records[-1].id)
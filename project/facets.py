@@ -0,0 +1,111 @@
+from collections import Counter
+from typing import Dict, Iterable, List, Optional
+
+import prisma
+import project.date_ranges
+import project.locations
+import project.metrics
+import project.search_index
+from pydantic import BaseModel
+
+# One pass over the matching events, grouped three ways at once. Filters left as NULL match every event.
+FACET_QUERY = """/* event_facets */
+SELECT CASE WHEN GROUPING("type") = 0 THEN 'type'
+            WHEN GROUPING("locationId") = 0 THEN 'location'
+            ELSE 'month' END AS "facet",
+       COALESCE("type"::text, "locationId", to_char("date", 'YYYY-MM')) AS "value",
+       COUNT(*)::int AS "count"
+FROM "Event"
+WHERE ($1::timestamp IS NULL OR "date" >= $1::timestamp)
+  AND ($2::timestamp IS NULL OR "date" < $2::timestamp)
+  AND ($3::text IS NULL OR "locationId" = $3::text)
+  AND ($4::text IS NULL OR "type" = $4::text::"EventType")
+GROUP BY GROUPING SETS (("type"), ("locationId"), (to_char("date", 'YYYY-MM')))
+"""
+
+
+class FacetCount(BaseModel):
+    """
+    How many matching events share one value of a facet.
+    """
+
+    value: str
+    count: int
+
+
+class SearchFacets(BaseModel):
+    """
+    Counts of the matching events by type, by location and by month ("YYYY-MM"), for rendering filters.
+    Types and locations are listed most frequent first, months in calendar order.
+    """
+
+    type: List[FacetCount]
+    location: List[FacetCount]
+    month: List[FacetCount]
+
+
+def build_facets(
+    types: Dict[str, int], locations: Dict[str, int], months: Dict[str, int]
+) -> SearchFacets:
+    def by_count(counts: Dict[str, int]) -> List[FacetCount]:
+        return [
+            FacetCount(value=value, count=count)
+            for value, count in sorted(
+                counts.items(), key=lambda item: (-item[1], item[0])
+            )
+        ]
+
+    return SearchFacets(
+        type=by_count(types),
+        location=by_count(locations),
+        month=[
+            FacetCount(value=value, count=count)
+            for value, count in sorted(months.items())
+        ],
+    )
+
+
+def count_hits(event_ids: Iterable[str]) -> SearchFacets:
+    """
+    Counts the facets of keyword search hits from the search index, without querying the database.
+    """
+    types: Counter = Counter()
+    locations: Counter = Counter()
+    months: Counter = Counter()
+    for indexed in project.search_index.event_index.indexed(event_ids):
+        types[indexed.type] += 1
+        entry = project.locations.directory.get(indexed.location)
+        locations[entry.name if entry else indexed.location] += 1
+        months[indexed.date.strftime("%Y-%m")] += 1
+    return build_facets(types, locations, months)
+
+
+@project.metrics.measure_queries
+async def count_matches(
+    date_range: Optional[project.date_ranges.DateRange] = None,
+    location_id: Optional[str] = None,
+    type: Optional[str] = None,
+) -> SearchFacets:
+    """
+    Counts the facets of the events matching the filters of a search with one grouped query.
+    """
+    rows = await prisma.get_client().query_raw(
+        FACET_QUERY,
+        date_range.start if date_range else None,
+        date_range.end if date_range else None,
+        location_id,
+        type,
+    )
+    counts: Dict[str, Dict[str, int]] = {"type": {}, "location": {}, "month": {}}
+    for row in rows:
+        if row["value"] is not None:
+            counts[row["facet"]][row["value"]] = row["count"]
+    locations = {}
+    for location_id, count in counts["location"].items():
+        entry = project.locations.directory.get_by_id(location_id)
+        if entry is None:
+            await project.locations.load_locations([location_id])
+            entry = project.locations.directory.get_by_id(location_id)
+        name = entry.name if entry else location_id
+        locations[name] = locations.get(name, 0) + count
+    return build_facets(counts["type"], locations, counts["month"])
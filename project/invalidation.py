@@ -0,0 +1,358 @@
+import asyncio
+import json
+import logging
+import os
+import uuid
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+import prisma
+import prisma.models
+import project.cache
+import project.locations
+import project.metrics
+import project.search_index
+
+logger = logging.getLogger(__name__)
+
+INVALIDATION_BUS = os.getenv("INVALIDATION_BUS", "local")
+
+INVALIDATION_CHANNEL = os.getenv("INVALIDATION_CHANNEL", "xspor_invalidation")
+
+MAX_KEYS_PER_MESSAGE = 100
+
+RECONNECT_DELAY_SECONDS = 1.0
+
+MAX_RECONNECT_DELAY_SECONDS = 30.0
+
+FLUSH_TIMEOUT_SECONDS = 5.0
+
+LISTENER_URL_PARAMS = {"host", "sslmode", "sslrootcert", "sslcert", "sslkey"}
+
+EVENT_INDEX_TOPIC = "event_index"
+
+LOCATION_TOPIC = "locations"
+
+Handler = Callable[[List[str]], Awaitable[None]]
+
+messages_published = project.metrics.Counter(
+    "invalidation_messages_published_total",
+    "Invalidation messages sent to the other workers, by topic.",
+    ("topic",),
+)
+
+messages_received = project.metrics.Counter(
+    "invalidation_messages_received_total",
+    "Invalidation messages received from the other workers, by topic.",
+    ("topic",),
+)
+
+bus_reconnects = project.metrics.Counter(
+    "invalidation_bus_reconnects_total",
+    "Times the invalidation bus lost its database connection and resynchronised.",
+)
+
+
+def listener_dsn(database_url: str) -> str:
+    """
+    Turns a Prisma DATABASE_URL into a DSN for the listening connection, dropping the query parameters that
+    only Prisma understands, such as `schema` and `connection_limit`.
+    """
+    parts = urlsplit(database_url)
+    query = [
+        (name, value)
+        for name, value in parse_qsl(parts.query)
+        if name in LISTENER_URL_PARAMS
+    ]
+    return urlunsplit(parts._replace(query=urlencode(query)))
+
+
+class InvalidationBus:
+    """
+    Broadcasts invalidations of in-process state (caches, the search index) to every other worker through
+    Postgres LISTEN/NOTIFY, so that running several workers needs no service besides the database.
+
+    Each worker holds one dedicated connection, outside Prisma's pool, that LISTENs on INVALIDATION_CHANNEL
+    and also sends this worker's NOTIFYs. `publish()` never waits: messages are queued and sent in order by
+    a background task, and received messages are applied one at a time in the order they arrived. A worker
+    ignores its own messages, since writers update their local state directly.
+
+    NOTIFYs sent while a worker is disconnected are lost, so after reconnecting the worker clears every cache
+    and reloads the search index and the location directory instead of trusting what it holds.
+    """
+
+    def __init__(self, channel: str):
+        self.channel = channel
+        self.origin = uuid.uuid4().hex
+        self.handlers: Dict[str, Handler] = {}
+        self.running = False
+        self._dsn = ""
+        self._connection: Any = None
+        self._outbox: Optional[asyncio.Queue] = None
+        self._inbox: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+        self._reconnecting: Optional[asyncio.Task] = None
+
+    def subscribe(self, topic: str, handler: Handler) -> None:
+        """
+        Registers the coroutine applying another worker's messages on `topic`. It receives their keys.
+        """
+        self.handlers[topic] = handler
+
+    def publish(self, topic: str, *keys: str) -> None:
+        """
+        Tells the other workers that the state identified by `keys` under `topic` changed. Does nothing
+        unless the bus is running.
+        """
+        if not self.running or not keys:
+            return
+        for start in range(0, len(keys), MAX_KEYS_PER_MESSAGE):
+            self._outbox.put_nowait(
+                json.dumps(
+                    {
+                        "origin": self.origin,
+                        "topic": topic,
+                        "keys": list(keys[start : start + MAX_KEYS_PER_MESSAGE]),
+                    }
+                )
+            )
+            messages_published.inc(topic)
+
+    async def start(self, database_url: str) -> None:
+        """
+        Opens the listening connection and starts sending and applying messages.
+
+        Raises:
+            OSError, asyncpg.PostgresError: If the database cannot be reached; the worker should not serve
+                without the bus in that case.
+        """
+        self._dsn = listener_dsn(database_url)
+        self._outbox = asyncio.Queue()
+        self._inbox = asyncio.Queue()
+        await self._connect()
+        self.running = True
+        self._tasks = [
+            asyncio.create_task(self._send()),
+            asyncio.create_task(self._dispatch()),
+        ]
+        logger.info("Invalidation bus listening on %s as %s", self.channel, self.origin)
+
+    async def stop(self) -> None:
+        """
+        Sends the messages still queued, waiting at most FLUSH_TIMEOUT_SECONDS, then closes the connection.
+        """
+        if not self.running:
+            return
+        try:
+            await asyncio.wait_for(self._outbox.join(), FLUSH_TIMEOUT_SECONDS)
+        except asyncio.TimeoutError:
+            logger.warning(
+                "Dropped %d unsent invalidation messages", self._outbox.qsize()
+            )
+        self.running = False
+        for task in self._tasks + [self._reconnecting]:
+            if task is not None:
+                task.cancel()
+        connection, self._connection = self._connection, None
+        if connection is not None:
+            await connection.close()
+
+    async def _connect(self) -> None:
+        # Imported here so that single-worker deployments never load the driver.
+        import asyncpg
+
+        connection = await asyncpg.connect(self._dsn)
+        await connection.add_listener(self.channel, self._on_notification)
+        connection.add_termination_listener(self._on_termination)
+        self._connection = connection
+
+    def _on_notification(
+        self, connection: Any, pid: int, channel: str, payload: str
+    ) -> None:
+        try:
+            message = json.loads(payload)
+        except ValueError:
+            logger.warning("Ignoring malformed invalidation message: %r", payload)
+            return
+        if message.get("origin") != self.origin:
+            self._inbox.put_nowait(message)
+
+    def _on_termination(self, connection: Any) -> None:
+        if self.running and connection is self._connection:
+            self._connection = None
+            self._reconnect_soon()
+
+    def _reconnect_soon(self) -> None:
+        if self._reconnecting is None or self._reconnecting.done():
+            self._reconnecting = asyncio.create_task(self._reconnect())
+
+    async def _reconnect(self) -> None:
+        delay = RECONNECT_DELAY_SECONDS
+        while self.running:
+            try:
+                await self._connect()
+            except Exception:
+                logger.exception(
+                    "Invalidation bus could not reconnect, retrying in %.0f s", delay
+                )
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, MAX_RECONNECT_DELAY_SECONDS)
+                continue
+            bus_reconnects.inc()
+            logger.warning("Invalidation bus reconnected, resynchronising")
+            await resynchronise()
+            return
+
+    async def _send(self) -> None:
+        while True:
+            payload = await self._outbox.get()
+            try:
+                while True:
+                    if self._connection is None:
+                        self._reconnect_soon()
+                        await self._reconnecting
+                        continue
+                    try:
+                        await self._connection.execute(
+                            "SELECT pg_notify($1, $2)", self.channel, payload
+                        )
+                        break
+                    except Exception:
+                        if self._connection is None or self._connection.is_closed():
+                            self._connection = None
+                            continue
+                        logger.exception("Could not send an invalidation message")
+                        break
+            finally:
+                self._outbox.task_done()
+
+    async def _dispatch(self) -> None:
+        while True:
+            message = await self._inbox.get()
+            topic = message.get("topic")
+            handler = self.handlers.get(topic)
+            if handler is None:
+                continue
+            messages_received.inc(topic)
+            try:
+                await handler(message.get("keys") or [])
+            except Exception:
+                logger.exception("Could not apply an invalidation message on %s", topic)
+
+
+bus = InvalidationBus(INVALIDATION_CHANNEL)
+
+# The events changed while `resynchronise()` loads a new search index, or None when it is not loading one.
+_changed_while_reloading: Optional[Set[str]] = None
+
+
+def invalidate(cache: project.cache.CacheBackend, *keys: str) -> None:
+    """
+    Invalidates `keys` in this worker's `cache` at once, and in the same cache of every other worker through
+    the bus.
+    """
+    for key in keys:
+        cache.invalidate(key)
+    bus.publish(f"cache:{cache.name}", *keys)
+
+
+def event_changed(*event_ids: str) -> None:
+    """
+    Tells the other workers to re-read these events into their search index. The caller updates its own
+    index itself.
+    """
+    if _changed_while_reloading is not None:
+        _changed_while_reloading.update(event_ids)
+    bus.publish(EVENT_INDEX_TOPIC, *event_ids)
+
+
+def location_added(*location_ids: str) -> None:
+    """
+    Tells the other workers to read newly interned locations into their location directory.
+    """
+    bus.publish(LOCATION_TOPIC, *location_ids)
+
+
+def _cache_handler(cache: project.cache.CacheBackend) -> Handler:
+    async def apply(keys: List[str]) -> None:
+        for key in keys:
+            cache.invalidate(key)
+
+    return apply
+
+
+@project.metrics.measure_queries
+async def _reindex(
+    index: "project.search_index.EventSearchIndex", event_ids: List[str]
+) -> None:
+    events = await prisma.models.Event.prisma().find_many(
+        where={"id": {"in": event_ids}}
+    )
+    found = {event.id for event in events}
+    for event in events:
+        index.add(event)
+    for event_id in event_ids:
+        if event_id not in found:
+            index.remove(event_id)
+
+
+async def reindex_events(event_ids: List[str]) -> None:
+    """
+    Re-reads events changed by another worker into this worker's search index, dropping the deleted ones.
+    """
+    if _changed_while_reloading is not None:
+        _changed_while_reloading.update(event_ids)
+    await _reindex(project.search_index.event_index, event_ids)
+
+
+async def resynchronise() -> None:
+    """
+    Drops every piece of state that a missed message could have left stale.
+
+    The worker keeps serving meanwhile, so the location directory and the search index are loaded off to the
+    side and swapped in once complete. Events changed while the index loads, here or in another worker, are
+    re-read into the new index before the swap, since the load may have read them before the change.
+    """
+    global _changed_while_reloading
+    for cache in project.cache.caches.values():
+        cache.clear()
+    await project.locations.load_locations()
+    _changed_while_reloading = changed = set()
+    try:
+        index = await project.search_index.load_event_index()
+        while changed:
+            event_ids = sorted(changed)
+            changed.clear()
+            await _reindex(index, event_ids)
+    finally:
+        _changed_while_reloading = None
+    project.search_index.event_index = index
+
+
+async def start() -> None:
+    """
+    Starts the bus when INVALIDATION_BUS is "postgres", subscribing every registered cache, the search index
+    and the location directory. With the default "local" the bus stays off and publishing is a no-op, which
+    is only correct with a single worker.
+
+    Raises:
+        ValueError: If INVALIDATION_BUS names an unsupported bus.
+    """
+    if INVALIDATION_BUS == "local":
+        if int(os.getenv("WEB_CONCURRENCY", "1")) > 1:
+            logger.warning(
+                "Running %s workers with INVALIDATION_BUS=local; their caches will go stale",
+                os.getenv("WEB_CONCURRENCY"),
+            )
+        return
+    if INVALIDATION_BUS != "postgres":
+        raise ValueError(f"Unsupported invalidation bus: {INVALIDATION_BUS}")
+    for cache in project.cache.caches.values():
+        bus.subscribe(f"cache:{cache.name}", _cache_handler(cache))
+    bus.subscribe(EVENT_INDEX_TOPIC, reindex_events)
+    bus.subscribe(LOCATION_TOPIC, project.locations.load_locations)
+    await bus.start(os.environ["DATABASE_URL"])
+
+
+async def stop() -> None:
+    await bus.stop()
@@ -0,0 +1,272 @@
+import bisect
+import logging
+import re
+import unicodedata
+from collections import defaultdict
+from typing import Dict, Iterable, List, NamedTuple, Optional, Union
+
+import prisma
+import prisma.models
+import prisma.partials
+import project.invalidation
+import project.metrics
+from pydantic import BaseModel
+
+logger = logging.getLogger(__name__)
+
+SEPARATORS = re.compile(r"[\W_]+")
+
+# Spellings that name the same place as another, by their normalized form.
+LOCATION_ALIASES = {
+    "nyc": "new york",
+    "new york city": "new york",
+    "la": "los angeles",
+    "sf": "san francisco",
+    "virtual": "online",
+}
+
+DEFAULT_SUGGESTIONS = 10
+
+MAX_SUGGESTIONS = 50
+
+BACKFILL_BATCH_SIZE = 1000
+
+
+def normalize_location(text: str) -> str:
+    """
+    Folds a location's spelling: lowercase, accents and punctuation dropped, whitespace collapsed.
+
+    Example:
+        normalize_location("  São-Paulo ")  # "sao paulo"
+    """
+    folded = unicodedata.normalize("NFKD", text.casefold())
+    folded = "".join(char for char in folded if not unicodedata.combining(char))
+    return " ".join(SEPARATORS.sub(" ", folded).split())
+
+
+def location_key(text: str) -> str:
+    """
+    The key under which a location is interned, shared by every spelling of the same place, so that
+    "NYC" and "new york" are one location.
+    """
+    normalized = normalize_location(text)
+    return LOCATION_ALIASES.get(normalized, normalized)
+
+
+class LocationEntry(NamedTuple):
+    id: str
+    key: str
+    name: str
+
+
+class LocationDirectory:
+    """
+    Every interned location, held in memory.
+
+    Resolving a location to its ID is a dictionary lookup, and prefix lookups bisect a sorted array of keys,
+    so both cost the same however many events there are. New locations are inserted in place as they are
+    interned.
+    """
+
+    def __init__(self):
+        self._by_key: Dict[str, LocationEntry] = {}
+        self._by_id: Dict[str, LocationEntry] = {}
+        self._keys: List[str] = []
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def clear(self) -> None:
+        self._by_key.clear()
+        self._by_id.clear()
+        self._keys.clear()
+
+    def entries(self) -> List[LocationEntry]:
+        return list(self._by_key.values())
+
+    def add(self, location: Union[prisma.models.Location, LocationEntry]) -> None:
+        if location.key not in self._by_key:
+            bisect.insort(self._keys, location.key)
+        entry = LocationEntry(id=location.id, key=location.key, name=location.name)
+        self._by_key[location.key] = entry
+        self._by_id[location.id] = entry
+
+    def get(self, key: str) -> Optional[LocationEntry]:
+        return self._by_key.get(key)
+
+    def get_by_id(self, location_id: str) -> Optional[LocationEntry]:
+        return self._by_id.get(location_id)
+
+    def with_prefix(self, prefix: str, limit: int) -> List[LocationEntry]:
+        """
+        Returns up to `limit` locations whose key starts with `prefix`, in alphabetical order.
+        """
+        matches: List[LocationEntry] = []
+        index = bisect.bisect_left(self._keys, prefix)
+        while (
+            index < len(self._keys)
+            and len(matches) < limit
+            and self._keys[index].startswith(prefix)
+        ):
+            matches.append(self._by_key[self._keys[index]])
+            index += 1
+        return matches
+
+
+directory = LocationDirectory()
+
+
+class LocationSuggestion(BaseModel):
+    """
+    A location offered while the user types, with the ID events reference it by.
+    """
+
+    id: str
+    name: str
+
+
+class LocationSuggestResponse(BaseModel):
+    """
+    Response model listing the known locations that complete the typed prefix.
+    """
+
+    locations: List[LocationSuggestion]
+
+
+@project.metrics.measure_queries
+async def intern_locations(names: Iterable[str]) -> Dict[str, str]:
+    """
+    Looks up the location row of every name, creating rows for places not seen before.
+
+    Names already interned are resolved in memory. A new place is upserted on its key, so that two workers
+    interning it at once end up with the same row, and the other workers are told about it.
+
+    Returns:
+        Dict[str, str]: The location ID of each name.
+    """
+    ids: Dict[str, str] = {}
+    for name in set(names):
+        key = location_key(name)
+        entry = directory.get(key)
+        if entry is None:
+            location = await prisma.models.Location.prisma().upsert(
+                where={"key": key},
+                data={"create": {"key": key, "name": name.strip()}, "update": {}},
+            )
+            directory.add(location)
+            project.invalidation.location_added(location.id)
+            ids[name] = location.id
+        else:
+            ids[name] = entry.id
+    return ids
+
+
+async def intern_location(name: str) -> str:
+    return (await intern_locations([name]))[name]
+
+
+@project.metrics.measure_queries
+async def find_location(name: str) -> Optional[str]:
+    """
+    Resolves a location filter to the ID of its interned location.
+
+    Locations interned by another worker that this one has not heard of yet are read from the database.
+
+    Returns:
+        Optional[str]: The location ID, or None if no event was ever held there.
+    """
+    key = location_key(name)
+    entry = directory.get(key)
+    if entry is not None:
+        return entry.id
+    location = await prisma.models.Location.prisma().find_unique(where={"key": key})
+    if location is None:
+        return None
+    directory.add(location)
+    return location.id
+
+
+@project.metrics.measure_queries
+async def load_locations(location_ids: Optional[List[str]] = None) -> None:
+    """
+    Reads locations into the directory: the given ones, or all of them into a new directory that replaces the
+    current one once loaded, so that lookups never see it empty.
+
+    Locations are never changed or deleted once interned, so the ones this worker learnt of while the new
+    directory was loading are carried over to it.
+    """
+    global directory
+    locations = await prisma.models.Location.prisma().find_many(
+        where={"id": {"in": location_ids}} if location_ids is not None else None
+    )
+    if location_ids is not None:
+        for location in locations:
+            directory.add(location)
+        return
+    loaded = LocationDirectory()
+    for location in locations:
+        loaded.add(location)
+    for entry in directory.entries():
+        if loaded.get(entry.key) is None:
+            loaded.add(entry)
+    directory = loaded
+
+
+@project.metrics.measure_queries
+async def backfill_event_locations() -> int:
+    """
+    Links events written before locations were interned to their location, in batches.
+
+    Returns:
+        int: The number of events linked; zero once every event has a location.
+    """
+    linked = 0
+    while True:
+        events = await prisma.partials.EventListing.prisma().find_many(
+            where={"locationId": None}, take=BACKFILL_BATCH_SIZE
+        )
+        if not events:
+            break
+        by_name: Dict[str, List[str]] = defaultdict(list)
+        for event in events:
+            by_name[event.location].append(event.id)
+        ids = await intern_locations(by_name)
+        for name, event_ids in by_name.items():
+            await prisma.models.Event.prisma().update_many(
+                where={"id": {"in": event_ids}}, data={"locationId": ids[name]}
+            )
+        linked += len(events)
+        if len(events) < BACKFILL_BATCH_SIZE:
+            break
+    if linked:
+        logger.info("Linked %d events to their interned location", linked)
+    return linked
+
+
+async def suggest_locations(
+    prefix: str, limit: int = DEFAULT_SUGGESTIONS
+) -> LocationSuggestResponse:
+    """
+    Endpoint for location autocomplete, answered from memory without querying the database.
+
+    The prefix is normalized like the locations themselves, so case, accents and punctuation do not matter.
+    When it is a complete alias, such as "nyc", the place it stands for is suggested first.
+
+    Args:
+        prefix (str): What the user has typed so far.
+        limit (int): The maximum number of suggestions, capped at MAX_SUGGESTIONS.
+
+    Returns:
+        LocationSuggestResponse: Known locations starting with the prefix, in alphabetical order.
+    """
+    limit = max(1, min(limit, MAX_SUGGESTIONS))
+    normalized = normalize_location(prefix)
+    entries = directory.with_prefix(normalized, limit)
+    aliased = directory.get(LOCATION_ALIASES.get(normalized, normalized))
+    if aliased is not None and aliased not in entries:
+        entries = [aliased] + entries[: limit - 1]
+    return LocationSuggestResponse(
+        locations=[
+            LocationSuggestion(id=entry.id, name=entry.name) for entry in entries
+        ]
+    )
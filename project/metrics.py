@@ -0,0 +1,297 @@
+import bisect
+import contextvars
+import functools
+import inspect
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, TypeVar
+
+import project.profiling
+from fastapi.responses import Response
+from prisma import Prisma
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+LATENCY_BUCKETS = (
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+
+UNMATCHED_ROUTE = "<unmatched>"
+
+current_service: contextvars.ContextVar[str] = contextvars.ContextVar(
+    "current_service", default="<none>"
+)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(
+        f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)
+    )
+    return "{" + pairs + "}"
+
+
+class Metric:
+    """
+    Base class of the in-process metrics rendered in the Prometheus text exposition format.
+
+    Every update is a couple of dictionary operations on the event loop thread, so collection stays cheap
+    enough to leave enabled under full load.
+    """
+
+    kind = "untyped"
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        registry.append(self)
+
+    def render(self) -> List[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = ()):
+        super().__init__(name, help, labels)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, *labels: str, amount: float = 1) -> None:
+        self._values[labels] = self._values.get(labels, 0) + amount
+
+    def render(self) -> List[str]:
+        lines = super().render()
+        for labels, value in self._values.items():
+            lines.append(f"{self.name}{_format_labels(self.labels, labels)} {value}")
+        return lines
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def dec(self, *labels: str, amount: float = 1) -> None:
+        self.inc(*labels, amount=-amount)
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labels: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ):
+        super().__init__(name, help, labels)
+        self.buckets = tuple(buckets)
+        self._series: Dict[Tuple[str, ...], List[Any]] = {}
+
+    def observe(self, value: float, *labels: str) -> None:
+        series = self._series.get(labels)
+        if series is None:
+            series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+        series[0][bisect.bisect_left(self.buckets, value)] += 1
+        series[1] += value
+        series[2] += 1
+
+    def total_count(self) -> int:
+        """
+        The number of values observed, summed over every label set.
+        """
+        return sum(count for _, _, count in self._series.values())
+
+    def render(self) -> List[str]:
+        lines = super().render()
+        names = self.labels + ("le",)
+        for labels, (counts, total, count) in self._series.items():
+            cumulative = 0
+            for bound, hits in zip(self.buckets + (float("inf"),), counts):
+                cumulative += hits
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                lines.append(
+                    f"{self.name}_bucket{_format_labels(names, labels + (le,))} {cumulative}"
+                )
+            suffix = _format_labels(self.labels, labels)
+            lines.append(f"{self.name}_sum{suffix} {total}")
+            lines.append(f"{self.name}_count{suffix} {count}")
+        return lines
+
+
+registry: List[Metric] = []
+
+http_request_duration = Histogram(
+    "http_request_duration_seconds",
+    "Time spent handling HTTP requests, by route template and status code.",
+    ("method", "route", "status"),
+)
+
+http_requests_in_flight = Gauge(
+    "http_requests_in_flight",
+    "HTTP requests currently being handled.",
+    ("method",),
+)
+
+db_query_duration = Histogram(
+    "db_query_duration_seconds",
+    "Time spent in database queries, by the service function that issued them.",
+    ("service", "model", "operation"),
+)
+
+db_query_errors = Counter(
+    "db_query_errors_total",
+    "Database queries that raised, by the service function that issued them.",
+    ("service", "model", "operation"),
+)
+
+
+def render() -> str:
+    """
+    Renders every registered metric in the Prometheus text exposition format.
+    """
+    lines: List[str] = []
+    for metric in registry:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+def measure_queries(fn: F) -> F:
+    """
+    Attributes the database queries made while `fn` runs to it in `db_query_duration_seconds`.
+
+    Works on coroutine functions and async generators. Nested service calls are attributed to the
+    innermost decorated function.
+    """
+    name = fn.__name__
+    if inspect.isasyncgenfunction(fn):
+
+        @functools.wraps(fn)
+        async def generator_wrapper(*args: Any, **kwargs: Any) -> Any:
+            token = current_service.set(name)
+            try:
+                async for item in fn(*args, **kwargs):
+                    yield item
+            finally:
+                try:
+                    current_service.reset(token)
+                except ValueError:
+                    pass
+
+        return generator_wrapper  # type: ignore[return-value]
+
+    @functools.wraps(fn)
+    async def wrapper(*args: Any, **kwargs: Any) -> Any:
+        token = current_service.set(name)
+        try:
+            return await fn(*args, **kwargs)
+        finally:
+            current_service.reset(token)
+
+    return wrapper  # type: ignore[return-value]
+
+
+class InstrumentedPrisma(Prisma):
+    """
+    A Prisma client that times every query it sends to the query engine, and hands each one to the request
+    profiler and slow-query log.
+
+    Transaction clients are copies of this class, so queries inside `tx()` are measured too.
+    """
+
+    async def _execute(
+        self,
+        *,
+        method: str,
+        arguments: Dict[str, Any],
+        model: Optional[type] = None,
+        root_selection: Optional[List[str]] = None,
+    ) -> Any:
+        labels = (
+            current_service.get(),
+            getattr(model, "__prisma_model__", "<raw>"),
+            method,
+        )
+        started = time.perf_counter()
+        try:
+            return await super()._execute(
+                method=method,
+                arguments=arguments,
+                model=model,
+                root_selection=root_selection,
+            )
+        except Exception:
+            db_query_errors.inc(*labels)
+            raise
+        finally:
+            elapsed = time.perf_counter() - started
+            db_query_duration.observe(elapsed, *labels)
+            project.profiling.record_query(*labels, arguments, elapsed)
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware recording the latency and status of every HTTP request and the number in flight.
+
+    Requests are labelled with their route template rather than the raw path, so path parameters do not
+    create a new series per ID; requests that match no route share a single label.
+    """
+
+    def __init__(self, app: Callable):
+        self.app = app
+
+    async def __call__(self, scope: dict, receive: Callable, send: Callable) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        method = scope["method"]
+        status = 500
+        started = time.perf_counter()
+
+        async def send_wrapper(message: dict) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        http_requests_in_flight.inc(method)
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            http_requests_in_flight.dec(method)
+            route = scope.get("route")
+            http_request_duration.observe(
+                time.perf_counter() - started,
+                method,
+                getattr(route, "path", UNMATCHED_ROUTE),
+                str(status),
+            )
+
+
+async def metrics() -> Response:
+    """
+    Endpoint for Prometheus to scrape request and database metrics.
+
+    Returns:
+        Response: The current value of every metric in the Prometheus text exposition format.
+    """
+    return Response(content=render(), media_type=CONTENT_TYPE)
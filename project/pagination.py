@@ -0,0 +1,105 @@
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import Any, List, Optional, Tuple
+
+DEFAULT_PAGE_SIZE = 20
+
+MAX_PAGE_SIZE = 100
+
+NEWEST_FIRST = [{"createdAt": "desc"}, {"id": "desc"}]
+
+EARLIEST_FIRST = [{"date": "asc"}, {"id": "asc"}]
+
+
+class InvalidCursorError(ValueError):
+    """
+    Raised when a pagination cursor cannot be decoded or does not belong to the endpoint it was sent to.
+    """
+
+
+def clamp_page_size(limit: Optional[int]) -> int:
+    """
+    Bounds a client supplied page size to 1..MAX_PAGE_SIZE, falling back to DEFAULT_PAGE_SIZE.
+    """
+    if limit is None:
+        return DEFAULT_PAGE_SIZE
+    return max(1, min(limit, MAX_PAGE_SIZE))
+
+
+def encode_cursor(*values: Any) -> str:
+    """
+    Packs the sort key of the last row on a page into an opaque, URL-safe cursor.
+
+    Args:
+        *values: The sort key values. Datetimes are stored in ISO 8601 form.
+
+    Returns:
+        str: The cursor to hand back to the client as `next_cursor`.
+    """
+    payload = json.dumps(
+        [value.isoformat() if isinstance(value, datetime) else value for value in values],
+        separators=(",", ":"),
+    )
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> List[Any]:
+    """
+    Unpacks a cursor produced by `encode_cursor`.
+
+    Raises:
+        InvalidCursorError: If the cursor is not valid base64 encoded JSON list.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except (binascii.Error, UnicodeError, ValueError):
+        raise InvalidCursorError("Malformed pagination cursor")
+    if not isinstance(values, list):
+        raise InvalidCursorError("Malformed pagination cursor")
+    return values
+
+
+def decode_keyset_cursor(cursor: str) -> Tuple[datetime, str]:
+    """
+    Unpacks a cursor that seeks on a timestamp and `id`, such as (`createdAt`, `id`).
+
+    Raises:
+        InvalidCursorError: If the cursor does not hold a timestamp and an ID.
+    """
+    values = decode_cursor(cursor)
+    try:
+        created_at, id = values
+        return datetime.fromisoformat(created_at), str(id)
+    except (TypeError, ValueError):
+        raise InvalidCursorError("Cursor does not belong to this listing")
+
+
+def seek_after(created_at: datetime, id: str) -> dict:
+    """
+    Builds the Prisma filter selecting rows after (`created_at`, `id`) in newest-first order.
+
+    Together with an `order` of `createdAt` then `id`, both descending, this lets the database seek straight
+    to the next page through the index instead of counting past skipped rows like OFFSET does.
+    """
+    return {
+        "OR": [
+            {"createdAt": {"lt": created_at}},
+            {"createdAt": created_at, "id": {"lt": id}},
+        ]
+    }
+
+
+def seek_after_date(date: datetime, id: str) -> dict:
+    """
+    Builds the Prisma filter selecting events after (`date`, `id`) in the EARLIEST_FIRST order, the
+    counterpart of `seek_after` for listings in the order events happen.
+    """
+    return {
+        "OR": [
+            {"date": {"gt": date}},
+            {"date": date, "id": {"gt": id}},
+        ]
+    }
@@ -0,0 +1,13 @@
+# Partial models run by `prisma generate` (see `partial_type_generator` in schema.prisma).
+# Querying through a partial model makes Prisma select only that model's columns.
+from prisma.models import Event, Feedback
+
+Event.create_partial(
+    "EventListing", exclude=["description"], exclude_relational_fields=True
+)
+
+Feedback.create_partial(
+    "FeedbackListing", exclude=["content"], exclude_relational_fields=True
+)
+
+Event.create_partial("EventKey", include=["id"])
@@ -0,0 +1,130 @@
+import asyncio
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Optional
+
+import bcrypt
+
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+
+PASSWORD_HASH_EXECUTOR = os.getenv("PASSWORD_HASH_EXECUTOR", "thread")
+
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", os.cpu_count() or 1))
+
+PASSWORD_HASH_QUEUE_SIZE = int(os.getenv("PASSWORD_HASH_QUEUE_SIZE", "32"))
+
+
+class PasswordHasherBusyError(Exception):
+    """
+    Raised when every password hashing worker is busy and the waiting queue is full.
+    """
+
+
+_executor: Optional[Executor] = None
+
+_pending = 0
+
+
+def _hash(password: bytes, rounds: int) -> bytes:
+    return bcrypt.hashpw(password, bcrypt.gensalt(rounds))
+
+
+def _check(password: bytes, hashed: bytes) -> bool:
+    return bcrypt.checkpw(password, hashed)
+
+
+def _get_executor() -> Executor:
+    global _executor
+    if _executor is None:
+        if PASSWORD_HASH_EXECUTOR == "process":
+            _executor = ProcessPoolExecutor(max_workers=PASSWORD_HASH_WORKERS)
+        elif PASSWORD_HASH_EXECUTOR == "thread":
+            _executor = ThreadPoolExecutor(
+                max_workers=PASSWORD_HASH_WORKERS, thread_name_prefix="bcrypt"
+            )
+        else:
+            raise ValueError(
+                f"Unsupported password hash executor: {PASSWORD_HASH_EXECUTOR}"
+            )
+    return _executor
+
+
+async def _run(fn: Callable[..., Any], *args: Any) -> Any:
+    """
+    Runs a bcrypt call in the worker pool so that it does not block the event loop.
+
+    At most PASSWORD_HASH_WORKERS calls run at once and PASSWORD_HASH_QUEUE_SIZE more may wait for a worker.
+    Anything beyond that is rejected immediately rather than queued without bound.
+
+    Raises:
+        PasswordHasherBusyError: If the pool and its queue are saturated.
+    """
+    global _pending
+    if _pending >= PASSWORD_HASH_WORKERS + PASSWORD_HASH_QUEUE_SIZE:
+        raise PasswordHasherBusyError("Too many password operations in progress")
+    _pending += 1
+    try:
+        return await asyncio.get_running_loop().run_in_executor(
+            _get_executor(), fn, *args
+        )
+    finally:
+        _pending -= 1
+
+
+async def hash_password(password: str) -> str:
+    """
+    Hashes a password with bcrypt at the configured cost factor.
+
+    Args:
+        password (str): The plain text password.
+
+    Returns:
+        str: The bcrypt hash, ready to be stored on the user record.
+    """
+    hashed = await _run(_hash, password.encode("utf-8"), BCRYPT_ROUNDS)
+    return hashed.decode("utf-8")
+
+
+async def verify_password(password: str, hashed: str) -> bool:
+    """
+    Checks a password against a stored bcrypt hash.
+
+    Args:
+        password (str): The plain text password supplied by the user.
+        hashed (str): The bcrypt hash stored on the user record.
+
+    Returns:
+        bool: True if the password matches.
+    """
+    return await _run(_check, password.encode("utf-8"), hashed.encode("utf-8"))
+
+
+def needs_rehash(hashed: str) -> bool:
+    """
+    Tells whether a stored hash was made with a cost factor other than BCRYPT_ROUNDS.
+
+    Hashes look like `$2b$12$<salt and digest>`, where the third field is the cost factor.
+    """
+    try:
+        return int(hashed.split("$")[2]) != BCRYPT_ROUNDS
+    except (IndexError, ValueError):
+        return True
+
+
+def warm_up() -> None:
+    """
+    Starts the worker pool ahead of the first password operation, which would otherwise wait for it to spawn.
+    """
+    executor = _get_executor()
+    for _ in range(PASSWORD_HASH_WORKERS):
+        executor.submit(int)
+
+
+def shutdown() -> None:
+    """
+    Stops the worker pool, waiting for in-flight operations to finish.
+    """
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=True)
+        _executor = None
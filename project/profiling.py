@@ -0,0 +1,391 @@
+import collections
+import contextvars
+import io
+import itertools
+import logging
+import os
+import random
+import time
+from datetime import datetime, timezone
+from typing import (
+    TYPE_CHECKING,
+    AbstractSet,
+    Any,
+    Callable,
+    Deque,
+    Dict,
+    List,
+    Optional,
+)
+
+from fastapi.encoders import jsonable_encoder
+from pydantic import BaseModel
+
+if TYPE_CHECKING:
+    import cProfile
+    import pstats
+
+logger = logging.getLogger(__name__)
+
+PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", "0"))
+
+PROFILE_TOKEN = os.getenv("PROFILE_TOKEN", "")
+
+PROFILE_HEADER = "x-profile"
+
+PROFILE_HISTORY = int(os.getenv("PROFILE_HISTORY", "50"))
+
+PROFILE_TOP_FUNCTIONS = int(os.getenv("PROFILE_TOP_FUNCTIONS", "40"))
+
+SLOW_QUERY_SECONDS = float(os.getenv("SLOW_QUERY_MS", "500")) / 1000
+
+SLOW_QUERY_LOG_SIZE = int(os.getenv("SLOW_QUERY_LOG_SIZE", "100"))
+
+# Top-level query arguments logged as they are: they shape the query and come from the code, not from users.
+# Every other value, such as a `where` filter, written `data` or raw query parameters, is replaced by REDACTED.
+LOGGED_ARGUMENTS = {
+    "take",
+    "skip",
+    "include",
+    "order_by",
+    "orderBy",
+    "by",
+    "distinct",
+    "query",
+}
+
+# Options nested in a filter that are logged as they are, such as a string filter's case sensitivity.
+LOGGED_OPTIONS = {"mode"}
+
+REDACTED = "***"
+
+MAX_LOGGED_ITEMS = 20
+
+SERIALIZING_MODULES = (
+    os.path.join("starlette", "responses.py"),
+    os.path.join("project", "fast_json.py"),
+)
+
+
+class ProfileNotFoundError(LookupError):
+    """
+    Raised when a profile ID is unknown or has already been dropped from the history.
+    """
+
+
+class QueryTiming(BaseModel):
+    """
+    One database query made while a profiled request was handled.
+    """
+
+    service: str
+    model: str
+    operation: str
+    duration_ms: float
+
+
+class ProfileSummary(BaseModel):
+    """
+    Where the time of a profiled request went: the database, pydantic validation, JSON serialization, and
+    everything else.
+
+    Database time is the wall time spent waiting for queries. Validation and serialization are taken from the
+    call-stack profile: the cumulative time of pydantic-core validators and of FastAPI's `jsonable_encoder`
+    and response rendering, including `FastJSONResponse`, respectively.
+    """
+
+    id: str
+    method: str
+    path: str
+    status: int
+    trigger: str
+    started_at: datetime
+    duration_ms: float
+    db_ms: float
+    db_queries: int
+    validation_ms: float
+    serialization_ms: float
+    other_ms: float
+
+
+class RequestProfile(ProfileSummary):
+    """
+    A profiled request with its individual queries and the hottest functions of its call-stack profile.
+
+    Python can only profile a whole thread, so the stack may include work that other requests did on the event
+    loop while this one was waiting.
+    """
+
+    queries: List[QueryTiming]
+    stack: str
+
+
+class ProfileListResponse(BaseModel):
+    """
+    Response model listing the most recent request profiles, newest first.
+    """
+
+    profiles: List[ProfileSummary]
+
+
+class SlowQuery(BaseModel):
+    """
+    A database query that took longer than SLOW_QUERY_MS, with the shape of its arguments. Only the values of
+    LOGGED_ARGUMENTS are kept, the others are redacted; unset arguments are dropped and long lists shortened.
+    """
+
+    at: datetime
+    service: str
+    model: str
+    operation: str
+    duration_ms: float
+    arguments: Any
+
+
+class SlowQueryLogResponse(BaseModel):
+    """
+    Response model listing the most recent slow queries, newest first.
+    """
+
+    threshold_ms: float
+    queries: List[SlowQuery]
+
+
+class _Recorder:
+    def __init__(self):
+        self.queries: List[QueryTiming] = []
+
+
+_active: contextvars.ContextVar[Optional[_Recorder]] = contextvars.ContextVar(
+    "active_profile", default=None
+)
+
+_ids = itertools.count(1)
+
+_profiling = False
+
+profiles: "collections.OrderedDict[str, RequestProfile]" = collections.OrderedDict()
+
+slow_query_log: Deque[SlowQuery] = collections.deque(maxlen=SLOW_QUERY_LOG_SIZE)
+
+
+def _redact(value: Any, logged: AbstractSet[str] = LOGGED_ARGUMENTS) -> Any:
+    # Keeps the keys of nested arguments, which name columns and operators, and redacts every other value.
+    if isinstance(value, dict):
+        return {
+            key: item if key in logged else _redact(item, LOGGED_OPTIONS)
+            for key, item in value.items()
+            if item is not None
+        }
+    if isinstance(value, (list, tuple)):
+        items = [_redact(item, LOGGED_OPTIONS) for item in value[:MAX_LOGGED_ITEMS]]
+        if len(value) > MAX_LOGGED_ITEMS:
+            items.append(f"... {len(value) - MAX_LOGGED_ITEMS} more")
+        return items
+    return REDACTED
+
+
+def record_query(
+    service: str, model: str, operation: str, arguments: Any, seconds: float
+) -> None:
+    """
+    Called by the database client after every query: adds it to the profile of the current request, if that
+    request is being profiled, and to the slow-query log when it took SLOW_QUERY_MS or longer.
+    """
+    recorder = _active.get()
+    if recorder is not None:
+        recorder.queries.append(
+            QueryTiming(
+                service=service,
+                model=model,
+                operation=operation,
+                duration_ms=seconds * 1000,
+            )
+        )
+    if seconds >= SLOW_QUERY_SECONDS:
+        slow_query = SlowQuery(
+            at=datetime.now(timezone.utc),
+            service=service,
+            model=model,
+            operation=operation,
+            duration_ms=seconds * 1000,
+            arguments=jsonable_encoder(_redact(arguments)),
+        )
+        slow_query_log.append(slow_query)
+        logger.warning(
+            "Slow query: %s.%s from %s took %.1f ms: %s",
+            model,
+            operation,
+            service,
+            slow_query.duration_ms,
+            slow_query.arguments,
+        )
+
+
+def _breakdown(stats: "pstats.Stats") -> Dict[str, float]:
+    validation = serialization = 0.0
+    for (filename, _, name), (_, _, _, cumulative, _) in stats.stats.items():  # type: ignore[attr-defined]
+        if filename == "~" and "pydantic_core" in name and "validate_" in name:
+            validation += cumulative
+        elif (
+            filename.endswith(os.path.join("fastapi", "encoders.py"))
+            and name == "jsonable_encoder"
+        ) or (filename.endswith(SERIALIZING_MODULES) and name == "render"):
+            serialization += cumulative
+    return {"validation": validation, "serialization": serialization}
+
+
+def _trigger(scope: dict) -> Optional[str]:
+    if PROFILE_TOKEN:
+        for name, value in scope.get("headers", ()):
+            if name == PROFILE_HEADER.encode("latin-1"):
+                if value.decode("latin-1") == PROFILE_TOKEN:
+                    return "header"
+                break
+    if PROFILE_SAMPLE_RATE and random.random() < PROFILE_SAMPLE_RATE:
+        return "sample"
+    return None
+
+
+class ProfilingMiddleware:
+    """
+    ASGI middleware profiling the requests that ask for it with an `X-Profile: <PROFILE_TOKEN>` header, plus a
+    random PROFILE_SAMPLE_RATE fraction of all requests.
+
+    Only one request is profiled at a time, since Python allows a single active profiler; requests arriving
+    meanwhile are served unprofiled. A profiled response carries an `X-Profile-Id` header naming its profile
+    at /admin/profiles/{id}.
+    """
+
+    def __init__(self, app: Callable):
+        self.app = app
+
+    async def __call__(self, scope: dict, receive: Callable, send: Callable) -> None:
+        global _profiling
+        if scope["type"] != "http" or _profiling:
+            await self.app(scope, receive, send)
+            return
+        trigger = _trigger(scope)
+        if trigger is None:
+            await self.app(scope, receive, send)
+            return
+        profile_id = str(next(_ids))
+        status = 500
+
+        async def send_wrapper(message: dict) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                message["headers"] = list(message.get("headers", ())) + [
+                    (b"x-profile-id", profile_id.encode("latin-1"))
+                ]
+            await send(message)
+
+        recorder = _Recorder()
+        token = _active.set(recorder)
+        # cProfile and pstats are imported on first use to keep them off the cold-start path.
+        import cProfile
+
+        profiler = cProfile.Profile()
+        started_at = datetime.now(timezone.utc)
+        started = time.perf_counter()
+        _profiling = True
+        profiler.enable()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            profiler.disable()
+            _profiling = False
+            duration = time.perf_counter() - started
+            _active.reset(token)
+            self._store(
+                profile_id,
+                scope,
+                status,
+                trigger,
+                started_at,
+                duration,
+                recorder,
+                profiler,
+            )
+
+    def _store(
+        self,
+        profile_id: str,
+        scope: dict,
+        status: int,
+        trigger: str,
+        started_at: datetime,
+        duration: float,
+        recorder: _Recorder,
+        profiler: "cProfile.Profile",
+    ) -> None:
+        import pstats
+
+        stream = io.StringIO()
+        stats = pstats.Stats(profiler, stream=stream)
+        stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(PROFILE_TOP_FUNCTIONS)
+        breakdown = _breakdown(stats)
+        db = sum(query.duration_ms for query in recorder.queries)
+        validation = breakdown["validation"] * 1000
+        serialization = breakdown["serialization"] * 1000
+        profiles[profile_id] = RequestProfile(
+            id=profile_id,
+            method=scope["method"],
+            path=scope["path"],
+            status=status,
+            trigger=trigger,
+            started_at=started_at,
+            duration_ms=duration * 1000,
+            db_ms=db,
+            db_queries=len(recorder.queries),
+            validation_ms=validation,
+            serialization_ms=serialization,
+            other_ms=max(0.0, duration * 1000 - db - validation - serialization),
+            queries=recorder.queries,
+            stack=stream.getvalue(),
+        )
+        while len(profiles) > PROFILE_HISTORY:
+            profiles.popitem(last=False)
+
+
+async def list_profiles() -> ProfileListResponse:
+    """
+    Endpoint for operators to list the most recent request profiles.
+
+    Returns:
+        ProfileListResponse: Response model listing the most recent request profiles, newest first.
+    """
+    return ProfileListResponse(
+        profiles=[
+            ProfileSummary.model_validate(
+                profile.model_dump(exclude={"queries", "stack"})
+            )
+            for profile in reversed(profiles.values())
+        ]
+    )
+
+
+async def get_profile(id: str) -> RequestProfile:
+    """
+    Endpoint for operators to read one request profile, including its queries and call-stack profile.
+
+    Raises:
+        ProfileNotFoundError: If no profile with this ID is kept.
+    """
+    profile = profiles.get(id)
+    if profile is None:
+        raise ProfileNotFoundError(f"Profile {id} not found")
+    return profile
+
+
+async def slow_queries() -> SlowQueryLogResponse:
+    """
+    Endpoint for operators to read the slow-query log.
+
+    Returns:
+        SlowQueryLogResponse: Response model listing the most recent slow queries, newest first.
+    """
+    return SlowQueryLogResponse(
+        threshold_ms=SLOW_QUERY_SECONDS * 1000, queries=list(reversed(slow_query_log))
+    )
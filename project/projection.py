@@ -0,0 +1,30 @@
+from typing import Iterable, Optional, Set
+
+
+class InvalidFieldsError(ValueError):
+    """
+    Raised when a `fields=` parameter names a field the endpoint does not return.
+    """
+
+
+def parse_fields(fields: Optional[str], allowed: Iterable[str]) -> Optional[Set[str]]:
+    """
+    Parses a comma separated sparse fieldset such as "id,title,date".
+
+    Args:
+        fields (Optional[str]): The raw `fields=` query parameter.
+        allowed (Iterable[str]): The field names the endpoint can return.
+
+    Returns:
+        Optional[Set[str]]: The requested field names, or None when every field should be returned.
+
+    Raises:
+        InvalidFieldsError: If an unknown field is requested.
+    """
+    if fields is None or not fields.strip():
+        return None
+    requested = {name.strip() for name in fields.split(",") if name.strip()}
+    unknown = requested.difference(allowed)
+    if unknown:
+        raise InvalidFieldsError(f"Unknown fields: {', '.join(sorted(unknown))}")
+    return requested
@@ -0,0 +1,172 @@
+import os
+import time
+from collections import OrderedDict
+from typing import Dict, Hashable, List, Optional, Tuple
+
+from pydantic import BaseModel
+
+RATE_LIMIT_MAX_KEYS = int(os.getenv("RATE_LIMIT_MAX_KEYS", "100000"))
+
+# The number of proxies in front of the app that append the address they were reached from to X-Forwarded-For:
+# 1 on Cloud Run, 2 behind an external load balancer in front of Cloud Run, 0 when clients connect directly.
+TRUSTED_PROXY_HOPS = int(os.getenv("TRUSTED_PROXY_HOPS", "0"))
+
+
+class RateLimitedError(Exception):
+    """
+    Raised when a caller has used up its allowance; `retry_after` tells them how many seconds to wait.
+    """
+
+    def __init__(self, message: str, retry_after: float):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class RateLimiterStats(BaseModel):
+    """
+    Counters describing what a rate limiter let through and rejected.
+    """
+
+    name: str
+    capacity: float
+    refill_per_second: float
+    keys: int
+    max_keys: int
+    allowed: int
+    rejected: int
+    evicted: int
+
+
+class RateLimiterStatsResponse(BaseModel):
+    """
+    Response model listing the counters of every registered rate limiter.
+    """
+
+    limiters: List[RateLimiterStats]
+
+
+limiters: Dict[str, "TokenBucketLimiter"] = {}
+
+
+class TokenBucketLimiter:
+    """
+    A per-key token bucket: each key may burst up to `capacity` calls, refilled at `refill_per_second`.
+
+    Buckets are kept in least recently used order and the longest idle ones are dropped beyond `max_keys`, so
+    memory stays bounded under attacks that rotate through many keys. An idle bucket has usually refilled
+    completely, in which case dropping it loses nothing.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        capacity: float,
+        refill_per_second: float,
+        max_keys: int = RATE_LIMIT_MAX_KEYS,
+    ):
+        self.name = name
+        self.capacity = capacity
+        self.refill_per_second = refill_per_second
+        self.max_keys = max_keys
+        self._buckets: "OrderedDict[Hashable, Tuple[float, float]]" = OrderedDict()
+        self.allowed = 0
+        self.rejected = 0
+        self.evicted = 0
+        limiters[name] = self
+
+    def acquire(self, key: Hashable) -> float:
+        """
+        Takes one token from the bucket of `key`.
+
+        Returns:
+            float: 0 if the call is allowed, otherwise the number of seconds until a token is available.
+        """
+        now = time.monotonic()
+        tokens, updated_at = self._buckets.pop(key, (self.capacity, now))
+        tokens = min(
+            self.capacity, tokens + (now - updated_at) * self.refill_per_second
+        )
+        if tokens >= 1:
+            self._buckets[key] = (tokens - 1, now)
+            self.allowed += 1
+            retry_after = 0.0
+        else:
+            self._buckets[key] = (tokens, now)
+            self.rejected += 1
+            retry_after = (1 - tokens) / self.refill_per_second
+        while len(self._buckets) > self.max_keys:
+            self._buckets.popitem(last=False)
+            self.evicted += 1
+        return retry_after
+
+    def stats(self) -> RateLimiterStats:
+        return RateLimiterStats(
+            name=self.name,
+            capacity=self.capacity,
+            refill_per_second=self.refill_per_second,
+            keys=len(self._buckets),
+            max_keys=self.max_keys,
+            allowed=self.allowed,
+            rejected=self.rejected,
+            evicted=self.evicted,
+        )
+
+
+login_by_email = TokenBucketLimiter(
+    "login_by_email",
+    capacity=float(os.getenv("LOGIN_EMAIL_BURST", "5")),
+    refill_per_second=float(os.getenv("LOGIN_EMAIL_PER_MINUTE", "5")) / 60,
+)
+
+login_by_ip = TokenBucketLimiter(
+    "login_by_ip",
+    capacity=float(os.getenv("LOGIN_IP_BURST", "30")),
+    refill_per_second=float(os.getenv("LOGIN_IP_PER_MINUTE", "60")) / 60,
+)
+
+
+def client_address(forwarded_for: Optional[str], peer: Optional[str]) -> Optional[str]:
+    """
+    Works out the address a request came from, for the per-IP login throttle.
+
+    Behind TRUSTED_PROXY_HOPS proxies, the client is the X-Forwarded-For entry that many places from the right.
+    Entries further left were sent by the client itself and are ignored, so they cannot be used to dodge the
+    throttle. Without trusted proxies, or when the header has fewer entries than expected, the peer address of
+    the connection is used.
+    """
+    if TRUSTED_PROXY_HOPS and forwarded_for:
+        hops = [hop.strip() for hop in forwarded_for.split(",")]
+        if len(hops) >= TRUSTED_PROXY_HOPS and hops[-TRUSTED_PROXY_HOPS]:
+            return hops[-TRUSTED_PROXY_HOPS]
+    return peer
+
+
+def check_login(email: str, client_ip: Optional[str]) -> None:
+    """
+    Applies the login throttles before any database or bcrypt work is done for an attempt.
+
+    Attempts are limited per client IP, which stops a single source spraying many accounts, and per email,
+    which stops a distributed attack on one account.
+
+    Raises:
+        RateLimitedError: If either the client IP or the email has used up its allowance.
+    """
+    if client_ip:
+        retry_after = login_by_ip.acquire(client_ip)
+        if retry_after:
+            raise RateLimitedError("Too many login attempts", retry_after)
+    retry_after = login_by_email.acquire(email.casefold())
+    if retry_after:
+        raise RateLimitedError("Too many login attempts", retry_after)
+
+
+async def rate_limit_stats() -> RateLimiterStatsResponse:
+    """
+    Endpoint for operators to inspect rate limiter counters.
+
+    Returns:
+        RateLimiterStatsResponse: Response model listing the counters of every registered rate limiter.
+    """
+    return RateLimiterStatsResponse(
+        limiters=[limiter.stats() for limiter in limiters.values()]
+    )
@@ -3,7 +3,8 @@ from typing import Optional
 import prisma
 import prisma.enums
 import prisma.models
-from bcrypt import gensalt, hashpw
+import project.metrics
+import project.passwords
 from pydantic import BaseModel
 
 
@@ -17,34 +18,37 @@ class RegisterUserResponse(BaseModel):
     userId: Optional[str] = None
 
 
+@project.metrics.measure_queries
 async def register_user(email: str, password: str) -> RegisterUserResponse:
     """
     Endpoint for new users to create an account.
 
     Args:
         email (str): The email address for the new user account. It's crucial that this email is unique in the system to prevent duplicate accounts.
-        password (str): The password for the new user account. It should be encrypted before being stored in the database for security reasons.
+        password (str): The password for the new user account. It is hashed with bcrypt in the password worker pool before being stored.
 
     Returns:
         RegisterUserResponse: A simple model to acknowledge the successful creation of a new user account. It may include an identifier of the newly created user or just a success message.
     """
-    hashed_password = hashpw(password.encode("utf-8"), gensalt())
     try:
         existing_user = await prisma.models.User.prisma().find_unique(
             where={"email": email}
         )
         if existing_user is not None:
             return RegisterUserResponse(success=False, message="User already exists.")
+        hashed_password = await project.passwords.hash_password(password)
         user = await prisma.models.User.prisma().create(
             data={
                 "email": email,
-                "password": hashed_password.decode("utf-8"),
+                "password": hashed_password,
                 "role": prisma.enums.Role.LEARNER,
             }
         )
         return RegisterUserResponse(
             success=True, message="User successfully created.", userId=user.id
         )
+    except project.passwords.PasswordHasherBusyError:
+        raise
     except Exception as e:
         return RegisterUserResponse(
             success=False, message=f"Failed to create user: {str(e)}"
@@ -0,0 +1,236 @@
+import asyncio
+import collections
+import logging
+import os
+from datetime import datetime, timedelta, timezone
+from typing import Deque, List, Optional
+
+import prisma
+import prisma.models
+import project.metrics
+from pydantic import BaseModel
+
+logger = logging.getLogger(__name__)
+
+SEARCH_LOG_QUEUE_SIZE = int(os.getenv("SEARCH_LOG_QUEUE_SIZE", "10000"))
+
+SEARCH_LOG_BATCH_SIZE = int(os.getenv("SEARCH_LOG_BATCH_SIZE", "500"))
+
+SEARCH_LOG_FLUSH_SECONDS = float(os.getenv("SEARCH_LOG_FLUSH_SECONDS", "5"))
+
+FLUSH_TIMEOUT_SECONDS = 10.0
+
+MAX_QUERY_LENGTH = 200
+
+MAX_TOP_QUERIES = 100
+
+MAX_TOP_QUERY_DAYS = 90
+
+# Ranked and cut to `limit` by the database, so only the returned groups leave it. The `createdAt` index
+# bounds the scan to the window.
+TOP_QUERIES_QUERY = """/* top_queries */
+SELECT "query", COUNT(*)::int AS "searches", AVG("resultCount")::float8 AS "average_results"
+FROM "Search"
+WHERE "createdAt" >= $1::timestamp AND "query" <> ''
+  AND (NOT $2::boolean OR "resultCount" = 0)
+GROUP BY "query"
+ORDER BY COUNT(*) DESC, "query"
+LIMIT $3::int
+"""
+
+search_log_entries = project.metrics.Counter(
+    "search_log_entries_total",
+    "Searches handed to the search log, by outcome: written, dropped because the queue was full, or failed to write.",
+    ("outcome",),
+)
+
+
+class TopQuery(BaseModel):
+    """
+    How often one query was searched, and how many results it found on average.
+    """
+
+    query: str
+    searches: int
+    average_results: float
+
+
+class TopQueriesResponse(BaseModel):
+    """
+    Response model listing the most frequent search queries since a point in time.
+    """
+
+    since: datetime
+    queries: List[TopQuery]
+
+
+def canonical_query(
+    keywords: Optional[str] = None,
+    date: Optional[str] = None,
+    location: Optional[str] = None,
+    type: Optional[str] = None,
+) -> str:
+    """
+    Folds a search's parameters into the single string stored in `Search.query`, so that the same search
+    typed with different case or spacing is counted once. Filters follow the keywords as `name:value` terms,
+    e.g. "jazz night location:berlin".
+    """
+    terms = [" ".join(keywords.casefold().split())] if keywords else []
+    for name, value in (("date", date), ("location", location), ("type", type)):
+        if value and value.strip():
+            terms.append(f"{name}:{' '.join(value.casefold().split())}")
+    return " ".join(term for term in terms if term)[:MAX_QUERY_LENGTH]
+
+
+class SearchLog:
+    """
+    Records searches into the `Search` table without making the search wait for an insert.
+
+    `record()` only appends to an in-memory queue. A background task writes the queue out with `create_many`
+    once it holds `batch_size` entries or `flush_seconds` after the last write, whichever comes first. The
+    queue is bounded: when the database falls behind, further searches are dropped and counted in
+    `search_log_entries_total` rather than held in memory. Batches that fail to write are dropped as well.
+    """
+
+    def __init__(self, max_pending: int, batch_size: int, flush_seconds: float):
+        self.max_pending = max_pending
+        self.batch_size = batch_size
+        self.flush_seconds = flush_seconds
+        self.pending: Deque[dict] = collections.deque()
+        self.running = False
+        self._wake: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def record(self, query: str, result_count: int) -> None:
+        """
+        Queues one search for writing. Does nothing unless the log is running.
+        """
+        if not self.running:
+            return
+        if len(self.pending) >= self.max_pending:
+            search_log_entries.inc("dropped")
+            return
+        self.pending.append(
+            {
+                "query": query,
+                "resultCount": result_count,
+                "createdAt": datetime.now(timezone.utc),
+            }
+        )
+        if len(self.pending) >= self.batch_size:
+            self._wake.set()
+
+    def start(self) -> None:
+        self._wake = asyncio.Event()
+        self.running = True
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """
+        Stops accepting searches and writes out the queue, waiting at most FLUSH_TIMEOUT_SECONDS.
+        """
+        if not self.running:
+            return
+        self.running = False
+        self._wake.set()
+        try:
+            await asyncio.wait_for(self._task, FLUSH_TIMEOUT_SECONDS)
+        except asyncio.TimeoutError:
+            search_log_entries.inc("dropped", amount=len(self.pending))
+            logger.warning("Dropped %d unwritten search log entries", len(self.pending))
+            self.pending.clear()
+
+    async def flush(self) -> None:
+        """
+        Writes out every queued search, in batches of at most `batch_size`.
+        """
+        while self.pending:
+            batch = [
+                self.pending.popleft()
+                for _ in range(min(self.batch_size, len(self.pending)))
+            ]
+            try:
+                await write_searches(batch)
+            except Exception:
+                search_log_entries.inc("failed", amount=len(batch))
+                logger.exception("Could not write %d search log entries", len(batch))
+            else:
+                search_log_entries.inc("written", amount=len(batch))
+
+    async def _run(self) -> None:
+        while self.running:
+            try:
+                await asyncio.wait_for(self._wake.wait(), self.flush_seconds)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            await self.flush()
+        await self.flush()
+
+
+search_log = SearchLog(
+    SEARCH_LOG_QUEUE_SIZE, SEARCH_LOG_BATCH_SIZE, SEARCH_LOG_FLUSH_SECONDS
+)
+
+
+@project.metrics.measure_queries
+async def write_searches(batch: List[dict]) -> None:
+    await prisma.models.Search.prisma().create_many(data=batch)
+
+
+def record_search(
+    result_count: int,
+    keywords: Optional[str] = None,
+    date: Optional[str] = None,
+    location: Optional[str] = None,
+    type: Optional[str] = None,
+) -> None:
+    """
+    Queues a search for the `Search` table. Returns at once; the row is written later by `search_log`.
+    """
+    search_log.record(canonical_query(keywords, date, location, type), result_count)
+
+
+def start() -> None:
+    search_log.start()
+
+
+async def stop() -> None:
+    await search_log.stop()
+
+
+@project.metrics.measure_queries
+async def top_queries(
+    days: int = 7, limit: int = 10, no_results: bool = False
+) -> TopQueriesResponse:
+    """
+    Endpoint for operators to see what users search for most, from the `Search` table.
+
+    Searches still queued in memory are not counted until they are written, which takes at most
+    SEARCH_LOG_FLUSH_SECONDS. Searches without any keyword or filter are left out.
+
+    Args:
+        days (int): How many days back to look, capped at MAX_TOP_QUERY_DAYS.
+        limit (int): How many queries to return, capped at MAX_TOP_QUERIES.
+        no_results (bool): Only count searches that found nothing, to show what users look for in vain.
+
+    Returns:
+        TopQueriesResponse: The most frequent queries, most searched first.
+    """
+    days = max(1, min(days, MAX_TOP_QUERY_DAYS))
+    limit = max(1, min(limit, MAX_TOP_QUERIES))
+    since = datetime.now(timezone.utc) - timedelta(days=days)
+    rows = await prisma.get_client().query_raw(
+        TOP_QUERIES_QUERY, since, no_results, limit
+    )
+    return TopQueriesResponse(
+        since=since,
+        queries=[
+            TopQuery(
+                query=row["query"],
+                searches=row["searches"],
+                average_results=row["average_results"],
+            )
+            for row in rows
+        ],
+    )
@@ -1,21 +1,34 @@
-from typing import List
+import asyncio
+from typing import List, Optional, Set, Tuple, Union
 
 import prisma
+import prisma.enums
 import prisma.models
+import prisma.partials
+import project.date_ranges
+import project.facets
+import project.locations
+import project.metrics
+import project.pagination
+import project.projection
+import project.search_analytics
+import project.search_index
 from pydantic import BaseModel
 
 
 class EventSummary(BaseModel):
     """
     A summary representation of an event, including essential details.
+    Fields left out of a sparse fieldset are omitted from the response.
     """
 
-    id: str
-    title: str
-    description: str
-    date: str
-    location: str
-    type: str
+    id: Optional[str] = None
+    title: Optional[str] = None
+    description: Optional[str] = None
+    date: Optional[str] = None
+    location: Optional[str] = None
+    type: Optional[str] = None
+    score: Optional[float] = None
 
 
 class SearchEventsResponse(BaseModel):
@@ -24,49 +37,221 @@ class SearchEventsResponse(BaseModel):
     """
 
     events: List[EventSummary]
+    next_cursor: Optional[str] = None
+    facets: Optional[project.facets.SearchFacets] = None
 
 
+class InvalidEventTypeError(ValueError):
+    """
+    Raised when a `type=` filter names no EventType.
+    """
+
+
+def parse_event_type(type: Optional[str]) -> Optional[str]:
+    """
+    Reads a `type=` filter case-insensitively.
+
+    Returns:
+        Optional[str]: The EventType value, or None when no type was given.
+
+    Raises:
+        InvalidEventTypeError: If the type is not one of EventType.
+    """
+    if not type or not type.strip():
+        return None
+    value = type.strip().upper()
+    if value not in prisma.enums.EventType.__members__:
+        raise InvalidEventTypeError(
+            f"Unknown event type `{type}`; expected one of: "
+            + ", ".join(prisma.enums.EventType.__members__)
+        )
+    return value
+
+
+def summarize_event(
+    event: Union[prisma.models.Event, prisma.partials.EventListing],
+    score: Optional[float] = None,
+    fields: Optional[Set[str]] = None,
+) -> EventSummary:
+    values = {
+        "id": event.id,
+        "title": event.title,
+        "date": event.date.strftime("%Y-%m-%d"),
+        "location": event.location,
+        "type": event.type,
+        "score": score,
+    }
+    if fields is None or "description" in fields:
+        values["description"] = event.description
+    if fields is not None:
+        values = {name: value for name, value in values.items() if name in fields}
+    return EventSummary(**values)
+
+
+def decode_ranked_cursor(cursor: str) -> Tuple[float, str]:
+    """
+    Unpacks a cursor that seeks on (relevance score, `id`) within ranked keyword results.
+
+    Raises:
+        InvalidCursorError: If the cursor does not hold a score and an ID.
+    """
+    values = project.pagination.decode_cursor(cursor)
+    try:
+        score, id = values
+        return float(score), str(id)
+    except (TypeError, ValueError):
+        raise project.pagination.InvalidCursorError(
+            "Cursor does not belong to this listing"
+        )
+
+
+@project.metrics.measure_queries
 async def search_events(
-    keywords: str, date: str, location: str, type: str
+    keywords: Optional[str] = None,
+    date: Optional[str] = None,
+    location: Optional[str] = None,
+    type: Optional[str] = None,
+    cursor: Optional[str] = None,
+    limit: int = project.pagination.DEFAULT_PAGE_SIZE,
+    fields: Optional[str] = None,
+    date_from: Optional[str] = None,
+    date_to: Optional[str] = None,
+    when: Optional[str] = None,
+    facets: bool = False,
 ) -> SearchEventsResponse:
     """
-    Endpoint for users to search and filter events based on keywords, date, location, and event type.
+    Endpoint for users to search and filter events based on keywords, dates, location, and event type.
+
+    Keyword queries are answered from the in-process full-text index and ranked by relevance; only the winning
+    rows are then loaded from the database. Without keywords the filters are applied directly in the database
+    and events are returned newest first; a location filter is resolved to its interned location in memory and
+    matched on the indexed `locationId`, and a type on the indexed `type`. With a date range they are returned
+    in the order they happen instead, so that the index on (`date`, `id`) serves both the range and the order.
+    Either way results are paged with an opaque cursor, so later pages never re-read the rows of earlier ones.
+    When `description` is not among the requested fields it is not selected from the database at all.
+
+    With `facets`, the response also counts every matching event, not just the page, by type, location and
+    month. Keyword hits are counted from the search index; filtered listings with one grouped query that runs
+    alongside the page query.
+
+    Every new search, but not the later pages of one, is queued for the `Search` table without waiting for
+    the write. Its result count is the number of matches for keyword searches, and the size of the first
+    page for filter-only searches, whose total is never counted.
 
     Args:
-        keywords (str): Keywords to match in the event's title or description.
-        date (str): The specific date or date range to filter events. Expected format: "YYYY-MM-DD".
-        location (str): The location to filter events by.
-        type (str): The type of event to filter by.
+        keywords (Optional[str]): Keywords to match in the event's title or description.
+        date (Optional[str]): The specific date to filter events. Expected format: "YYYY-MM-DD".
+        location (Optional[str]): The location to filter events by. Every spelling of the same place matches, see `project.locations.location_key`.
+        type (Optional[str]): The EventType to filter by, case-insensitively.
+        cursor (Optional[str]): The `next_cursor` returned with the previous page, or None for the first page.
+        limit (int): The maximum number of events to return, capped at MAX_PAGE_SIZE.
+        fields (Optional[str]): A comma separated subset of EventSummary fields to return, or None for all of them.
+        date_from (Optional[str]): The first day of a date range, inclusive. Expected format: "YYYY-MM-DD".
+        date_to (Optional[str]): The last day of a date range, inclusive. Expected format: "YYYY-MM-DD".
+        when (Optional[str]): A named date range such as "this_weekend" or "next_30_days", see `project.date_ranges`.
+        facets (bool): Also return facet counts of all matching events.
 
     Returns:
         SearchEventsResponse: Responds with a list of events that match the search and filter criteria.
+        `next_cursor` is set when more events are available.
+
+    Raises:
+        InvalidDateRangeError: If the date filters are malformed or combine `date`, `from`/`to` and `when`.
+        InvalidEventTypeError: If `type` is not an EventType.
 
     Example:
-        result = await search_events(keywords="science", date="2023-01-31", location="New York", type="Conference")
+        result = await search_events(keywords="science", date="2023-01-31", location="New York")
         print(result)
     """
-    query_filters = {
-        "where": {
-            "AND": [
-                {
-                    "description": {"contains": keywords},
-                    "title": {"contains": keywords},
-                },
-                {"date": {"equals": date}},
-                {"location": {"equals": location}},
-            ]
-        }
-    }
-    events = await prisma.models.Event.prisma().find_many(**query_filters)
-    event_summaries = [
-        EventSummary(
-            id=event.id,
-            title=event.title,
-            description=event.description,
-            date=event.date.strftime("%Y-%m-%d"),
-            location=event.location,
-            type="",
+    selected = project.projection.parse_fields(fields, EventSummary.model_fields)
+    model = (
+        prisma.models.Event
+        if selected is None or "description" in selected
+        else prisma.partials.EventListing
+    )
+    limit = project.pagination.clamp_page_size(limit)
+    date_range = project.date_ranges.resolve_date_range(date, date_from, date_to, when)
+    if date_from or date_to:
+        date = f"{date_from or ''}..{date_to or ''}"
+    date = date or when
+    type = parse_event_type(type)
+    extra = {}
+    if keywords and keywords.strip():
+        scores = project.search_index.event_index.score(
+            keywords, date_range=date_range, location=location, type=type
+        )
+        if facets:
+            extra["facets"] = project.facets.count_hits(scores)
+        after = decode_ranked_cursor(cursor) if cursor else None
+        if not cursor:
+            project.search_analytics.record_search(
+                len(scores), keywords, date, location, type
+            )
+        page = project.search_index.top_hits(scores, limit + 1, after)
+        next_cursor = None
+        if len(page) > limit:
+            page = page[:limit]
+            next_cursor = project.pagination.encode_cursor(page[-1][1], page[-1][0])
+        if not page:
+            return SearchEventsResponse(events=[], next_cursor=next_cursor, **extra)
+        events = await model.prisma().find_many(
+            where={"id": {"in": [event_id for event_id, _ in page]}}
+        )
+        events_by_id = {event.id: event for event in events}
+        event_summaries = [
+            summarize_event(events_by_id[event_id], score, selected)
+            for event_id, score in page
+            if event_id in events_by_id
+        ]
+        return SearchEventsResponse(
+            events=event_summaries, next_cursor=next_cursor, **extra
+        )
+    filters: List[dict] = []
+    order = project.pagination.NEWEST_FIRST
+    seek_after = project.pagination.seek_after
+    if date_range:
+        filters.append(date_range.where())
+        order = project.pagination.EARLIEST_FIRST
+        seek_after = project.pagination.seek_after_date
+    location_id = None
+    if location:
+        location_id = await project.locations.find_location(location)
+        if location_id is None:
+            if not cursor:
+                project.search_analytics.record_search(
+                    0, keywords, date, location, type
+                )
+            if facets:
+                extra["facets"] = project.facets.build_facets({}, {}, {})
+            return SearchEventsResponse(events=[], **extra)
+        filters.append({"locationId": location_id})
+    if type:
+        filters.append({"type": type})
+    if cursor:
+        filters.append(seek_after(*project.pagination.decode_keyset_cursor(cursor)))
+    page_query = model.prisma().find_many(
+        where={"AND": filters},
+        order=order,
+        take=limit + 1,
+    )
+    if facets:
+        events, extra["facets"] = await asyncio.gather(
+            page_query,
+            project.facets.count_matches(date_range, location_id, type),
+        )
+    else:
+        events = await page_query
+    next_cursor = None
+    if len(events) > limit:
+        events = events[:limit]
+        next_cursor = project.pagination.encode_cursor(
+            events[-1].date if date_range else events[-1].createdAt, events[-1].id
+        )
+    if not cursor:
+        project.search_analytics.record_search(
+            len(events), keywords, date, location, type
         )
-        for event in events
-    ]
-    return SearchEventsResponse(events=event_summaries)
+    event_summaries = [summarize_event(event, fields=selected) for event in events]
+    return SearchEventsResponse(
+        events=event_summaries, next_cursor=next_cursor, **extra
+    )
@@ -0,0 +1,460 @@
+import bisect
+import heapq
+import logging
+import math
+import re
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+import prisma
+import prisma.models
+import project.date_ranges
+import project.locations
+import project.metrics
+
+logger = logging.getLogger(__name__)
+
+TOKEN_PATTERN = re.compile(r"\w+")
+
+STOP_WORDS = frozenset(
+    {"a", "an", "and", "at", "for", "in", "is", "of", "on", "or", "the", "to", "with"}
+)
+
+REBUILD_BATCH_SIZE = 1000
+
+# Titles are matched on at most this many leading characters, which bounds the memory of the title index.
+TITLE_KEY_LENGTH = 64
+
+# How many events a typeahead lookup checks at a time when it walks the index by date.
+WALK_CHUNK_SIZE = 256
+
+# Sorts after any character that occurs in a title.
+LAST_CHARACTER = "\U0010ffff"
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Splits text into lowercase word tokens, dropping common English stop words.
+
+    Args:
+        text (str): The raw text to tokenize.
+
+    Returns:
+        List[str]: The tokens in the order they appear in the text.
+    """
+    return [
+        token
+        for token in TOKEN_PATTERN.findall(text.casefold())
+        if token not in STOP_WORDS
+    ]
+
+
+def title_key(text: str) -> str:
+    """
+    Folds a title, or what has been typed of one, for prefix matching: lowercase, whitespace collapsed and cut
+    to TITLE_KEY_LENGTH characters.
+    """
+    return " ".join(text.casefold().split())[:TITLE_KEY_LENGTH]
+
+
+class IndexedEvent(NamedTuple):
+    """
+    The per-event data kept by the index: term frequencies for scoring and removal, the title for suggestions,
+    plus filter columns.
+    """
+
+    terms: Dict[str, int]
+    length: int
+    date: datetime
+    location: str
+    type: str
+    title: str
+    title_key: str
+
+
+class EventSearchIndex:
+    """
+    An in-process inverted index over event titles and descriptions, ranked with BM25.
+
+    Title tokens are counted `title_weight` times so that matches in the title outrank matches buried in
+    the description. Lookups only touch the posting lists of the query terms, so their cost depends on how
+    many events match rather than on the size of the Event table.
+
+    Events are also bucketed by the UTC day they happen on. Each bucket holds (date, ID, title key) sorted by
+    date then ID, and the days themselves are kept in a sorted array, so a timeline of the events in a date
+    range is read by bisecting to its first day and walking forward.
+
+    For typeahead, title keys are held with each event's ID and date in one sorted array, so the titles
+    starting with a prefix are found by two bisects and ranked by date without further lookups. After
+    `clear()` they are appended unsorted and sorted once by `sort_titles()`, so that a rebuild does not pay
+    for inserting each title in place.
+    """
+
+    def __init__(self, title_weight: int = 2, k1: float = 1.2, b: float = 0.75):
+        self.title_weight = title_weight
+        self.k1 = k1
+        self.b = b
+        self._postings: Dict[str, Dict[str, int]] = {}
+        self._events: Dict[str, IndexedEvent] = {}
+        self._total_length = 0
+        self._days: List[int] = []
+        self._buckets: Dict[int, List[Tuple[datetime, str, str]]] = {}
+        self._titles: List[Tuple[str, str, datetime]] = []
+        self._titles_sorted = True
+
+    def __len__(self) -> int:
+        return len(self._events)
+
+    def __contains__(self, event_id: str) -> bool:
+        return event_id in self._events
+
+    def clear(self) -> None:
+        self._postings.clear()
+        self._events.clear()
+        self._total_length = 0
+        self._days.clear()
+        self._buckets.clear()
+        self._titles.clear()
+        self._titles_sorted = False
+
+    def sort_titles(self) -> None:
+        """
+        Sorts the titles appended since the index was cleared. Does nothing when they are already sorted.
+        """
+        if not self._titles_sorted:
+            self._titles.sort()
+            self._titles_sorted = True
+
+    def add(self, event: prisma.models.Event) -> None:
+        """
+        Indexes an event, replacing any previously indexed version of it.
+
+        Args:
+            event (prisma.models.Event): The event record as stored in the database.
+        """
+        self.remove(event.id)
+        terms = Counter(tokenize(event.description))
+        for token in tokenize(event.title):
+            terms[token] += self.title_weight
+        length = sum(terms.values())
+        date = event.date
+        if date.tzinfo is None:
+            date = date.replace(tzinfo=timezone.utc)
+        key = title_key(event.title)
+        self._events[event.id] = IndexedEvent(
+            terms=dict(terms),
+            length=length,
+            date=date,
+            location=project.locations.location_key(event.location),
+            type=event.type,
+            title=event.title,
+            title_key=key,
+        )
+        self._total_length += length
+        for term, frequency in terms.items():
+            self._postings.setdefault(term, {})[event.id] = frequency
+        day = date.toordinal()
+        bucket = self._buckets.get(day)
+        if bucket is None:
+            bucket = self._buckets[day] = []
+            bisect.insort(self._days, day)
+        bisect.insort(bucket, (date, event.id, key))
+        if self._titles_sorted:
+            bisect.insort(self._titles, (key, event.id, date))
+        else:
+            self._titles.append((key, event.id, date))
+
+    def remove(self, event_id: str) -> None:
+        """
+        Drops an event from the index. Unknown IDs are ignored.
+
+        Args:
+            event_id (str): The unique identifier of the event to remove.
+        """
+        indexed = self._events.pop(event_id, None)
+        if indexed is None:
+            return
+        self._total_length -= indexed.length
+        for term in indexed.terms:
+            postings = self._postings[term]
+            del postings[event_id]
+            if not postings:
+                del self._postings[term]
+        day = indexed.date.toordinal()
+        bucket = self._buckets[day]
+        del bucket[bisect.bisect_left(bucket, (indexed.date, event_id))]
+        if not bucket:
+            del self._buckets[day]
+            del self._days[bisect.bisect_left(self._days, day)]
+        if self._titles_sorted:
+            del self._titles[
+                bisect.bisect_left(self._titles, (indexed.title_key, event_id))
+            ]
+        else:
+            self._titles.remove((indexed.title_key, event_id, indexed.date))
+
+    def indexed(self, event_ids: Iterable[str]) -> Iterator[IndexedEvent]:
+        """
+        Yields what the index holds about each of these events, skipping the ones it does not know.
+        """
+        for event_id in event_ids:
+            indexed = self._events.get(event_id)
+            if indexed is not None:
+                yield indexed
+
+    def score(
+        self,
+        query: str,
+        date_range: Optional[project.date_ranges.DateRange] = None,
+        location: Optional[str] = None,
+        type: Optional[str] = None,
+    ) -> Dict[str, float]:
+        """
+        Scores indexed events against a free-text query, without ranking them.
+
+        Args:
+            query (str): Keywords to match in the event's title or description.
+            date_range (Optional[DateRange]): Only keep events happening within this range.
+            location (Optional[str]): Only keep events at this location, compared by location key.
+            type (Optional[str]): Only keep events of this EventType.
+
+        Returns:
+            Dict[str, float]: The relevance score of every matching event, by ID.
+        """
+        terms = set(tokenize(query))
+        if not terms or not self._events:
+            return {}
+        location = project.locations.location_key(location) if location else None
+        event_count = len(self._events)
+        average_length = self._total_length / event_count
+        scores: Dict[str, float] = {}
+        for term in terms:
+            postings = self._postings.get(term)
+            if not postings:
+                continue
+            idf = math.log(
+                1 + (event_count - len(postings) + 0.5) / (len(postings) + 0.5)
+            )
+            for event_id, frequency in postings.items():
+                indexed = self._events[event_id]
+                if date_range and indexed.date not in date_range:
+                    continue
+                if location and indexed.location != location:
+                    continue
+                if type and indexed.type != type:
+                    continue
+                norm = self.k1 * (1 - self.b + self.b * indexed.length / average_length)
+                scores[event_id] = scores.get(event_id, 0.0) + idf * (
+                    frequency * (self.k1 + 1) / (frequency + norm)
+                )
+        return scores
+
+    def search(
+        self,
+        query: str,
+        date_range: Optional[project.date_ranges.DateRange] = None,
+        location: Optional[str] = None,
+        type: Optional[str] = None,
+        limit: Optional[int] = None,
+        after: Optional[Tuple[float, str]] = None,
+    ) -> List[Tuple[str, float]]:
+        """
+        Ranks indexed events against a free-text query, filtered like `score`.
+
+        Returns:
+            List[Tuple[str, float]]: Matching event IDs and their relevance scores, best match first, paged
+            like `top_hits`.
+        """
+        return top_hits(self.score(query, date_range, location, type), limit, after)
+
+    def timeline(
+        self,
+        start: datetime,
+        end: datetime,
+        location: Optional[str] = None,
+        after: Optional[Tuple[datetime, str]] = None,
+    ) -> Iterator[Tuple[datetime, str]]:
+        """
+        Walks the events happening from `start` up to, but excluding, `end`, earliest first.
+
+        Args:
+            start (datetime): The beginning of the range, timezone-aware.
+            end (datetime): The end of the range, timezone-aware.
+            location (Optional[str]): Only yield events at this location, compared by location key.
+            after (Optional[Tuple[datetime, str]]): Resume after this (date, ID), the last one of a previous page.
+
+        Yields:
+            Tuple[datetime, str]: The date and ID of each event, ordered by date then ID.
+        """
+        location = project.locations.location_key(location) if location else None
+        lower = max(start, after[0]) if after else start
+        index = bisect.bisect_left(self._days, lower.toordinal())
+        while index < len(self._days) and self._days[index] <= end.toordinal():
+            bucket = self._buckets[self._days[index]]
+            position = bisect.bisect_left(bucket, (lower, ""))
+            if after:
+                position = max(
+                    position, bisect.bisect_right(bucket, (*after, LAST_CHARACTER))
+                )
+            for date, event_id, _ in bucket[position:]:
+                if date >= end:
+                    return
+                if location and self._events[event_id].location != location:
+                    continue
+                yield date, event_id
+            index += 1
+
+    def suggest(
+        self, prefix: str, limit: int, now: datetime
+    ) -> List[Tuple[str, IndexedEvent]]:
+        """
+        Finds events whose title starts with a prefix, those coming up soonest first, then past ones, most
+        recent first.
+
+        The matches are counted with two bisects of the sorted titles. When there are few of them they are
+        ranked directly. When there are many, so that one in every few events matches, it is cheaper to walk
+        the events outwards from `now` and keep the first `limit` that match; the walk gives up and falls back
+        to ranking after as many steps as there are matches, so a lookup never costs more than twice that.
+
+        Args:
+            prefix (str): What has been typed of the title, matched like `title_key`.
+            limit (int): The maximum number of events to return.
+            now (datetime): The current time, timezone-aware.
+
+        Returns:
+            List[Tuple[str, IndexedEvent]]: The IDs and indexed data of the matching events.
+        """
+        prefix = title_key(prefix)
+        if not prefix or limit < 1:
+            return []
+        self.sort_titles()
+        low = bisect.bisect_left(self._titles, (prefix,))
+        high = bisect.bisect_left(self._titles, (prefix + LAST_CHARACTER,))
+        matches = high - low
+        ranked = None
+        if matches * matches > limit * len(self._events):
+            ranked = self._walk_for(prefix, limit, now, steps=matches)
+        if ranked is None:
+            entries = self._titles[low:high]
+            upcoming = heapq.nsmallest(
+                limit,
+                [(date, event_id) for _, event_id, date in entries if date >= now],
+            )
+            ranked = [event_id for _, event_id in upcoming]
+            if len(ranked) < limit:
+                past = heapq.nlargest(
+                    limit - len(ranked),
+                    [(date, event_id) for _, event_id, date in entries if date < now],
+                )
+                ranked.extend(event_id for _, event_id in past)
+        return [(event_id, self._events[event_id]) for event_id in ranked]
+
+    def _walk_for(
+        self, prefix: str, limit: int, now: datetime, steps: int
+    ) -> Optional[List[str]]:
+        """
+        Walks outwards from `now` for the first `limit` events whose title key starts with `prefix`.
+
+        Returns:
+            Optional[List[str]]: Their IDs, or None if they were not all found within about `steps` events.
+        """
+        found: List[str] = []
+        walked = 0
+        for chunk in self._outwards_from(now):
+            found += [event_id for _, event_id, key in chunk if key.startswith(prefix)]
+            if len(found) >= limit:
+                return found[:limit]
+            walked += len(chunk)
+            if walked >= steps:
+                return None
+        return found
+
+    def _outwards_from(
+        self, now: datetime
+    ) -> Iterator[List[Tuple[datetime, str, str]]]:
+        """
+        Yields every indexed (date, ID, title key) in chunks of up to WALK_CHUNK_SIZE: the events from `now` on in date
+        order, then the earlier ones in reverse date order.
+        """
+        split = bisect.bisect_left(self._days, now.toordinal())
+        for day in self._days[split:]:
+            bucket = self._buckets[day]
+            position = bisect.bisect_left(bucket, (now, ""))
+            for start in range(position, len(bucket), WALK_CHUNK_SIZE):
+                yield bucket[start : start + WALK_CHUNK_SIZE]
+        for day in reversed(self._days[: split + 1]):
+            bucket = self._buckets[day]
+            position = bisect.bisect_left(bucket, (now, ""))
+            for end in range(position, 0, -WALK_CHUNK_SIZE):
+                yield bucket[max(0, end - WALK_CHUNK_SIZE) : end][::-1]
+
+
+def top_hits(
+    scores: Dict[str, float],
+    limit: Optional[int] = None,
+    after: Optional[Tuple[float, str]] = None,
+) -> List[Tuple[str, float]]:
+    """
+    Picks a page of scored events, best first, ties broken by ID.
+
+    Only the page is ranked: the hits are kept in a heap of `limit` entries rather than sorted, so a page of
+    many matches costs a pass over them instead of a full sort.
+
+    Args:
+        scores (Dict[str, float]): The relevance score of every matching event, by ID.
+        limit (Optional[int]): The size of the page, or None for every hit.
+        after (Optional[Tuple[float, str]]): Start after this (score, ID), the last hit of a previous page.
+
+    Returns:
+        List[Tuple[str, float]]: Event IDs and their scores.
+    """
+    hits: Iterable[Tuple[str, float]] = scores.items()
+    if after:
+        last = (-after[0], after[1])
+        hits = [hit for hit in hits if (-hit[1], hit[0]) > last]
+    if limit is None:
+        return sorted(hits, key=lambda hit: (-hit[1], hit[0]))
+    return heapq.nsmallest(limit, hits, key=lambda hit: (-hit[1], hit[0]))
+
+
+event_index = EventSearchIndex()
+
+
+@project.metrics.measure_queries
+async def load_event_index() -> EventSearchIndex:
+    """
+    Reads every event from the database into a new search index, leaving the shared one untouched.
+
+    Events are read in batches ordered by ID so that the whole table is never held in memory at once.
+    """
+    started = datetime.now()
+    index = EventSearchIndex()
+    # Lets the titles be appended as they are read and sorted once at the end.
+    index.clear()
+    last_id: Optional[str] = None
+    while True:
+        batch = await prisma.models.Event.prisma().find_many(
+            where={"id": {"gt": last_id}} if last_id else None,
+            order={"id": "asc"},
+            take=REBUILD_BATCH_SIZE,
+        )
+        for event in batch:
+            index.add(event)
+        if len(batch) < REBUILD_BATCH_SIZE:
+            break
+        last_id = batch[-1].id
+    index.sort_titles()
+    logger.info(
+        "Indexed %d events for search in %s", len(index), datetime.now() - started
+    )
+    return index
+
+
+async def rebuild_event_index() -> None:
+    """
+    Replaces the shared search index with one loaded from the database. The current index keeps answering
+    searches until the new one is complete.
+    """
+    global event_index
+    event_index = await load_event_index()
@@ -1,34 +1,82 @@
+import json
 import logging
+import math
 from contextlib import asynccontextmanager
 from datetime import datetime
 from typing import Optional
 
+import prisma.enums
+import project.auth
 import project.authenticate_user_service
+import project.bulk
+import project.bulk_create_events_service
+import project.bulk_submit_feedback_service
+import project.cache
+import project.conditional
 import project.create_event_service
+import project.date_ranges
 import project.delete_event_service
 import project.display_event_service
 import project.edit_event_service
 import project.edit_profile_service
+import project.embeddings
+import project.export_feedback_service
+import project.fast_json
+import project.invalidation
+import project.locations
+import project.metrics
+import project.pagination
+import project.passwords
+import project.profiling
+import project.projection
+import project.rate_limit
 import project.register_user_service
+import project.search_analytics
 import project.search_events_service
+import project.search_index
+import project.similar_events_service
+import project.singleflight
+import project.startup
 import project.submit_feedback_service
+import project.suggest_events_service
+import project.upcoming_events_service
 import project.view_feedback_service
 import project.view_profile_service
-from fastapi import FastAPI
+import project.view_rating_summary_service
+from fastapi import Depends, FastAPI, Query, Request
 from fastapi.encoders import jsonable_encoder
-from fastapi.responses import Response
-from prisma import Prisma
+from fastapi.responses import Response, StreamingResponse
 
 logger = logging.getLogger(__name__)
 
-db_client = Prisma(auto_register=True)
+db_client = project.metrics.InstrumentedPrisma(auto_register=True)
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    await db_client.connect()
+    project.startup.begin_startup()
+    with project.startup.phase("connect"):
+        await db_client.connect()
+    with project.startup.phase("invalidation_bus"):
+        await project.invalidation.start()
+    with project.startup.phase("warm_up"):
+        await project.startup.warm_up()
+    with project.startup.phase("locations"):
+        await project.locations.load_locations()
+        await project.locations.backfill_event_locations()
+    with project.startup.phase("search_index"):
+        await project.search_index.rebuild_event_index()
+    with project.startup.phase("embeddings"):
+        await project.embeddings.create_embedding_index()
+        await project.embeddings.backfill_embeddings()
+    project.search_analytics.start()
+    project.startup.mark_ready()
     yield
+    project.startup.mark_stopping()
+    await project.search_analytics.stop()
+    await project.invalidation.stop()
     await db_client.disconnect()
+    project.passwords.shutdown()
 
 
 app = FastAPI(
@@ -37,6 +85,10 @@ app = FastAPI(
     description="In the PHP MVC application, the global entry point is `index.php`, which initializes the whole application. This initialization involves loading `composer/autoload.php` for class autoloading, necessary for utilizing PHP classes without manual includes. The application's routing mechanism is handled by `routes.php`, which directs URL paths to their respective controllers based on the request. For example, the path `/event/display` routes to `CfeatureEventDisplay.php`, a controller that fetches event data through `MfeatureEvent.php` model and renders it via `vfeature_event_display.php` view. Similarly, the path `/event/upload` is managed by `CfeatureEventUpload.php`, which processes form submissions from `vfeature_event_form.php` view through the same model, `MfeatureEvent.php`. This model performs its database operations using `DaoFeatureEvent.php` for direct database interactions, while `DtoFeatureEvent.php` is used for clean data transmission between the controllers and models. The frontend dynamics, such as DOM manipulations and AJAX requests, are handled by JavaScript files `event_display.js` for display functionality and `event_form.js` for form interactions. All these components are styled cohesively using `style.css` to ensure a uniform appearance across different views.",
 )
 
+app.add_middleware(project.profiling.ProfilingMiddleware)
+
+app.add_middleware(project.metrics.MetricsMiddleware)
+
 
 @app.post(
     "/user/register", response_model=project.register_user_service.RegisterUserResponse
@@ -50,12 +102,19 @@ async def api_post_register_user(
     try:
         res = await project.register_user_service.register_user(email, password)
         return res
+    except project.passwords.PasswordHasherBusyError as e:
+        return Response(
+            content=json.dumps(jsonable_encoder({"error": str(e)})),
+            status_code=503,
+            headers={"Retry-After": "1"},
+            media_type="application/json",
+        )
     except Exception as e:
         logger.exception("Error processing request")
         res = dict()
         res["error"] = str(e)
         return Response(
-            content=jsonable_encoder(res),
+            content=json.dumps(jsonable_encoder(res)),
             status_code=500,
             media_type="application/json",
         )
@@ -66,20 +125,27 @@ async def api_post_register_user(
     response_model=project.view_profile_service.UserProfileResponse,
 )
 async def api_get_view_profile(
-    user_id: str,
+    request: Request,
+    response: Response,
+    user: project.auth.AccessTokenClaims = Depends(project.auth.require_user),
 ) -> project.view_profile_service.UserProfileResponse | Response:
     """
     Endpoint for users to view their profile
     """
     try:
-        res = await project.view_profile_service.view_profile(user_id)
-        return res
+        res, validators = await project.view_profile_service.view_profile_versioned(
+            user.sub
+        )
+        if project.conditional.is_not_modified(request.headers, validators):
+            return project.conditional.not_modified(validators)
+        project.conditional.apply_validators(response, validators)
+        return project.fast_json.respond(res, response)
     except Exception as e:
         logger.exception("Error processing request")
         res = dict()
         res["error"] = str(e)
         return Response(
-            content=jsonable_encoder(res),
+            content=json.dumps(jsonable_encoder(res)),
             status_code=500,
             media_type="application/json",
         )
@@ -90,14 +156,17 @@ async def api_get_view_profile(
     response_model=project.submit_feedback_service.SubmitFeedbackResponse,
 )
 async def api_post_submit_feedback(
-    eventId: str, rating: int, content: str
+    eventId: str,
+    rating: int,
+    content: str,
+    user: project.auth.AccessTokenClaims = Depends(project.auth.require_user),
 ) -> project.submit_feedback_service.SubmitFeedbackResponse | Response:
     """
     Endpoint for users to submit feedback on an event
     """
     try:
         res = await project.submit_feedback_service.submit_feedback(
-            eventId, rating, content
+            eventId, rating, content, user.sub
         )
         return res
     except Exception as e:
@@ -105,7 +174,7 @@ async def api_post_submit_feedback(
         res = dict()
         res["error"] = str(e)
         return Response(
-            content=jsonable_encoder(res),
+            content=json.dumps(jsonable_encoder(res)),
             status_code=500,
             media_type="application/json",
         )
@@ -115,14 +184,19 @@ async def api_post_submit_feedback(
     "/event/create", response_model=project.create_event_service.CreateEventResponse
 )
 async def api_post_create_event(
-    title: str, description: str, date: datetime, location: str
+    title: str,
+    description: str,
+    date: datetime,
+    location: str,
+    type: prisma.enums.EventType = prisma.enums.EventType.OTHER,
+    user: project.auth.AccessTokenClaims = Depends(project.auth.require_user),
 ) -> project.create_event_service.CreateEventResponse | Response:
     """
     Endpoint for organizers to create a new event
     """
     try:
         res = await project.create_event_service.create_event(
-            title, description, date, location
+            title, description, date, location, user.sub, type
         )
         return res
     except Exception as e:
@@ -130,7 +204,7 @@ async def api_post_create_event(
         res = dict()
         res["error"] = str(e)
         return Response(
-            content=jsonable_encoder(res),
+            content=json.dumps(jsonable_encoder(res)),
             status_code=500,
             media_type="application/json",
         )
@@ -139,22 +213,40 @@ async def api_post_create_event(
 @app.get(
     "/feedback/view/{eventId}",
     response_model=project.view_feedback_service.FeedbackViewResponse,
+    response_model_exclude_unset=True,
 )
 async def api_get_view_feedback(
     eventId: str,
+    cursor: Optional[str] = None,
+    limit: int = project.pagination.DEFAULT_PAGE_SIZE,
+    fields: Optional[str] = None,
 ) -> project.view_feedback_service.FeedbackViewResponse | Response:
     """
     Endpoint for users to view feedback on an event
     """
     try:
-        res = await project.view_feedback_service.view_feedback(eventId)
-        return res
+        res = await project.view_feedback_service.view_feedback(
+            eventId, cursor, limit, fields
+        )
+        return project.fast_json.respond(res, exclude_unset=True)
+    except project.projection.InvalidFieldsError as e:
+        return Response(
+            content=json.dumps(jsonable_encoder({"error": str(e)})),
+            status_code=400,
+            media_type="application/json",
+        )
+    except project.pagination.InvalidCursorError as e:
+        return Response(
+            content=json.dumps(jsonable_encoder({"error": str(e)})),
+            status_code=400,
+            media_type="application/json",
+        )
     except Exception as e:
         logger.exception("Error processing request")
         res = dict()
         res["error"] = str(e)
         return Response(
-            content=jsonable_encoder(res),
+            content=json.dumps(jsonable_encoder(res)),
             status_code=500,
             media_type="application/json",
         )
@@ -166,19 +258,28 @@ async def api_get_view_feedback(
 )
 async def api_delete_delete_event(
     id: str,
+    request: Request,
 ) -> project.delete_event_service.DeleteEventResponse | Response:
     """
     Endpoint for organizers to delete an event
     """
     try:
-        res = await project.delete_event_service.delete_event(id)
+        res = await project.delete_event_service.delete_event(
+            id, project.conditional.expected_versions(request.headers)
+        )
         return res
+    except project.conditional.PreconditionFailedError as e:
+        return Response(
+            content=json.dumps(jsonable_encoder({"error": str(e)})),
+            status_code=412,
+            media_type="application/json",
+        )
     except Exception as e:
         logger.exception("Error processing request")
         res = dict()
         res["error"] = str(e)
         return Response(
-            content=jsonable_encoder(res),
+            content=json.dumps(jsonable_encoder(res)),
             status_code=500,
             media_type="application/json",
         )
@@ -193,46 +294,204 @@ async def api_put_edit_event(
     description: Optional[str],
     date: Optional[datetime],
     location: Optional[str],
+    request: Request,
+    type: Optional[prisma.enums.EventType] = None,
 ) -> project.edit_event_service.EditEventResponse | Response:
     """
     Endpoint allowing organizers to edit an existing event
     """
     try:
         res = await project.edit_event_service.edit_event(
-            id, title, description, date, location
+            id,
+            title,
+            description,
+            date,
+            location,
+            type,
+            project.conditional.expected_versions(request.headers),
         )
         return res
+    except project.conditional.PreconditionFailedError as e:
+        return Response(
+            content=json.dumps(jsonable_encoder({"error": str(e)})),
+            status_code=412,
+            media_type="application/json",
+        )
     except Exception as e:
         logger.exception("Error processing request")
         res = dict()
         res["error"] = str(e)
         return Response(
-            content=jsonable_encoder(res),
+            content=json.dumps(jsonable_encoder(res)),
             status_code=500,
             media_type="application/json",
         )
 
 
 @app.get(
-    "/search/events", response_model=project.search_events_service.SearchEventsResponse
+    "/search/events",
+    response_model=project.search_events_service.SearchEventsResponse,
+    response_model_exclude_unset=True,
 )
 async def api_get_search_events(
-    keywords: str, date: str, location: str, type: str
+    keywords: Optional[str] = None,
+    date: Optional[str] = None,
+    location: Optional[str] = None,
+    type: Optional[str] = None,
+    cursor: Optional[str] = None,
+    limit: int = project.pagination.DEFAULT_PAGE_SIZE,
+    fields: Optional[str] = None,
+    date_from: Optional[str] = Query(None, alias="from"),
+    date_to: Optional[str] = Query(None, alias="to"),
+    when: Optional[str] = None,
+    facets: bool = False,
 ) -> project.search_events_service.SearchEventsResponse | Response:
     """
     Endpoint for users to search and filter events
     """
     try:
         res = await project.search_events_service.search_events(
-            keywords, date, location, type
+            keywords,
+            date,
+            location,
+            type,
+            cursor,
+            limit,
+            fields,
+            date_from,
+            date_to,
+            when,
+            facets,
         )
-        return res
+        return project.fast_json.respond(res, exclude_unset=True)
+    except project.date_ranges.InvalidDateRangeError as e:
+        return Response(
+            content=json.dumps(jsonable_encoder({"error": str(e)})),
+            status_code=400,
+            media_type="application/json",
+        )
+    except project.search_events_service.InvalidEventTypeError as e:
+        return Response(
+            content=json.dumps(jsonable_encoder({"error": str(e)})),
+            status_code=400,
+            media_type="application/json",
+        )
+    except project.projection.InvalidFieldsError as e:
+        return Response(
+            content=json.dumps(jsonable_encoder({"error": str(e)})),
+            status_code=400,
+            media_type="application/json",
+        )
+    except project.pagination.InvalidCursorError as e:
+        return Response(
+            content=json.dumps(jsonable_encoder({"error": str(e)})),
+            status_code=400,
+            media_type="application/json",
+        )
+    except Exception as e:
+        logger.exception("Error processing request")
+        res = dict()
+        res["error"] = str(e)
+        return Response(
+            content=json.dumps(jsonable_encoder(res)),
+            status_code=500,
+            media_type="application/json",
+        )
+
+
+@app.get(
+    "/events/upcoming",
+    response_model=project.upcoming_events_service.UpcomingEventsResponse,
+    response_model_exclude_unset=True,
+)
+async def api_get_upcoming_events(
+    days: int = project.upcoming_events_service.DEFAULT_HORIZON_DAYS,
+    date_from: Optional[str] = Query(None, alias="from"),
+    location: Optional[str] = None,
+    cursor: Optional[str] = None,
+    limit: int = project.pagination.DEFAULT_PAGE_SIZE,
+    fields: Optional[str] = None,
+) -> project.upcoming_events_service.UpcomingEventsResponse | Response:
+    """
+    Endpoint for a timeline of upcoming events in the order they happen
+    """
+    try:
+        res = await project.upcoming_events_service.upcoming_events(
+            days, date_from, location, cursor, limit, fields
+        )
+        return project.fast_json.respond(res, exclude_unset=True)
+    except project.date_ranges.InvalidDateRangeError as e:
+        return Response(
+            content=json.dumps(jsonable_encoder({"error": str(e)})),
+            status_code=400,
+            media_type="application/json",
+        )
+    except project.projection.InvalidFieldsError as e:
+        return Response(
+            content=json.dumps(jsonable_encoder({"error": str(e)})),
+            status_code=400,
+            media_type="application/json",
+        )
+    except project.pagination.InvalidCursorError as e:
+        return Response(
+            content=json.dumps(jsonable_encoder({"error": str(e)})),
+            status_code=400,
+            media_type="application/json",
+        )
+    except Exception as e:
+        logger.exception("Error processing request")
+        res = dict()
+        res["error"] = str(e)
+        return Response(
+            content=json.dumps(jsonable_encoder(res)),
+            status_code=500,
+            media_type="application/json",
+        )
+
+
+@app.get(
+    "/events/suggest",
+    response_model=project.suggest_events_service.EventSuggestResponse,
+)
+async def api_get_suggest_events(
+    q: str, limit: int = project.suggest_events_service.DEFAULT_SUGGESTIONS
+) -> project.suggest_events_service.EventSuggestResponse | Response:
+    """
+    Endpoint for autocompleting event titles as they are typed
+    """
+    try:
+        res = await project.suggest_events_service.suggest_events(q, limit)
+        return project.fast_json.respond(res)
+    except Exception as e:
+        logger.exception("Error processing request")
+        res = dict()
+        res["error"] = str(e)
+        return Response(
+            content=json.dumps(jsonable_encoder(res)),
+            status_code=500,
+            media_type="application/json",
+        )
+
+
+@app.get(
+    "/locations/suggest",
+    response_model=project.locations.LocationSuggestResponse,
+)
+async def api_get_suggest_locations(
+    prefix: str, limit: int = project.locations.DEFAULT_SUGGESTIONS
+) -> project.locations.LocationSuggestResponse | Response:
+    """
+    Endpoint for autocompleting event locations from a typed prefix
+    """
+    try:
+        res = await project.locations.suggest_locations(prefix, limit)
+        return project.fast_json.respond(res)
     except Exception as e:
         logger.exception("Error processing request")
         res = dict()
         res["error"] = str(e)
         return Response(
-            content=jsonable_encoder(res),
+            content=json.dumps(jsonable_encoder(res)),
             status_code=500,
             media_type="application/json",
         )
@@ -243,22 +502,36 @@ async def api_get_search_events(
     response_model=project.edit_profile_service.EditUserProfileResponse,
 )
 async def api_put_edit_profile(
-    email: str, name: str, bio: Optional[str], avatar_url: Optional[str]
+    email: str,
+    name: str,
+    bio: Optional[str],
+    avatar_url: Optional[str],
+    request: Request,
 ) -> project.edit_profile_service.EditUserProfileResponse | Response:
     """
     Endpoint for users to edit their profile
     """
     try:
         res = await project.edit_profile_service.edit_profile(
-            email, name, bio, avatar_url
+            email,
+            name,
+            bio,
+            avatar_url,
+            project.conditional.expected_versions(request.headers),
         )
         return res
+    except project.conditional.PreconditionFailedError as e:
+        return Response(
+            content=json.dumps(jsonable_encoder({"error": str(e)})),
+            status_code=412,
+            media_type="application/json",
+        )
     except Exception as e:
         logger.exception("Error processing request")
         res = dict()
         res["error"] = str(e)
         return Response(
-            content=jsonable_encoder(res),
+            content=json.dumps(jsonable_encoder(res)),
             status_code=500,
             media_type="application/json",
         )
@@ -269,20 +542,41 @@ async def api_put_edit_profile(
     response_model=project.authenticate_user_service.AuthenticateUserResponse,
 )
 async def api_post_authenticate_user(
-    email: str, password: str
+    email: str, password: str, request: Request
 ) -> project.authenticate_user_service.AuthenticateUserResponse | Response:
     """
     Endpoint for user login/authentication
     """
     try:
+        project.rate_limit.check_login(
+            email,
+            project.rate_limit.client_address(
+                request.headers.get("x-forwarded-for"),
+                request.client.host if request.client else None,
+            ),
+        )
         res = await project.authenticate_user_service.authenticate_user(email, password)
         return res
+    except project.rate_limit.RateLimitedError as e:
+        return Response(
+            content=json.dumps(jsonable_encoder({"error": str(e)})),
+            status_code=429,
+            headers={"Retry-After": str(math.ceil(e.retry_after))},
+            media_type="application/json",
+        )
+    except project.passwords.PasswordHasherBusyError as e:
+        return Response(
+            content=json.dumps(jsonable_encoder({"error": str(e)})),
+            status_code=503,
+            headers={"Retry-After": "1"},
+            media_type="application/json",
+        )
     except Exception as e:
         logger.exception("Error processing request")
         res = dict()
         res["error"] = str(e)
         return Response(
-            content=jsonable_encoder(res),
+            content=json.dumps(jsonable_encoder(res)),
             status_code=500,
             media_type="application/json",
         )
@@ -291,22 +585,402 @@ async def api_post_authenticate_user(
 @app.get(
     "/event/display/{id}",
     response_model=project.display_event_service.DisplayEventResponse,
+    response_model_exclude_unset=True,
 )
 async def api_get_display_event(
     id: str,
+    request: Request,
+    response: Response,
+    fields: Optional[str] = None,
 ) -> project.display_event_service.DisplayEventResponse | Response:
     """
     Endpoint to retrieve and display event details for attendees
     """
     try:
-        res = await project.display_event_service.display_event(id)
+        res, validators = await project.display_event_service.display_event_versioned(
+            id, fields
+        )
+        if project.conditional.is_not_modified(request.headers, validators):
+            return project.conditional.not_modified(validators)
+        project.conditional.apply_validators(response, validators)
+        return project.fast_json.respond(res, response, exclude_unset=True)
+    except project.projection.InvalidFieldsError as e:
+        return Response(
+            content=json.dumps(jsonable_encoder({"error": str(e)})),
+            status_code=400,
+            media_type="application/json",
+        )
+    except Exception as e:
+        logger.exception("Error processing request")
+        res = dict()
+        res["error"] = str(e)
+        return Response(
+            content=json.dumps(jsonable_encoder(res)),
+            status_code=500,
+            media_type="application/json",
+        )
+
+
+@app.get(
+    "/event/{id}/similar",
+    response_model=project.similar_events_service.SimilarEventsResponse,
+)
+async def api_get_similar_events(
+    id: str, limit: int = project.similar_events_service.DEFAULT_SIMILAR_EVENTS
+) -> project.similar_events_service.SimilarEventsResponse | Response:
+    """
+    Endpoint recommending events similar to the one being viewed
+    """
+    try:
+        res = await project.similar_events_service.similar_events(id, limit)
+        return project.fast_json.respond(res)
+    except project.similar_events_service.EventNotFoundError as e:
+        return Response(
+            content=json.dumps(jsonable_encoder({"error": str(e)})),
+            status_code=404,
+            media_type="application/json",
+        )
+    except Exception as e:
+        logger.exception("Error processing request")
+        res = dict()
+        res["error"] = str(e)
+        return Response(
+            content=json.dumps(jsonable_encoder(res)),
+            status_code=500,
+            media_type="application/json",
+        )
+
+
+@app.get(
+    "/feedback/summary/{eventId}",
+    response_model=project.view_rating_summary_service.RatingSummaryResponse,
+)
+async def api_get_view_rating_summary(
+    eventId: str,
+) -> project.view_rating_summary_service.RatingSummaryResponse | Response:
+    """
+    Endpoint for users to view the rating summary of an event
+    """
+    try:
+        res = await project.view_rating_summary_service.view_rating_summary(eventId)
+        return project.fast_json.respond(res)
+    except Exception as e:
+        logger.exception("Error processing request")
+        res = dict()
+        res["error"] = str(e)
+        return Response(
+            content=json.dumps(jsonable_encoder(res)),
+            status_code=500,
+            media_type="application/json",
+        )
+
+
+@app.get(
+    "/admin/cache/stats",
+    response_model=project.cache.CacheStatsResponse,
+    dependencies=[Depends(project.auth.require_admin)],
+)
+async def api_get_cache_stats() -> project.cache.CacheStatsResponse | Response:
+    """
+    Endpoint for operators to inspect cache hit, miss and eviction counters
+    """
+    try:
+        res = await project.cache.cache_stats()
+        return res
+    except Exception as e:
+        logger.exception("Error processing request")
+        res = dict()
+        res["error"] = str(e)
+        return Response(
+            content=json.dumps(jsonable_encoder(res)),
+            status_code=500,
+            media_type="application/json",
+        )
+
+
+@app.post("/event/create/bulk", response_model=project.bulk.BulkResponse)
+async def api_post_bulk_create_events(
+    request: Request,
+    user: project.auth.AccessTokenClaims = Depends(project.auth.require_user),
+) -> project.bulk.BulkResponse | Response:
+    """
+    Endpoint for organizers to import many events at once from a JSON array or NDJSON body
+    """
+    try:
+        records = project.bulk.parse_records(
+            await request.body(), request.headers.get("content-type")
+        )
+        res = await project.bulk_create_events_service.bulk_create_events(
+            records, user.sub
+        )
+        return res
+    except project.bulk.BulkPayloadError as e:
+        return Response(
+            content=json.dumps(jsonable_encoder({"error": str(e)})),
+            status_code=400,
+            media_type="application/json",
+        )
+    except Exception as e:
+        logger.exception("Error processing request")
+        res = dict()
+        res["error"] = str(e)
+        return Response(
+            content=json.dumps(jsonable_encoder(res)),
+            status_code=500,
+            media_type="application/json",
+        )
+
+
+@app.post("/feedback/submit/bulk", response_model=project.bulk.BulkResponse)
+async def api_post_bulk_submit_feedback(
+    request: Request,
+    user: project.auth.AccessTokenClaims = Depends(project.auth.require_user),
+) -> project.bulk.BulkResponse | Response:
+    """
+    Endpoint for importing many feedback entries at once from a JSON array or NDJSON body
+    """
+    try:
+        records = project.bulk.parse_records(
+            await request.body(), request.headers.get("content-type")
+        )
+        res = await project.bulk_submit_feedback_service.bulk_submit_feedback(
+            records, user.sub
+        )
+        return res
+    except project.bulk.BulkPayloadError as e:
+        return Response(
+            content=json.dumps(jsonable_encoder({"error": str(e)})),
+            status_code=400,
+            media_type="application/json",
+        )
+    except Exception as e:
+        logger.exception("Error processing request")
+        res = dict()
+        res["error"] = str(e)
+        return Response(
+            content=json.dumps(jsonable_encoder(res)),
+            status_code=500,
+            media_type="application/json",
+        )
+
+
+@app.get("/feedback/export/{eventId}", response_class=StreamingResponse)
+async def api_get_export_feedback(
+    eventId: str,
+    format: project.export_feedback_service.ExportFormat = "ndjson",
+) -> Response:
+    """
+    Endpoint for organizers to stream all feedback on an event as NDJSON or CSV
+    """
+    try:
+        res = StreamingResponse(
+            project.export_feedback_service.export_feedback(eventId, format),
+            media_type=project.export_feedback_service.MEDIA_TYPES[format],
+            headers={
+                "Content-Disposition": f'attachment; filename="feedback-{eventId}.{format}"'
+            },
+        )
+        return res
+    except Exception as e:
+        logger.exception("Error processing request")
+        res = dict()
+        res["error"] = str(e)
+        return Response(
+            content=json.dumps(jsonable_encoder(res)),
+            status_code=500,
+            media_type="application/json",
+        )
+
+
+@app.get(
+    "/admin/singleflight/stats",
+    response_model=project.singleflight.SingleFlightStatsResponse,
+    dependencies=[Depends(project.auth.require_admin)],
+)
+async def api_get_single_flight_stats() -> (
+    project.singleflight.SingleFlightStatsResponse | Response
+):
+    """
+    Endpoint for operators to see how many duplicate reads were collapsed
+    """
+    try:
+        res = await project.singleflight.single_flight_stats()
+        return res
+    except Exception as e:
+        logger.exception("Error processing request")
+        res = dict()
+        res["error"] = str(e)
+        return Response(
+            content=json.dumps(jsonable_encoder(res)),
+            status_code=500,
+            media_type="application/json",
+        )
+
+
+@app.get(
+    "/admin/rate-limit/stats",
+    response_model=project.rate_limit.RateLimiterStatsResponse,
+    dependencies=[Depends(project.auth.require_admin)],
+)
+async def api_get_rate_limit_stats() -> (
+    project.rate_limit.RateLimiterStatsResponse | Response
+):
+    """
+    Endpoint for operators to inspect rate limiter counters
+    """
+    try:
+        res = await project.rate_limit.rate_limit_stats()
+        return res
+    except Exception as e:
+        logger.exception("Error processing request")
+        res = dict()
+        res["error"] = str(e)
+        return Response(
+            content=json.dumps(jsonable_encoder(res)),
+            status_code=500,
+            media_type="application/json",
+        )
+
+
+@app.get("/metrics", response_class=Response)
+async def api_get_metrics() -> Response:
+    """
+    Endpoint for Prometheus to scrape request latency, in-flight and database query metrics
+    """
+    try:
+        res = await project.metrics.metrics()
+        return res
+    except Exception as e:
+        logger.exception("Error processing request")
+        res = dict()
+        res["error"] = str(e)
+        return Response(
+            content=json.dumps(jsonable_encoder(res)),
+            status_code=500,
+            media_type="application/json",
+        )
+
+
+@app.get(
+    "/admin/profiles",
+    response_model=project.profiling.ProfileListResponse,
+    dependencies=[Depends(project.auth.require_admin)],
+)
+async def api_get_profiles() -> project.profiling.ProfileListResponse | Response:
+    """
+    Endpoint for operators to list the most recent request profiles
+    """
+    try:
+        res = await project.profiling.list_profiles()
+        return res
+    except Exception as e:
+        logger.exception("Error processing request")
+        res = dict()
+        res["error"] = str(e)
+        return Response(
+            content=json.dumps(jsonable_encoder(res)),
+            status_code=500,
+            media_type="application/json",
+        )
+
+
+@app.get(
+    "/admin/profiles/{id}",
+    response_model=project.profiling.RequestProfile,
+    dependencies=[Depends(project.auth.require_admin)],
+)
+async def api_get_profile(id: str) -> project.profiling.RequestProfile | Response:
+    """
+    Endpoint for operators to read one request profile with its queries and call-stack profile
+    """
+    try:
+        res = await project.profiling.get_profile(id)
+        return res
+    except project.profiling.ProfileNotFoundError as e:
+        return Response(
+            content=json.dumps(jsonable_encoder({"error": str(e)})),
+            status_code=404,
+            media_type="application/json",
+        )
+    except Exception as e:
+        logger.exception("Error processing request")
+        res = dict()
+        res["error"] = str(e)
+        return Response(
+            content=json.dumps(jsonable_encoder(res)),
+            status_code=500,
+            media_type="application/json",
+        )
+
+
+@app.get(
+    "/admin/slow-queries",
+    response_model=project.profiling.SlowQueryLogResponse,
+    dependencies=[Depends(project.auth.require_admin)],
+)
+async def api_get_slow_queries() -> project.profiling.SlowQueryLogResponse | Response:
+    """
+    Endpoint for operators to read the log of database queries slower than SLOW_QUERY_MS
+    """
+    try:
+        res = await project.profiling.slow_queries()
+        return res
+    except Exception as e:
+        logger.exception("Error processing request")
+        res = dict()
+        res["error"] = str(e)
+        return Response(
+            content=json.dumps(jsonable_encoder(res)),
+            status_code=500,
+            media_type="application/json",
+        )
+
+
+@app.get(
+    "/admin/search/top-queries",
+    response_model=project.search_analytics.TopQueriesResponse,
+    dependencies=[Depends(project.auth.require_admin)],
+)
+async def api_get_top_queries(
+    days: int = 7, limit: int = 10, no_results: bool = False
+) -> project.search_analytics.TopQueriesResponse | Response:
+    """
+    Endpoint for operators to list the most frequent search queries of the last days
+    """
+    try:
+        res = await project.search_analytics.top_queries(days, limit, no_results)
+        return res
+    except Exception as e:
+        logger.exception("Error processing request")
+        res = dict()
+        res["error"] = str(e)
+        return Response(
+            content=json.dumps(jsonable_encoder(res)),
+            status_code=500,
+            media_type="application/json",
+        )
+
+
+@app.get("/health/ready", response_model=project.startup.ReadinessResponse)
+async def api_get_readiness() -> project.startup.ReadinessResponse | Response:
+    """
+    Endpoint for startup and readiness probes, answering 503 once the instance is shutting down
+    """
+    try:
+        res = await project.startup.readiness()
+        if not res.ready:
+            return Response(
+                content=json.dumps(jsonable_encoder(res)),
+                status_code=503,
+                media_type="application/json",
+            )
         return res
     except Exception as e:
         logger.exception("Error processing request")
         res = dict()
         res["error"] = str(e)
         return Response(
-            content=jsonable_encoder(res),
+            content=json.dumps(jsonable_encoder(res)),
             status_code=500,
             media_type="application/json",
         )
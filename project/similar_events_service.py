@@ -0,0 +1,80 @@
+from datetime import datetime
+from typing import List
+
+import prisma
+import project.metrics
+import project.search_index
+from pydantic import BaseModel
+
+DEFAULT_SIMILAR_EVENTS = 5
+
+# HNSW scans `hnsw.ef_search` candidates per query, 40 by default, so a few more than this are always found.
+MAX_SIMILAR_EVENTS = 20
+
+# The query embedding is an InitPlan, computed once, so the ORDER BY can be served by the HNSW index. Events
+# without an embedding are left out explicitly, since a sequential scan would return them with no similarity.
+SIMILAR_QUERY = """/* similar_events */
+SELECT "id", "title", "date", "location",
+       1 - ("embedding" <=> (SELECT "embedding" FROM "Event" WHERE "id" = $1)) AS "similarity"
+FROM "Event"
+WHERE "id" <> $1 AND "embedding" IS NOT NULL
+  AND (SELECT "embedding" FROM "Event" WHERE "id" = $1) IS NOT NULL
+ORDER BY "embedding" <=> (SELECT "embedding" FROM "Event" WHERE "id" = $1)
+LIMIT $2
+"""
+
+
+class EventNotFoundError(LookupError):
+    """
+    Raised when recommendations are asked for an event that does not exist.
+    """
+
+
+class SimilarEvent(BaseModel):
+    """
+    An event recommended for its likeness to another, with the cosine similarity of their embeddings.
+    """
+
+    id: str
+    title: str
+    date: datetime
+    location: str
+    similarity: float
+
+
+class SimilarEventsResponse(BaseModel):
+    """
+    Responds with the events most like a given one, most similar first.
+    """
+
+    events: List[SimilarEvent]
+
+
+@project.metrics.measure_queries
+async def similar_events(
+    id: str, limit: int = DEFAULT_SIMILAR_EVENTS
+) -> SimilarEventsResponse:
+    """
+    Endpoint recommending events similar to the one being viewed.
+
+    Events are compared by the embeddings of their title and description, with one nearest-neighbour query
+    answered from the HNSW index on Event. The index is approximate: now and then a slightly less similar
+    event is returned in place of a closer one, in exchange for not comparing against every event.
+
+    Args:
+        id (str): The unique identifier of the event to find neighbours for.
+        limit (int): The maximum number of events to return, capped at MAX_SIMILAR_EVENTS.
+
+    Returns:
+        SimilarEventsResponse: The nearest events, excluding the event itself.
+
+    Raises:
+        EventNotFoundError: If no event has this ID.
+    """
+    if id not in project.search_index.event_index:
+        raise EventNotFoundError(f"Event {id} not found")
+    limit = max(1, min(limit, MAX_SIMILAR_EVENTS))
+    events = await prisma.get_client().query_raw(
+        SIMILAR_QUERY, id, limit, model=SimilarEvent
+    )
+    return SimilarEventsResponse(events=events)
@@ -0,0 +1,102 @@
+import asyncio
+from typing import Awaitable, Callable, Dict, Hashable, List, TypeVar
+
+from pydantic import BaseModel
+
+T = TypeVar("T")
+
+groups: Dict[str, "SingleFlight"] = {}
+
+
+class SingleFlightStats(BaseModel):
+    """
+    Counters describing how many identical concurrent loads were collapsed into one.
+    """
+
+    name: str
+    calls: int
+    executions: int
+    collapsed: int
+    in_flight: int
+
+
+class SingleFlightStatsResponse(BaseModel):
+    """
+    Response model listing the counters of every registered single-flight group.
+    """
+
+    groups: List[SingleFlightStats]
+
+
+class SingleFlight:
+    """
+    Collapses concurrent calls for the same key into a single execution whose result is shared by every caller.
+
+    The shared call runs as its own task and callers wait on it through `asyncio.shield`, so a caller that goes
+    away (for example a client disconnecting) does not cancel the load for everyone else.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._tasks: Dict[Hashable, asyncio.Future] = {}
+        self.calls = 0
+        self.executions = 0
+        self.collapsed = 0
+        groups[name] = self
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        """
+        Runs `fn` unless a call for `key` is already in flight, in which case its result is awaited instead.
+
+        Args:
+            key (Hashable): Identifies the call, typically the arguments of the load.
+            fn (Callable[[], Awaitable[T]]): Starts the load when no identical call is running.
+
+        Returns:
+            T: The result of the shared call. Its exception, if any, is raised to every caller.
+        """
+        self.calls += 1
+        task = self._tasks.get(key)
+        if task is None:
+            self.executions += 1
+            task = asyncio.ensure_future(fn())
+            self._tasks[key] = task
+            task.add_done_callback(lambda done: self._release(key, done))
+        else:
+            self.collapsed += 1
+        return await asyncio.shield(task)
+
+    def forget(self, key: Hashable) -> None:
+        """
+        Stops new callers from joining the call in flight for `key`, for instance because the data it is
+        loading has just been changed. Callers already waiting still receive its result.
+        """
+        self._tasks.pop(key, None)
+
+    def forget_all(self) -> None:
+        self._tasks.clear()
+
+    def _release(self, key: Hashable, task: asyncio.Future) -> None:
+        if self._tasks.get(key) is task:
+            del self._tasks[key]
+
+    def stats(self) -> SingleFlightStats:
+        return SingleFlightStats(
+            name=self.name,
+            calls=self.calls,
+            executions=self.executions,
+            collapsed=self.collapsed,
+            in_flight=len(self._tasks),
+        )
+
+
+async def single_flight_stats() -> SingleFlightStatsResponse:
+    """
+    Endpoint for operators to see how many duplicate reads were collapsed.
+
+    Returns:
+        SingleFlightStatsResponse: Response model listing the counters of every registered single-flight group.
+    """
+    return SingleFlightStatsResponse(
+        groups=[group.stats() for group in groups.values()]
+    )
@@ -0,0 +1,117 @@
+import asyncio
+import contextlib
+import logging
+import os
+import time
+from typing import Iterator, List, Literal
+
+import prisma
+import prisma.models
+import project.metrics
+import project.passwords
+from pydantic import BaseModel
+
+logger = logging.getLogger(__name__)
+
+WARMUP_CONNECTIONS = int(os.getenv("WARMUP_CONNECTIONS", "4"))
+
+WARMUP_MODELS = (
+    prisma.models.User,
+    prisma.models.Event,
+    prisma.models.EventRating,
+    prisma.models.Feedback,
+)
+
+Status = Literal["ready", "stopping"]
+
+
+class StartupPhase(BaseModel):
+    """
+    One step of the startup pipeline and how long it took.
+    """
+
+    name: str
+    duration_ms: float
+
+
+class ReadinessResponse(BaseModel):
+    """
+    Response model reporting whether this instance is ready for traffic or shutting down, with the time each
+    startup phase took.
+    """
+
+    ready: bool
+    status: Status
+    startup_ms: float
+    phases: List[StartupPhase]
+
+
+# Uvicorn only accepts connections once the lifespan startup, and with it every phase, has completed, so there
+# is no "starting" state to report: until then the probe cannot connect at all.
+_status: Status = "ready"
+
+_phases: List[StartupPhase] = []
+
+
+@contextlib.contextmanager
+def phase(name: str) -> Iterator[None]:
+    """
+    Times one phase of the startup pipeline, so that it is reported by the readiness endpoint and logged.
+    """
+    started = time.perf_counter()
+    yield
+    duration_ms = (time.perf_counter() - started) * 1000
+    _phases.append(StartupPhase(name=name, duration_ms=duration_ms))
+    logger.info("Startup phase %s took %.1f ms", name, duration_ms)
+
+
+def begin_startup() -> None:
+    """
+    Forgets the phases of a previous startup in the same process, so that they are not reported twice.
+    """
+    _phases.clear()
+
+
+def mark_ready() -> None:
+    # Clears "stopping" when the app is started again in the same process, as the benchmarks do.
+    global _status
+    _status = "ready"
+
+
+def mark_stopping() -> None:
+    global _status
+    _status = "stopping"
+
+
+@project.metrics.measure_queries
+async def warm_up() -> None:
+    """
+    Warms the database path before the first request arrives.
+
+    Every model is queried WARMUP_CONNECTIONS times concurrently, which makes the query engine open that many
+    pooled connections and do its first-query work for each model now rather than on a user's request. The
+    password hashing workers are started as well, so that the first login does not pay for spawning them.
+    """
+    await asyncio.gather(
+        *(
+            model.prisma().find_first()
+            for model in WARMUP_MODELS
+            for _ in range(WARMUP_CONNECTIONS)
+        )
+    )
+    project.passwords.warm_up()
+
+
+async def readiness() -> ReadinessResponse:
+    """
+    Endpoint for the platform's startup and readiness probes.
+
+    Returns:
+        ReadinessResponse: Whether the instance is ready, with the duration of every startup phase.
+    """
+    return ReadinessResponse(
+        ready=_status == "ready",
+        status=_status,
+        startup_ms=sum(phase.duration_ms for phase in _phases),
+        phases=list(_phases),
+    )
@@ -2,6 +2,10 @@ from typing import Optional
 
 import prisma
 import prisma.models
+import project.cache
+import project.invalidation
+import project.metrics
+import project.view_rating_summary_service
 from pydantic import BaseModel
 
 
@@ -15,34 +19,65 @@ class SubmitFeedbackResponse(BaseModel):
     message: Optional[str] = None
 
 
+@project.metrics.measure_queries
 async def submit_feedback(
-    eventId: str, rating: int, content: str
+    eventId: str, rating: int, content: str, user_id: str
 ) -> SubmitFeedbackResponse:
     """
     Endpoint for users to submit feedback on an event.
 
+    The feedback row and the event's running rating aggregates are written in one transaction, so the
+    summary served by view_rating_summary always agrees with the stored feedback.
+
     Args:
         eventId (str): The ID of the event to which the feedback is being submitted.
         rating (int): The rating given by the user, on a predefined scale (e.g., 1-5).
         content (str): The textual content of the feedback provided by the user.
+        user_id (str): The ID of the authenticated user, taken from their access token.
 
     Returns:
         SubmitFeedbackResponse: Confirms the submission of feedback and provides the ID of the created feedback record.
 
     Example:
-        result = await submit_feedback("event123", 5, "Great event!")
+        result = await submit_feedback("event123", 5, "Great event!", user_id)
         print(result)
         > SubmitFeedbackResponse(success=True, feedbackId="uuid-feedback-id", message="Feedback submitted successfully.")
     """
-    try:
-        feedback = await prisma.models.Feedback.prisma().create(
-            data={
-                "eventId": eventId,
-                "rating": rating,
-                "content": content,
-                "userId": "default-user-id",
-            }
+    min_rating = project.view_rating_summary_service.MIN_RATING
+    max_rating = project.view_rating_summary_service.MAX_RATING
+    if not min_rating <= rating <= max_rating:
+        return SubmitFeedbackResponse(
+            success=False,
+            feedbackId="",
+            message=f"Rating must be between {min_rating} and {max_rating}.",
         )
+    try:
+        async with prisma.get_client().tx() as transaction:
+            feedback = await prisma.models.Feedback.prisma(transaction).create(
+                data={
+                    "eventId": eventId,
+                    "rating": rating,
+                    "content": content,
+                    "userId": user_id,
+                }
+            )
+            await prisma.models.EventRating.prisma(transaction).upsert(
+                where={"eventId": eventId},
+                data={
+                    "create": {
+                        "eventId": eventId,
+                        "ratingCount": 1,
+                        "ratingSum": rating,
+                        f"rating{rating}": 1,
+                    },
+                    "update": {
+                        "ratingCount": {"increment": 1},
+                        "ratingSum": {"increment": rating},
+                        f"rating{rating}": {"increment": 1},
+                    },
+                },
+            )
+        project.invalidation.invalidate(project.cache.event_cache, eventId)
         return SubmitFeedbackResponse(
             success=True,
             feedbackId=feedback.id,
@@ -0,0 +1,56 @@
+from datetime import datetime, timezone
+from typing import List
+
+import project.search_index
+from pydantic import BaseModel
+
+DEFAULT_SUGGESTIONS = 10
+
+MAX_SUGGESTIONS = 25
+
+
+class EventSuggestion(BaseModel):
+    """
+    An event offered while the user types its title.
+    """
+
+    id: str
+    title: str
+    date: datetime
+
+
+class EventSuggestResponse(BaseModel):
+    """
+    Response model listing the events whose title completes the typed text.
+    """
+
+    events: List[EventSuggestion]
+
+
+async def suggest_events(
+    q: str, limit: int = DEFAULT_SUGGESTIONS
+) -> EventSuggestResponse:
+    """
+    Endpoint for title typeahead, answered from the in-process search index without querying the database.
+
+    It is cheap enough to call on every keystroke, unlike a keyword search. Titles are matched from their
+    first character, ignoring case and repeated whitespace.
+
+    Args:
+        q (str): What the user has typed so far.
+        limit (int): The maximum number of suggestions, capped at MAX_SUGGESTIONS.
+
+    Returns:
+        EventSuggestResponse: Events whose title starts with `q`. Those still to come are listed first, soonest
+        first, followed by past events, most recent first.
+    """
+    limit = max(1, min(limit, MAX_SUGGESTIONS))
+    hits = project.search_index.event_index.suggest(
+        q, limit, datetime.now(timezone.utc)
+    )
+    return EventSuggestResponse(
+        events=[
+            EventSuggestion(id=event_id, title=indexed.title, date=indexed.date)
+            for event_id, indexed in hits
+        ]
+    )
@@ -0,0 +1,104 @@
+import itertools
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional
+
+import prisma
+import prisma.models
+import prisma.partials
+import project.date_ranges
+import project.metrics
+import project.pagination
+import project.projection
+import project.search_events_service
+import project.search_index
+from pydantic import BaseModel
+
+DEFAULT_HORIZON_DAYS = 30
+
+MAX_HORIZON_DAYS = 366
+
+
+class UpcomingEventsResponse(BaseModel):
+    """
+    Responds with the events of a time window in the order they happen.
+    """
+
+    events: List[project.search_events_service.EventSummary]
+    next_cursor: Optional[str] = None
+
+
+@project.metrics.measure_queries
+async def upcoming_events(
+    days: int = DEFAULT_HORIZON_DAYS,
+    date_from: Optional[str] = None,
+    location: Optional[str] = None,
+    cursor: Optional[str] = None,
+    limit: int = project.pagination.DEFAULT_PAGE_SIZE,
+    fields: Optional[str] = None,
+) -> UpcomingEventsResponse:
+    """
+    Endpoint for a timeline of the events coming up, earliest first.
+
+    The window is read from the day buckets of the in-process search index, so finding the page costs a few
+    bisects whatever the size of the Event table; only the events on the page are then loaded, by ID. Pages
+    are chained with a cursor on (date, ID).
+
+    Args:
+        days (int): How many days ahead to look, capped at MAX_HORIZON_DAYS.
+        date_from (Optional[str]): The first day of the window, "YYYY-MM-DD". Defaults to now, so that events
+            which have already started are left out.
+        location (Optional[str]): Only list events at this location; every spelling of the same place matches.
+        cursor (Optional[str]): The `next_cursor` returned with the previous page, or None for the first page.
+        limit (int): The maximum number of events to return, capped at MAX_PAGE_SIZE.
+        fields (Optional[str]): A comma separated subset of EventSummary fields to return, or None for all of them.
+
+    Returns:
+        UpcomingEventsResponse: The events of the window in date order. `next_cursor` is set when more follow.
+
+    Raises:
+        InvalidDateRangeError: If `date_from` is malformed.
+        InvalidCursorError: If the cursor does not belong to this listing.
+    """
+    selected = project.projection.parse_fields(
+        fields, project.search_events_service.EventSummary.model_fields
+    )
+    model = (
+        prisma.models.Event
+        if selected is None or "description" in selected
+        else prisma.partials.EventListing
+    )
+    limit = project.pagination.clamp_page_size(limit)
+    days = max(1, min(days, MAX_HORIZON_DAYS))
+    if date_from:
+        start = project.date_ranges.parse_day(date_from, "from")
+    else:
+        start = datetime.now(timezone.utc)
+    after = project.pagination.decode_keyset_cursor(cursor) if cursor else None
+    page = list(
+        itertools.islice(
+            project.search_index.event_index.timeline(
+                start, start + timedelta(days=days), location=location, after=after
+            ),
+            limit + 1,
+        )
+    )
+    next_cursor = None
+    if len(page) > limit:
+        page = page[:limit]
+        next_cursor = project.pagination.encode_cursor(*page[-1])
+    if not page:
+        return UpcomingEventsResponse(events=[], next_cursor=next_cursor)
+    events = await model.prisma().find_many(
+        where={"id": {"in": [event_id for _, event_id in page]}}
+    )
+    events_by_id = {event.id: event for event in events}
+    return UpcomingEventsResponse(
+        events=[
+            project.search_events_service.summarize_event(
+                events_by_id[event_id], fields=selected
+            )
+            for _, event_id in page
+            if event_id in events_by_id
+        ],
+        next_cursor=next_cursor,
+    )
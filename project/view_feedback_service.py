@@ -1,19 +1,24 @@
-from typing import List
+from typing import List, Optional, Set, Union
 
 import prisma
 import prisma.models
+import prisma.partials
+import project.metrics
+import project.pagination
+import project.projection
 from pydantic import BaseModel
 
 
 class FeedbackData(BaseModel):
     """
     Structure representing a single piece of feedback, including content, rating, and any additional relevant metadata.
+    Fields left out of a sparse fieldset are omitted from the response.
     """
 
-    content: str
-    rating: int
-    submittedAt: str
-    anonymous: bool
+    content: Optional[str] = None
+    rating: Optional[int] = None
+    submittedAt: Optional[str] = None
+    anonymous: Optional[bool] = None
 
 
 class FeedbackViewResponse(BaseModel):
@@ -22,32 +27,83 @@ class FeedbackViewResponse(BaseModel):
     """
 
     feedbacks: List[FeedbackData]
+    next_cursor: Optional[str] = None
 
 
-async def view_feedback(eventId: str) -> FeedbackViewResponse:
+def to_feedback_data(
+    record: Union[prisma.models.Feedback, prisma.partials.FeedbackListing],
+    fields: Optional[Set[str]] = None,
+) -> FeedbackData:
+    """
+    Builds the public representation of a feedback row, restricted to `fields` when given.
+
+    `userId` is a required foreign key, so whether feedback is attributed can be read off the row itself
+    without joining User.
+    """
+    values = {
+        "rating": record.rating,
+        "submittedAt": record.createdAt.isoformat(),
+        "anonymous": not record.userId,
+    }
+    if fields is None or "content" in fields:
+        values["content"] = record.content
+    if fields is not None:
+        values = {name: value for name, value in values.items() if name in fields}
+    return FeedbackData(**values)
+
+
+@project.metrics.measure_queries
+async def view_feedback(
+    eventId: str,
+    cursor: Optional[str] = None,
+    limit: int = project.pagination.DEFAULT_PAGE_SIZE,
+    fields: Optional[str] = None,
+) -> FeedbackViewResponse:
     """
     Endpoint for users to view feedback on an event.
 
-    This function retrieves feedbacks for a given eventId from the database,
+    This function retrieves one page of feedback for a given eventId from the database, newest first,
     and formats them into a FeedbackViewResponse object, taking into account each feedback's anonymity setting.
+    Pages are addressed by an opaque cursor over (`createdAt`, `id`), so every page costs the same index seek.
+    When `content` is not among the requested fields it is not selected from the database at all.
 
     Args:
         eventId (str): The unique identifier of the event for which feedback is being requested.
+        cursor (Optional[str]): The `next_cursor` returned with the previous page, or None for the first page.
+        limit (int): The maximum number of feedback entries to return, capped at MAX_PAGE_SIZE.
+        fields (Optional[str]): A comma separated subset of FeedbackData fields to return, or None for all of them.
 
     Returns:
         FeedbackViewResponse: Response model that contains the list of feedback for the requested event.
         This includes the feedback content, the rating, and metadata such as submission date and possibly user anonymized information if applicable.
+        `next_cursor` is set when more feedback is available.
     """
-    feedback_records = await prisma.models.Feedback.prisma().find_many(
-        where={"eventId": eventId}, include={"User": True}
+    selected = project.projection.parse_fields(fields, FeedbackData.model_fields)
+    limit = project.pagination.clamp_page_size(limit)
+    where: dict = {"eventId": eventId}
+    if cursor:
+        where = {
+            "AND": [
+                where,
+                project.pagination.seek_after(
+                    *project.pagination.decode_keyset_cursor(cursor)
+                ),
+            ]
+        }
+    model = (
+        prisma.models.Feedback
+        if selected is None or "content" in selected
+        else prisma.partials.FeedbackListing
+    )
+    feedback_records = await model.prisma().find_many(
+        where=where,
+        order=project.pagination.NEWEST_FIRST,
+        take=limit + 1,
     )
-    feedbacks = [
-        FeedbackData(
-            content=record.content,
-            rating=record.rating,
-            submittedAt=record.createdAt.isoformat(),
-            anonymous=record.User is None,
-        )
-        for record in feedback_records
-    ]
-    return FeedbackViewResponse(feedbacks=feedbacks)
+    next_cursor = None
+    if len(feedback_records) > limit:
+        feedback_records = feedback_records[:limit]
+        last = feedback_records[-1]
+        next_cursor = project.pagination.encode_cursor(last.createdAt, last.id)
+    feedbacks = [to_feedback_data(record, selected) for record in feedback_records]
+    return FeedbackViewResponse(feedbacks=feedbacks, next_cursor=next_cursor)
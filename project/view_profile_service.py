@@ -1,5 +1,11 @@
+from datetime import datetime
+from typing import Tuple
+
 import prisma
 import prisma.models
+import project.cache
+import project.conditional
+import project.metrics
 from pydantic import BaseModel
 
 
@@ -11,27 +17,62 @@ class UserProfileResponse(BaseModel):
     id: str
     email: str
     role: str
+    version: int
     createdAt: str
     updatedAt: str
 
 
-async def view_profile(user_id: str) -> UserProfileResponse:
+@project.metrics.measure_queries
+async def load_profile(user_id: str) -> UserProfileResponse:
     """
-    Endpoint for users to view their profile
-
-    Args:
-    user_id (str): Identifier for the user whose profile is being accessed. This is usually extracted from the user's authentication token.
-
-    Returns:
-    UserProfileResponse: Represents a concise summary of the user's profile, including essential details but omitting sensitive information like passwords.
+    Reads a user's profile from the database.
     """
     user = await prisma.models.User.prisma().find_unique(where={"id": user_id})
     if user:
         return UserProfileResponse(
             id=user.id,
             email=user.email,
-            role=user.role.name,
+            role=user.role,
+            version=user.version,
             createdAt=user.createdAt.isoformat(),
             updatedAt=user.updatedAt.isoformat(),
         )
     raise Exception("User not found")
+
+
+async def view_profile(user_id: str) -> UserProfileResponse:
+    """
+    Endpoint for users to view their profile
+
+    Profiles are served from the profile cache when possible and concurrent misses for the same user share one
+    query; edit_profile invalidates it explicitly.
+
+    Args:
+    user_id (str): Identifier for the user whose profile is being accessed, extracted from the user's access token.
+
+    Returns:
+    UserProfileResponse: Represents a concise summary of the user's profile, including essential details but omitting sensitive information like passwords.
+    """
+    return await project.cache.profile_cache.get_or_load(
+        user_id, lambda: load_profile(user_id)
+    )
+
+
+async def view_profile_versioned(
+    user_id: str,
+) -> Tuple[UserProfileResponse, project.conditional.Validators]:
+    """
+    Same as view_profile, also returning the HTTP validators of the response, derived from the user's `updatedAt`
+    and prefixed with their version for If-Match on profile edits. Profiles are private to their owner, so shared
+    caches are told not to store them.
+    """
+    response = await view_profile(user_id)
+    updated_at = datetime.fromisoformat(response.updatedAt)
+    validators = project.conditional.Validators(
+        etag=project.conditional.make_versioned_etag(
+            response.version, response.id, response.updatedAt
+        ),
+        last_modified=updated_at,
+        cache_control="private, no-cache",
+    )
+    return response, validators
@@ -0,0 +1,83 @@
+from typing import Dict, Optional
+
+import prisma
+import prisma.models
+import project.metrics
+from pydantic import BaseModel
+
+MIN_RATING = 1
+
+MAX_RATING = 5
+
+
+class RatingSummary(BaseModel):
+    """
+    Aggregated ratings for an event: how many were given, their total and mean, and how many of each star value.
+    """
+
+    count: int
+    sum: int
+    mean: Optional[float] = None
+    histogram: Dict[int, int]
+
+
+class RatingSummaryResponse(BaseModel):
+    """
+    Response model carrying the rating summary of a single event.
+    """
+
+    eventId: str
+    rating: RatingSummary
+
+
+def build_rating_summary(rating: Optional[prisma.models.EventRating]) -> RatingSummary:
+    """
+    Converts the stored aggregate row of an event into a RatingSummary. Events without feedback have no row yet.
+    """
+    if rating is None:
+        return RatingSummary(
+            count=0,
+            sum=0,
+            histogram={stars: 0 for stars in range(MIN_RATING, MAX_RATING + 1)},
+        )
+    return RatingSummary(
+        count=rating.ratingCount,
+        sum=rating.ratingSum,
+        mean=rating.ratingSum / rating.ratingCount if rating.ratingCount else None,
+        histogram={
+            1: rating.rating1,
+            2: rating.rating2,
+            3: rating.rating3,
+            4: rating.rating4,
+            5: rating.rating5,
+        },
+    )
+
+
+@project.metrics.measure_queries
+async def view_rating_summary(eventId: str) -> RatingSummaryResponse:
+    """
+    Endpoint for users to view the rating summary of an event.
+
+    The summary is read from the aggregate row maintained by submit_feedback, so the cost is a single primary key
+    lookup no matter how much feedback the event has received.
+
+    Args:
+        eventId (str): The unique identifier of the event whose ratings are being summarized.
+
+    Returns:
+        RatingSummaryResponse: Response model carrying the rating summary of a single event.
+
+    Example:
+        summary = await view_rating_summary("event123")
+        print(summary.rating.mean)
+        > 4.25
+    """
+    rating = await prisma.models.EventRating.prisma().find_unique(
+        where={"eventId": eventId}
+    )
+    if rating is None:
+        event = await prisma.models.Event.prisma().find_unique(where={"id": eventId})
+        if event is None:
+            raise ValueError("Event not found")
+    return RatingSummaryResponse(eventId=eventId, rating=build_rating_summary(rating))
@@ -0,0 +1,259 @@
+import asyncio
+import contextlib
+import os
+import unittest
+from typing import Any, Callable, Iterator, List, Tuple
+from unittest import mock
+
+import benchmarks  # noqa: F401  (sets the configuration the project reads on import)
+import prisma.testing
+import project.cache
+import project.display_event_service
+import project.edit_event_service
+import project.invalidation
+import project.locations
+import project.search_index
+from benchmarks.dataset import generate_dataset, seed_fake
+from benchmarks.fake_prisma import FakePrisma, FakeStore
+
+# Set to a scratch Postgres database to also run the tests over a real LISTEN/NOTIFY connection.
+TEST_DATABASE_URL = os.getenv("TEST_DATABASE_URL")
+
+DELIVERY_TIMEOUT_SECONDS = 5.0
+
+Listener = Callable[[Any, int, str, str], None]
+
+
+class Broker:
+    """
+    Stands in for Postgres's NOTIFY: a message sent on a channel reaches every connection listening on it,
+    the sender's included, as it does in Postgres.
+    """
+
+    def __init__(self):
+        self.connections: List["BrokerConnection"] = []
+
+
+class BrokerConnection:
+    """
+    The part of an asyncpg connection that the invalidation bus uses.
+    """
+
+    def __init__(self, broker: Broker):
+        self.broker = broker
+        self.listeners: List[Tuple[str, Listener]] = []
+        self.closed = False
+
+    async def add_listener(self, channel: str, callback: Listener) -> None:
+        self.listeners.append((channel, callback))
+        self.broker.connections.append(self)
+
+    def add_termination_listener(self, callback: Callable[[Any], None]) -> None:
+        pass
+
+    async def execute(self, query: str, channel: str, payload: str) -> None:
+        loop = asyncio.get_running_loop()
+        for connection in list(self.broker.connections):
+            for listened, callback in connection.listeners:
+                if listened == channel:
+                    loop.call_soon(callback, connection, 0, channel, payload)
+
+    def is_closed(self) -> bool:
+        return self.closed
+
+    async def close(self) -> None:
+        self.closed = True
+        self.broker.connections.remove(self)
+
+
+class BrokerBus(project.invalidation.InvalidationBus):
+    def __init__(self, channel: str, broker: Broker):
+        super().__init__(channel)
+        self.broker = broker
+
+    async def _connect(self) -> None:
+        connection = BrokerConnection(self.broker)
+        await connection.add_listener(self.channel, self._on_notification)
+        self._connection = connection
+
+
+class Worker:
+    """
+    One uvicorn worker's share of the state: its own event cache and its own bus connection. The database,
+    like in production, is shared.
+    """
+
+    def __init__(self, bus: project.invalidation.InvalidationBus):
+        self.bus = bus
+        self.event_cache = project.cache.LRUCache("event", maxsize=100, ttl_seconds=300)
+        bus.subscribe(
+            f"cache:{self.event_cache.name}",
+            project.invalidation._cache_handler(self.event_cache),
+        )
+
+    @contextlib.contextmanager
+    def serving(self) -> Iterator[None]:
+        """
+        Makes the services run as this worker while the block runs.
+        """
+        with mock.patch.object(
+            project.cache, "event_cache", self.event_cache
+        ), mock.patch.object(project.invalidation, "bus", self.bus):
+            yield
+
+    async def display_event(self, id: str) -> Any:
+        with self.serving():
+            return await project.display_event_service.display_event(id)
+
+    async def edit_title(self, id: str, title: str) -> Any:
+        with self.serving():
+            return await project.edit_event_service.edit_event(id, title=title)
+
+    async def invalidations_applied(self, count: int) -> None:
+        """
+        Waits until `count` invalidations have reached this worker's event cache.
+        """
+        while self.event_cache.invalidations < count:
+            await asyncio.sleep(0.01)
+
+
+class CrossWorkerInvalidationTest(unittest.IsolatedAsyncioTestCase):
+    """
+    Two workers cache the same event. An edit in worker A must reach worker B's cache through the bus.
+    """
+
+    channel = "xspor_invalidation_test"
+
+    def make_bus(self) -> project.invalidation.InvalidationBus:
+        return BrokerBus(self.channel, self.broker)
+
+    async def start_bus(self, bus: project.invalidation.InvalidationBus) -> None:
+        await bus.start(TEST_DATABASE_URL or "")
+
+    async def asyncSetUp(self) -> None:
+        self.broker = Broker()
+        dataset = generate_dataset(2, 1, 0, seed=1)
+        self.event_id = dataset.events[0]["id"]
+        self.title = dataset.events[0]["title"]
+        self.store = FakeStore()
+        seed_fake(self.store, dataset)
+        client = FakePrisma(store=self.store)
+        await client.connect()
+        self.enterContext(prisma.testing.reset_client(client))
+        self.worker_a = Worker(self.make_bus())
+        self.worker_b = Worker(self.make_bus())
+
+    async def asyncTearDown(self) -> None:
+        await self.worker_a.bus.stop()
+        await self.worker_b.bus.stop()
+
+    async def test_edit_in_one_worker_invalidates_the_other(self) -> None:
+        await self.start_bus(self.worker_a.bus)
+        await self.start_bus(self.worker_b.bus)
+
+        before = await self.worker_b.display_event(self.event_id)
+        self.assertEqual(before.title, self.title)
+        queries = self.store.queries
+        cached = await self.worker_b.display_event(self.event_id)
+        self.assertEqual(cached.title, self.title)
+        self.assertEqual(self.store.queries, queries, "the second read is a cache hit")
+
+        edited = await self.worker_a.edit_title(self.event_id, "Renamed")
+        self.assertTrue(edited.success, edited.message)
+        await asyncio.wait_for(
+            self.worker_b.invalidations_applied(1), DELIVERY_TIMEOUT_SECONDS
+        )
+        self.assertEqual(self.worker_b.event_cache.stats().size, 0)
+
+        queries = self.store.queries
+        after = await self.worker_b.display_event(self.event_id)
+        self.assertEqual(after.title, "Renamed")
+        self.assertEqual(self.store.queries, queries + 1, "the stale entry is refilled")
+        queries = self.store.queries
+        refilled = await self.worker_b.display_event(self.event_id)
+        self.assertEqual(refilled.title, "Renamed")
+        self.assertEqual(self.store.queries, queries, "the refilled entry is cached")
+
+    async def test_without_the_bus_the_other_worker_serves_stale_data(self) -> None:
+        await self.worker_b.display_event(self.event_id)
+
+        edited = await self.worker_a.edit_title(self.event_id, "Renamed")
+        self.assertTrue(edited.success, edited.message)
+
+        stale = await self.worker_b.display_event(self.event_id)
+        self.assertEqual(stale.title, self.title)
+
+
+@unittest.skipUnless(TEST_DATABASE_URL, "TEST_DATABASE_URL is not set")
+class PostgresCrossWorkerInvalidationTest(CrossWorkerInvalidationTest):
+    """
+    The same, with each worker on its own LISTEN/NOTIFY connection to a real database.
+    """
+
+    def make_bus(self) -> project.invalidation.InvalidationBus:
+        return project.invalidation.InvalidationBus(self.channel)
+
+
+class ResynchroniseTest(unittest.IsolatedAsyncioTestCase):
+    """
+    A worker resynchronising after a reconnect keeps serving from its full index, and the index it swaps in
+    carries the changes made while it was loading.
+    """
+
+    async def asyncSetUp(self) -> None:
+        dataset = generate_dataset(2, 30, 0, seed=1)
+        self.event_ids = sorted(event["id"] for event in dataset.events)
+        self.store = FakeStore()
+        seed_fake(self.store, dataset)
+        client = FakePrisma(store=self.store, latency=0.001)
+        await client.connect()
+        self.enterContext(prisma.testing.reset_client(client))
+        self.enterContext(
+            mock.patch.object(
+                project.search_index,
+                "event_index",
+                project.search_index.EventSearchIndex(),
+            )
+        )
+        self.enterContext(
+            mock.patch.object(
+                project.locations, "directory", project.locations.LocationDirectory()
+            )
+        )
+        self.enterContext(
+            mock.patch.object(project.search_index, "REBUILD_BATCH_SIZE", 5)
+        )
+        await project.locations.load_locations()
+        await project.search_index.rebuild_event_index()
+
+    async def test_serves_while_reloading_and_keeps_changes_made_meanwhile(
+        self,
+    ) -> None:
+        locations = len(project.locations.directory)
+        edited, deleted = self.event_ids[0], self.event_ids[1]
+        queries = self.store.queries
+        resynchronising = asyncio.create_task(project.invalidation.resynchronise())
+        # The location directory and the index's first batch, holding both events, have been read.
+        while self.store.queries < queries + 2:
+            await asyncio.sleep(0.001)
+        self.assertFalse(resynchronising.done())
+        self.assertEqual(len(project.search_index.event_index), len(self.event_ids))
+        self.assertEqual(len(project.locations.directory), locations)
+
+        response = await project.edit_event_service.edit_event(edited, title="Zanzibar")
+        self.assertTrue(response.success, response.message)
+        del self.store.rows["Event"][deleted]
+        await project.invalidation.reindex_events([deleted])
+        await resynchronising
+
+        index = project.search_index.event_index
+        self.assertEqual(len(index), len(self.event_ids) - 1)
+        self.assertNotIn(deleted, index)
+        self.assertEqual(
+            [event_id for event_id, _ in index.search("zanzibar")], [edited]
+        )
+        self.assertEqual(len(project.locations.directory), locations)
+
+
+if __name__ == "__main__":
+    unittest.main()